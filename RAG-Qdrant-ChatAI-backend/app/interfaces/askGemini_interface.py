@@ -6,3 +6,8 @@ class GeminiInterface(ABC):
     def ask(self, question: str) -> dict:
         """Send a question and return {'question': q, 'answer': a}"""
         pass
+
+    @abstractmethod
+    def ask_stream(self, question: str):
+        """Send a question and yield the answer text as it is generated"""
+        pass
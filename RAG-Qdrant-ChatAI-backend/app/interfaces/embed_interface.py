@@ -6,3 +6,13 @@ class EmbedInterface(ABC):
     def get_embedding(self, text: str) -> List[float]:
         """Generate an embedding for the given text"""
         pass
+
+    @abstractmethod
+    def get_embeddings(self, texts: List[str]):
+        """Generate embeddings for many texts in one batched pass"""
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """Return cache and performance counters for the embedding path"""
+        pass
@@ -6,3 +6,18 @@ class PDFInterface(ABC):
     def process_pdf(self, file) -> dict:
         """Process PDF and return extracted Q&A pairs"""
         pass
+
+    @abstractmethod
+    def prepare_chunks(self, file) -> list:
+        """Validate the PDF, extract its text and return the chunks to process"""
+        pass
+
+    @abstractmethod
+    def prepare_chunks_from_path(self, pdf_path: str) -> list:
+        """Extract text from a PDF on disk and return the chunks to process"""
+        pass
+
+    @abstractmethod
+    def iter_process_chunks(self, chunks: list):
+        """Yield progress events with per-chunk Q&A pairs as chunks complete"""
+        pass
@@ -0,0 +1,24 @@
+# app/interfaces/pdf_job_interface.py
+from abc import ABC, abstractmethod
+from typing import Optional
+
+class PDFJobInterface(ABC):
+    @abstractmethod
+    def submit(self, file) -> dict:
+        """Queue a PDF for background Q&A extraction and return its job id"""
+        pass
+
+    @abstractmethod
+    def get_status(self, job_id: str) -> Optional[dict]:
+        """Return job status and progress, or None if the job is unknown"""
+        pass
+
+    @abstractmethod
+    def get_result(self, job_id: str) -> Optional[dict]:
+        """Return the Q&A pairs extracted so far, or None if the job is unknown"""
+        pass
+
+    @abstractmethod
+    def cancel(self, job_id: str) -> Optional[dict]:
+        """Cancel a queued job or ask a running one to stop"""
+        pass
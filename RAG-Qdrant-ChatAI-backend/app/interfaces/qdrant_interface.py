@@ -4,7 +4,18 @@ from typing import Dict, Any ,List,Optional
 class QdrantInterface(ABC):
 
     @abstractmethod
-    def create_collection(self, name: str) -> Any:
+    def create_collection(self, name: str, model_name: Optional[str] = None, dim: Optional[int] = None,
+                          profile: Any = None) -> Any:
+        pass
+
+    @abstractmethod
+    def get_collection_config(self, collection_name: str) -> Any:
+        """Effective quantization, HNSW and on-disk settings of a collection"""
+        pass
+
+    @abstractmethod
+    def get_collection_embedding(self, collection_name: str) -> Dict[str, Any]:
+        """Embedding model and vector dimension a collection is encoded with"""
         pass
 
     @abstractmethod
@@ -19,22 +30,56 @@ class QdrantInterface(ABC):
     def search_point(self, data: Dict[str, Any]) -> Any:
         pass
 
+    @abstractmethod
+    def search_point_stream(self, data: Dict[str, Any]):
+        """Yield the matched points first, then the generated answer token by token"""
+        pass
+
     @abstractmethod
     def get_questions_answers_paginated(self, collection_name: str, limit: int = 25, offset: Optional[str] = None) -> Any:
         """
         Fetch Q&A pairs from a collection with pagination (scroll API).
         """
         pass
+
+    @abstractmethod
+    def iter_all_questions_answers(self, collection_name: str, page_size: Optional[int] = None):
+        """Yield every Q&A pair of a collection as events, scrolling page by page"""
+        pass
     
     @abstractmethod
     def delete_collection(self, collection_name: str) -> Any:
         pass
 
     @abstractmethod
-    def bulk_qa_insert(self, qa_list : List, collection_name: str) -> Any:
+    def bulk_qa_insert(self, qa_list : List, collection_name: str, deterministic_ids: Optional[bool] = None,
+                       batch_size: Optional[int] = None, wait: bool = False) -> Any:
         """Bulk insert multiple Q&A into Qdrant"""
         pass
 
+    @abstractmethod
+    def iter_bulk_qa_insert(self, qa_list : List, collection_name: str, deterministic_ids: Optional[bool] = None,
+                            batch_size: Optional[int] = None, wait: bool = False):
+        """Embed and upsert Q&A in pipelined batches, yielding per-batch progress events"""
+        pass
+
+    @abstractmethod
+    def export_collection(self, collection_name: str) -> Any:
+        """Stream every point (ids, payloads, vectors) as a binary snapshot"""
+        pass
+
+    @abstractmethod
+    def import_collection(self, snapshot_path: str, collection_name: Optional[str] = None,
+                          batch_size: Optional[int] = None, wait: bool = False) -> Any:
+        """Upsert a snapshot's points with their stored vectors (no re-embedding)"""
+        pass
+
+    @abstractmethod
+    def iter_import_collection(self, snapshot_path: str, collection_name: Optional[str] = None,
+                               batch_size: Optional[int] = None, wait: bool = False):
+        """Snapshot import as start/batch/summary progress events"""
+        pass
+
     @abstractmethod
     def delete_questionById(self, collection_name : str, question_id: str) -> Any:
         """Bulk insert multiple Q&A into Qdrant"""
@@ -49,4 +94,14 @@ class QdrantInterface(ABC):
     @abstractmethod
     def get_total_qa(self, collection_name: str) -> int:
         """Return total number of Q&A stored in a given collection"""
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def get_transport_stats(self) -> dict:
+        """Return per-operation latency/error/retry counters of the Qdrant transport"""
+        pass
+
+    @abstractmethod
+    def get_cache_stats(self) -> dict:
+        """Return hit/miss/eviction counters of the search-side caches"""
+        pass
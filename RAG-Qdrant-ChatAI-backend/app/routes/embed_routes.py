@@ -1,6 +1,14 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from flasgger import swag_from
 from app.services.embed_service import EmbedService
+from helpers.vector_codec_helper import (
+    OCTET_STREAM_MIMETYPE,
+    BASE64_MIMETYPE,
+    pack_float32,
+    pack_float32_base64,
+    to_float32_matrix,
+)
+from config import EMBED_MAX_TEXTS_PER_REQUEST
 
 api_bp = Blueprint('api', __name__)
 embed_service = EmbedService()
@@ -9,7 +17,11 @@ embed_service = EmbedService()
 @swag_from({
     'tags': ['Vector Transformation'],
     'summary': 'Change into vector format',
-    'description': 'Convert text format into vector format',
+    'description': 'Convert text (or a list of texts, encoded in one batched pass) into vector format. '
+                   'Send Accept: application/octet-stream for packed little-endian float32 rows, '
+                   'or Accept: application/x-float32-base64 for the same buffer base64-encoded. '
+                   'Binary responses carry X-Embedding-Count and X-Embedding-Dim headers.',
+    'produces': ['application/json', 'application/octet-stream', 'application/x-float32-base64'],
     'parameters': [
         {
             'name': 'body',
@@ -18,33 +30,131 @@ embed_service = EmbedService()
             'schema': {
                 'type': 'object',
                 'properties': {
-                    'text': {'type': 'string'}
-                },
-                'required': ['text']
+                    'text': {'type': 'string'},
+                    'texts': {
+                        'type': 'array',
+                        'items': {'type': 'string'}
+                    }
+                }
             }
         }
     ],
     'responses': {
         200: {
-            'description': 'Returns sentence embedding',
+            'description': 'Returns sentence embedding(s)',
             'schema': {
                 'type': 'object',
                 'properties': {
                     'embedding': {
                         'type': 'array',
                         'items': {'type': 'number'}
-                    }
+                    },
+                    'embeddings': {
+                        'type': 'array',
+                        'items': {'type': 'array', 'items': {'type': 'number'}}
+                    },
+                    'count': {'type': 'integer'},
+                    'dim': {'type': 'integer'}
                 }
             }
+        },
+        400: {
+            'description': 'Missing or invalid text(s)'
         }
     }
 })
 def embed():
-    data = request.get_json()
-    if not data or "text" not in data:
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or ("text" not in data and "texts" not in data):
         return jsonify({"error": "Text field is required"}), 400
+
+    texts = data.get("texts")
+    if texts is not None:
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            return jsonify({"error": "texts must be a list of strings"}), 400
+        if len(texts) > EMBED_MAX_TEXTS_PER_REQUEST:
+            return jsonify({"error": f"At most {EMBED_MAX_TEXTS_PER_REQUEST} texts per request"}), 400
+    elif not isinstance(data["text"], str):
+        return jsonify({"error": "text must be a string"}), 400
+
+    output = request.accept_mimetypes.best_match(
+        ["application/json", OCTET_STREAM_MIMETYPE, BASE64_MIMETYPE],
+        default="application/json"
+    )
+
     try:
-        embedding = embed_service.get_embedding(data["text"].strip())
-        return jsonify({"embedding": embedding})
+        if texts is None:
+            # Single text keeps the cached/micro-batched path
+            embedding = embed_service.get_embedding(data["text"].strip())
+            if output == "application/json":
+                return jsonify({"embedding": embedding})
+            vectors = to_float32_matrix(embedding)
+        else:
+            vectors = embed_service.get_embeddings(texts)
+            if output == "application/json":
+                return jsonify({
+                    "embeddings": vectors.tolist(),
+                    "count": int(vectors.shape[0]),
+                    "dim": int(vectors.shape[1]) if vectors.size else 0
+                })
+
+        if output == OCTET_STREAM_MIMETYPE:
+            body = pack_float32(vectors)
+        else:
+            body = pack_float32_base64(vectors)
+
+        return Response(body, mimetype=output, headers={
+            "X-Embedding-Count": str(vectors.shape[0]),
+            "X-Embedding-Dim": str(vectors.shape[1] if vectors.size else 0),
+            "X-Embedding-Dtype": "float32-le"
+        })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@api_bp.route('/embedStats', methods=['GET'])
+@swag_from({
+    'tags': ['Vector Transformation'],
+    'summary': 'Embedding cache and batching statistics',
+    'description': 'Returns hit/miss/eviction counters of the query embedding cache and micro-batching metrics',
+    'responses': {
+        200: {
+            'description': 'Embedding statistics',
+            'examples': {
+                'application/json': {
+                    'backend': 'onnx',
+                    'precision': 'int8',
+                    'loaded_models': ['sentence-transformers/all-mpnet-base-v2 (onnx, int8)'],
+                    'cache': {
+                        'size': 312,
+                        'max_entries': 2048,
+                        'ttl_seconds': 3600,
+                        'hits': 9120,
+                        'misses': 411,
+                        'evictions': 0,
+                        'expirations': 12,
+                        'hit_rate': 0.9569
+                    },
+                    'batching_enabled': True,
+                    'batchers': [
+                        {
+                            'model': 'sentence-transformers/all-mpnet-base-v2',
+                            'window_ms': 3.0,
+                            'max_batch_size': 32,
+                            'queue_depth': 0,
+                            'batches': 350,
+                            'items': 411,
+                            'largest_batch': 9,
+                            'full_batches': 0,
+                            'avg_batch_size': 1.17,
+                            'avg_queue_wait_ms': 2.841,
+                            'avg_encode_ms': 38.502
+                        }
+                    ]
+                }
+            }
+        }
+    }
+})
+def embed_stats():
+    return jsonify(embed_service.stats())
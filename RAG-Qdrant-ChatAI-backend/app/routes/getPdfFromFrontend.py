@@ -1,16 +1,31 @@
 # app/routes/upload.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, url_for
 from flasgger import swag_from
 from app.services.pdf_service import PDFService
+from app.services.pdf_job_service import PDFJobService
+from helpers.stream_helper import resolve_stream_format, streaming_response
 
 upload_bp = Blueprint("upload", __name__)
 pdf_service = PDFService()
+pdf_job_service = PDFJobService(pdf_service)
+
+
+@upload_bp.before_app_request
+def start_pdf_job_workers():
+    # Cheap after the first call; resumes interrupted jobs in each worker process
+    pdf_job_service.start()
+
 
 @upload_bp.route("/", methods=["POST"])
 @swag_from({
     'tags': ['PDF'],
     'summary': 'Upload PDF and extract Q&A',
-    'description': 'Upload a PDF file, extract Q&A pairs (no vectorization, no Qdrant insertion)',
+    'description': 'Upload a PDF file, extract Q&A pairs (no vectorization, no Qdrant insertion). '
+                   'With ?stream=ndjson or ?stream=sse (or Accept: application/x-ndjson / text/event-stream) '
+                   'the response is streamed: a start event, one chunk event with its Q&A pairs as each chunk '
+                   'completes, and a final summary event with total_chunks and total_qa_generated. '
+                   'With ?async=true the PDF is queued as a background job and 202 is returned with a job_id; '
+                   'poll /upload/jobs/{job_id} and fetch /upload/jobs/{job_id}/result.',
     'consumes': ['multipart/form-data'],
     'parameters': [
         {
@@ -19,6 +34,21 @@ pdf_service = PDFService()
             'type': 'file',
             'required': True,
             'description': 'The PDF file to upload'
+        },
+        {
+            'name': 'stream',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['ndjson', 'sse'],
+            'required': False,
+            'description': 'Stream per-chunk progress and Q&A pairs as they complete'
+        },
+        {
+            'name': 'async',
+            'in': 'query',
+            'type': 'boolean',
+            'required': False,
+            'description': 'Queue the PDF as a background job and return its id immediately'
         }
     ],
     'responses': {
@@ -39,7 +69,20 @@ pdf_service = PDFService()
                         }
                     },
                     'total_chunks': {'type': 'integer'},
-                    'total_qa_generated': {'type': 'integer'}
+                    'total_qa_generated': {'type': 'integer'},
+                    'cache_hits': {'type': 'integer', 'description': 'Chunks served from the extraction cache instead of Gemini'}
+                }
+            }
+        },
+        202: {
+            'description': 'Job queued (async=true)',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'job_id': {'type': 'string'},
+                    'status': {'type': 'string', 'example': 'queued'},
+                    'status_url': {'type': 'string'},
+                    'result_url': {'type': 'string'}
                 }
             }
         },
@@ -58,6 +101,26 @@ def upload_pdf():
     file = request.files["file"]
     print("file received:", file.filename)
 
+    if request.args.get("async", "").lower() in ("1", "true", "yes"):
+        try:
+            job = pdf_job_service.submit(file)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify({
+            **job,
+            "status_url": url_for("upload.get_job_status", job_id=job["job_id"]),
+            "result_url": url_for("upload.get_job_result", job_id=job["job_id"])
+        }), 202
+
+    stream_format = resolve_stream_format(request.args.get("stream"), request.accept_mimetypes)
+    if stream_format:
+        try:
+            # Read and chunk the upload before streaming so bad files still get a 400
+            chunks = pdf_service.prepare_chunks(file)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+        return streaming_response(pdf_service.iter_process_chunks(chunks), stream_format)
+
     try:
         final_output = pdf_service.process_pdf(file)
 
@@ -65,8 +128,81 @@ def upload_pdf():
             "message": "Processing complete",
             "qa_pairs": final_output["qa_results"],
             "total_chunks": final_output["total_chunks"],
-            "total_qa_generated": final_output["total_qa_generated"]
+            "total_qa_generated": final_output["total_qa_generated"],
+            "cache_hits": final_output["cache_hits"]
         }), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 400
+
+
+@upload_bp.route("/jobs/<job_id>", methods=["GET"])
+@swag_from({
+    'tags': ['PDF'],
+    'summary': 'Get PDF job status',
+    'description': 'Returns the status and progress of a background PDF extraction job.',
+    'parameters': [
+        {'name': 'job_id', 'in': 'path', 'type': 'string', 'required': True}
+    ],
+    'responses': {
+        200: {
+            'description': 'Job status',
+            'examples': {
+                'application/json': {
+                    'job_id': 'c0a8...', 'filename': 'manual.pdf', 'status': 'running', 'error': None,
+                    'total_chunks': 40, 'completed_chunks': 12, 'total_qa_generated': 97,
+                    'created_at': 1760000000.0, 'updated_at': 1760000042.5
+                }
+            }
+        },
+        404: {'description': 'Job not found'}
+    }
+})
+def get_job_status(job_id):
+    status = pdf_job_service.get_status(job_id)
+    if status is None:
+        return jsonify({"error": f"Job '{job_id}' not found"}), 404
+    return jsonify(status), 200
+
+
+@upload_bp.route("/jobs/<job_id>/result", methods=["GET"])
+@swag_from({
+    'tags': ['PDF'],
+    'summary': 'Get PDF job result',
+    'description': 'Returns the Q&A pairs extracted so far (complete once status is "completed") and any failed chunks.',
+    'parameters': [
+        {'name': 'job_id', 'in': 'path', 'type': 'string', 'required': True}
+    ],
+    'responses': {
+        200: {'description': 'Job status plus qa_pairs and failed_chunks'},
+        404: {'description': 'Job not found'}
+    }
+})
+def get_job_result(job_id):
+    result = pdf_job_service.get_result(job_id)
+    if result is None:
+        return jsonify({"error": f"Job '{job_id}' not found"}), 404
+    return jsonify(result), 200
+
+
+@upload_bp.route("/jobs/<job_id>/cancel", methods=["POST"])
+@swag_from({
+    'tags': ['PDF'],
+    'summary': 'Cancel a PDF job',
+    'description': 'Cancels a queued job, or asks a running job to stop after its in-flight chunks.',
+    'parameters': [
+        {'name': 'job_id', 'in': 'path', 'type': 'string', 'required': True}
+    ],
+    'responses': {
+        200: {
+            'description': 'New job status',
+            'examples': {'application/json': {'job_id': 'c0a8...', 'status': 'cancel_requested'}}
+        },
+        404: {'description': 'Job not found'}
+    }
+})
+def cancel_job(job_id):
+    result = pdf_job_service.cancel(job_id)
+    if result is None:
+        return jsonify({"error": f"Job '{job_id}' not found"}), 404
+    return jsonify(result), 200
@@ -1,11 +1,21 @@
-from flask import Blueprint, request, jsonify
-from sentence_transformers import SentenceTransformer
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flasgger import swag_from
 from app.services.qdrant_service import QdrantService
+from helpers.stream_helper import NDJSON, resolve_stream_format, streaming_response
+from helpers.snapshot_helper import SNAPSHOT_EXTENSION, SNAPSHOT_MIMETYPE, spool_snapshot_file
+from config import SNAPSHOT_SPOOL_DIR
 
 qdrant_bp = Blueprint('qdrant', __name__)
 service = QdrantService()
 
+
+def _bool_arg(name):
+    """Optional boolean query arg: None when absent so the service default applies."""
+    value = request.args.get(name)
+    if value is None:
+        return None
+    return value.lower() in ("1", "true", "yes")
+
 @qdrant_bp.route("/create_collection", methods=["POST"])
 @swag_from({
     'tags': ['Qdrant Collection'],
@@ -19,24 +29,45 @@ service = QdrantService()
             'schema': {
                 'type': 'object',
                 'properties': {
-                    'name': {'type': 'string'}
+                    'name': {'type': 'string'},
+                    'model_name': {'type': 'string', 'example': 'sentence-transformers/all-MiniLM-L6-v2',
+                                   'description': 'Embedding model for this collection (default EMBEDDING_MODEL_NAME)'},
+                    'dim': {'type': 'integer', 'example': 384,
+                            'description': 'Vector size; below the model\'s native size vectors are Matryoshka-truncated'},
+                    'profile': {
+                        'type': 'object',
+                        'description': 'Preset name (default, low_memory, low_latency, binary) or an object that '
+                                       'overrides a preset. Defaults to COLLECTION_DEFAULT_PROFILE',
+                        'example': {
+                            'preset': 'low_memory',
+                            'on_disk': True,
+                            'on_disk_payload': True,
+                            'hnsw': {'m': 16, 'ef_construct': 100, 'on_disk': False},
+                            'quantization': {'type': 'scalar', 'quantile': 0.99, 'always_ram': True,
+                                             'rescore': True, 'oversampling': 2.0},
+                            'indexing_threshold': 20000,
+                            'hnsw_ef': 128
+                        }
+                    }
                 }
             }
         }
     ],
     'responses': {
         200: {
-            'description': 'Embedding generated',
-            'schema': {
-                'type': 'object',
-                'properties': {
-                    'embedding': {
-                        'type': 'array',
-                        'items': {'type': 'number'}
-                    }
+            'description': 'Collection created',
+            'examples': {
+                'application/json': {
+                    'result': True, 'status': 'ok', 'time': 0.05,
+                    'embedding': {'model_name': 'sentence-transformers/all-MiniLM-L6-v2', 'dim': 384, 'native_dim': 384},
+                    'profile': {'preset': 'low_memory', 'on_disk': True, 'on_disk_payload': True,
+                                'quantization': {'type': 'scalar', 'quantile': 0.99, 'always_ram': True,
+                                                 'rescore': True, 'oversampling': 2.0}},
+                    'search_params': {'quantization': {'rescore': True, 'oversampling': 2.0}}
                 }
             }
-        }
+        },
+        400: {'description': 'Missing name, unknown model, invalid dim or invalid profile'}
     }
 })
 def create():
@@ -44,7 +75,72 @@ def create():
     name = data.get("name")
     if not name:
         return jsonify({"error": "Collection name required"}), 400
-    return service.create_collection(name)
+    dim = data.get("dim")
+    if dim is not None and not isinstance(dim, int):
+        return jsonify({"error": "dim must be an integer"}), 400
+    return service.create_collection(name, model_name=data.get("model_name"), dim=dim, profile=data.get("profile"))
+
+
+@qdrant_bp.route("/collection_config", methods=["GET"])
+@swag_from({
+    'tags': ['Qdrant Collection'],
+    'summary': 'Effective performance settings of a collection',
+    'description': 'Quantization, HNSW, on-disk and indexing settings as Qdrant reports them ("effective", with the '
+                   'full "config"), plus the profile and search params stored when the collection was created.',
+    'parameters': [
+        {'name': 'collection', 'in': 'query', 'type': 'string', 'required': True}
+    ],
+    'responses': {
+        200: {
+            'description': 'Collection configuration',
+            'examples': {
+                'application/json': {
+                    'collection': 'CustomAi', 'status': 'green', 'points_count': 1200, 'indexed_vectors_count': 0,
+                    'effective': {
+                        'size': 768, 'distance': 'Cosine', 'vectors_on_disk': True, 'payload_on_disk': True,
+                        'hnsw': {'m': 16, 'ef_construct': 100, 'on_disk': False},
+                        'quantization': {'type': 'scalar', 'quantile': 0.99, 'always_ram': True},
+                        'indexing_threshold': 20000
+                    },
+                    'search_params': {'quantization': {'rescore': True, 'oversampling': 2.0}}
+                }
+            }
+        },
+        404: {'description': 'Collection not found'}
+    }
+})
+def collection_config():
+    collection = request.args.get("collection")
+    if not collection:
+        return jsonify({"error": "collection is required"}), 400
+    result, status = service.get_collection_config(collection)
+    return jsonify(result), status
+
+
+@qdrant_bp.route("/collection_embedding", methods=["GET"])
+@swag_from({
+    'tags': ['Qdrant Collection'],
+    'summary': 'Embedding model of a collection',
+    'description': 'Returns the model and vector dimension used for every insert, update and search on the collection. '
+                   'Collections created before this was recorded use EMBEDDING_MODEL_NAME at its native size (registered=false).',
+    'parameters': [
+        {'name': 'collection', 'in': 'query', 'type': 'string', 'required': True}
+    ],
+    'responses': {
+        200: {
+            'description': 'Embedding settings',
+            'examples': {
+                'application/json': {'collection': 'CustomAi', 'model_name': 'sentence-transformers/all-mpnet-base-v2',
+                                     'dim': 768, 'registered': True}
+            }
+        }
+    }
+})
+def collection_embedding():
+    collection = request.args.get("collection")
+    if not collection:
+        return jsonify({"error": "collection is required"}), 400
+    return jsonify(service.get_collection_embedding(collection)), 200
 
 @qdrant_bp.route("/insert_Q&A", methods=["POST"])
 @swag_from({
@@ -73,6 +169,13 @@ def create():
             'required': True,
             'description': 'Payload.Answer'
         },
+        {
+            'name': 'deterministic_id',
+            'in': 'query',
+            'type': 'boolean',
+            'required': False,
+            'description': 'Derive the point id from collection + normalized question, so re-inserting overwrites'
+        },
     ],
     'responses': {
         200: {
@@ -113,7 +216,8 @@ def insert():
         "collection": collection,
         "question": question,
         "answer": answer,
-        "question_vector": question_vector
+        "question_vector": question_vector,
+        "deterministic_id": _bool_arg("deterministic_id")
     }
 
     print("insertion data : ",data)
@@ -123,7 +227,12 @@ def insert():
 @swag_from({
     'tags': ['Qdrant Collection'],
     'summary': 'Search the questions and get top matched answer(s)',
-    'description': 'Uses vector similarity to search a question and return the most relevant answer from the collection.',
+    'description': 'Uses vector similarity to search a question and return the most relevant answer from the collection. '
+                   'With ?stream=sse (or Accept: text/event-stream) the matched points are sent first as a "points" event, '
+                   'then the answer as "token" events while Gemini generates it, and finally a "done" event. '
+                   'answer_source tells which path produced the answer: "cache" (near-identical question answered before), '
+                   '"direct" (stored answer of a top hit above the collection\'s DIRECT_ANSWER_THRESHOLD) or "llm" (Gemini). '
+                   'For "llm" answers, context reports how many points were packed into the prompt and the estimated tokens sent.',
     'parameters': [
         {
             'name': 'text',
@@ -133,9 +242,19 @@ def insert():
                 'type': 'object',
                 'properties': {
                     'query': {'type': 'string'},
-                    'collection': {'type': 'string'}
+                    'collection': {'type': 'string'},
+                    'top_k': {'type': 'integer', 'example': 5, 'description': 'Number of matched points to retrieve (default SEARCH_TOP_K)'},
+                    'score_threshold': {'type': 'number', 'example': 0.5, 'description': 'Ignore points scoring below this'}
                 }
             }
+        },
+        {
+            'name': 'stream',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['sse', 'ndjson'],
+            'required': False,
+            'description': 'Stream the answer tokens as they are generated'
         }
     ],
     'responses': {
@@ -156,6 +275,9 @@ def insert():
 def search():
     data = request.get_json()
     print(data)
+    stream_format = resolve_stream_format(request.args.get("stream"), request.accept_mimetypes)
+    if stream_format:
+        return streaming_response(service.search_point_stream(data), stream_format)
     return service.search_point(data)
 
 
@@ -265,10 +387,14 @@ def delete():
     return service.delete_collection(collection_name)
 
 
+@qdrant_bp.route("/getAllQA", methods=["GET"])
 @swag_from({
     'tags': ['Qdrant Collection'],
     'summary': 'Get all questions and answers',
-    'description': 'Fetches all stored question-answer pairs from the specified Qdrant collection.',
+    'description': 'Streams every stored question-answer pair of the collection as NDJSON (or SSE with ?stream=sse): '
+                   'a start event with total_points, one qa event per point and a final summary event. '
+                   'The collection is scrolled page by page without vectors, so memory stays bounded.',
+    'produces': ['application/x-ndjson', 'text/event-stream'],
     'parameters': [
         {
             'name': 'collection',
@@ -277,18 +403,33 @@ def delete():
             'required': False,
             'default': 'CustomAi',
             'description': 'Name of the Qdrant collection'
+        },
+        {
+            'name': 'page_size',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'description': 'Points per scroll request (default QA_LIST_PAGE_SIZE)'
+        },
+        {
+            'name': 'stream',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['ndjson', 'sse'],
+            'required': False,
+            'description': 'Stream format (default ndjson)'
         }
     ],
     'responses': {
         200: {
-            'description': 'List of questions and answers',
+            'description': 'Stream of questions and answers',
             'examples': {
-                'application/json': [
-                    {
-                        "question": "What is AI?",
-                        "answers": ["Artificial Intelligence is..."]
-                    }
-                ]
+                'application/x-ndjson': (
+                    '{"event": "start", "collection": "CustomAi", "total_points": 2}\n'
+                    '{"event": "qa", "id": "5c7f...", "question": "What is AI?", "answer": "Artificial Intelligence is..."}\n'
+                    '{"event": "qa", "id": "9a1b...", "question": "What is ML?", "answer": "Machine learning is..."}\n'
+                    '{"event": "summary", "count": 2, "pages": 1, "elapsed_ms": 8.4}\n'
+                )
             }
         },
         500: {
@@ -298,7 +439,9 @@ def delete():
 })
 def get_all_qa():
     collection = request.args.get("collection", "CustomAi")
-    return service.get_all_questions_answers(collection)
+    page_size = request.args.get("page_size", type=int)
+    stream_format = resolve_stream_format(request.args.get("stream")) or NDJSON
+    return streaming_response(service.iter_all_questions_answers(collection, page_size), stream_format)
 
 @qdrant_bp.route("/deleteQuestionById", methods=["DELETE"])
 @swag_from({
@@ -373,6 +516,36 @@ def delete_question_by_id():
             'required': True,
             'description': 'The name of the Qdrant collection to insert data into'
         },
+        {
+            'name': 'deterministic_ids',
+            'in': 'query',
+            'type': 'boolean',
+            'required': False,
+            'description': 'Derive point ids from collection + normalized question so retries and re-ingestion overwrite instead of duplicating'
+        },
+        {
+            'name': 'batch_size',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'description': 'Points embedded and upserted per batch (default BULK_INSERT_BATCH_SIZE)'
+        },
+        {
+            'name': 'wait',
+            'in': 'query',
+            'type': 'boolean',
+            'required': False,
+            'default': False,
+            'description': 'Ask Qdrant to apply each batch before responding (otherwise batches are only acknowledged)'
+        },
+        {
+            'name': 'stream',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['ndjson', 'sse'],
+            'required': False,
+            'description': 'Stream start/batch/summary progress events instead of one JSON response'
+        },
         {
             'name': 'body',
             'in': 'body',
@@ -397,11 +570,21 @@ def delete_question_by_id():
             'schema': {
                 'type': 'object',
                 'properties': {
+                    'submitted_count': {'type': 'integer', 'example': 11},
+                    'unique_points': {'type': 'integer', 'example': 10},
+                    'duplicates_merged': {'type': 'integer', 'example': 1},
                     'inserted_count': {'type': 'integer', 'example': 10},
-                    'qdrant_response': {'type': 'object', 'example': {"status": {"completed": True}}}
+                    'failed_count': {'type': 'integer', 'example': 0},
+                    'total_batches': {'type': 'integer', 'example': 1},
+                    'failed_batches': {'type': 'integer', 'example': 0},
+                    'batches': {'type': 'array', 'items': {'type': 'object'}, 'example': [
+                        {"batch": 0, "start": 0, "count": 10, "status_code": 200, "status": "acknowledged",
+                         "operation_id": 42, "elapsed_ms": 12.5, "completed": 1, "total_batches": 1, "error": None}
+                    ]}
                 }
             }
         },
+        502: {'description': 'One or more batches failed; see batches[].error'},
         400: {
             'description': 'Invalid request',
             'schema': {
@@ -431,12 +614,134 @@ def bulk_insert():
     if not data or not isinstance(data, list):
         return jsonify({"error": "A list of QA items is required"}), 400
 
+    batch_size = request.args.get("batch_size", type=int)
+    wait = bool(_bool_arg("wait"))
+
+    stream_format = resolve_stream_format(request.args.get("stream"), request.accept_mimetypes)
+    if stream_format:
+        return streaming_response(
+            service.iter_bulk_qa_insert(data, collection_name, _bool_arg("deterministic_ids"), batch_size, wait),
+            stream_format
+        )
+
     try:
-        return service.bulk_qa_insert(data, collection_name)
+        return service.bulk_qa_insert(data, collection_name, deterministic_ids=_bool_arg("deterministic_ids"),
+                                      batch_size=batch_size, wait=wait)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
 
+@qdrant_bp.route("/export_collection", methods=["GET"])
+@swag_from({
+    'tags': ['Qdrant Collection'],
+    'summary': 'Export a collection as a binary snapshot',
+    'description': 'Streams every point (id, payload and vector) scrolled from Qdrant as one file: NDJSON payloads, '
+                   'a contiguous little-endian float32 vector block and a JSON footer with the embedding model, dim '
+                   'and profile. Restore it with /import_collection; nothing is re-embedded.',
+    'produces': ['application/octet-stream'],
+    'parameters': [
+        {'name': 'collection', 'in': 'query', 'type': 'string', 'required': True}
+    ],
+    'responses': {
+        200: {'description': 'Snapshot file (collection.qasnap)'},
+        400: {'description': 'Collection uses named vectors'},
+        404: {'description': 'Collection not found'}
+    }
+})
+def export_collection():
+    collection = request.args.get("collection")
+    if not collection:
+        return jsonify({"error": "collection is required"}), 400
+    result, status = service.export_collection(collection)
+    if status != 200:
+        return jsonify(result), status
+    return Response(
+        stream_with_context(result),
+        mimetype=SNAPSHOT_MIMETYPE,
+        headers={"Content-Disposition": f'attachment; filename="{collection}{SNAPSHOT_EXTENSION}"'}
+    )
+
+
+@qdrant_bp.route("/import_collection", methods=["POST"])
+@swag_from({
+    'tags': ['Qdrant Collection'],
+    'summary': 'Import a collection snapshot',
+    'description': 'Upserts the points of a snapshot from /export_collection with their stored ids and vectors, in '
+                   'pipelined batches; the embedding model is not called. A missing target collection is created '
+                   'with the snapshot\'s model, dim and profile; an existing one must use the same model and dim.',
+    'consumes': ['multipart/form-data'],
+    'parameters': [
+        {'name': 'file', 'in': 'formData', 'type': 'file', 'required': True, 'description': 'Snapshot file'},
+        {
+            'name': 'collection',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Target collection (default: the exported collection\'s name)'
+        },
+        {
+            'name': 'batch_size',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'description': 'Points upserted per batch (default BULK_INSERT_BATCH_SIZE)'
+        },
+        {
+            'name': 'wait',
+            'in': 'query',
+            'type': 'boolean',
+            'required': False,
+            'default': False,
+            'description': 'Ask Qdrant to apply each batch before responding'
+        },
+        {
+            'name': 'stream',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['ndjson', 'sse'],
+            'required': False,
+            'description': 'Stream start/batch/summary progress events instead of one JSON response'
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Snapshot imported',
+            'examples': {
+                'application/json': {
+                    'collection': 'CustomAi_copy', 'created': True, 'inserted_count': 5000, 'failed_count': 0,
+                    'total_batches': 20, 'failed_batches': 0, 'wait': False, 'elapsed_ms': 2140.5, 'batches': []
+                }
+            }
+        },
+        400: {'description': 'Missing file or not a valid snapshot'},
+        409: {'description': 'Target collection uses a different model or dimension'},
+        502: {'description': 'One or more batches failed; see batches[].error'}
+    }
+})
+def import_collection():
+    file = request.files.get("file")
+    if not file:
+        return jsonify({"error": "Snapshot file is required"}), 400
+
+    snapshot_path = spool_snapshot_file(file, SNAPSHOT_SPOOL_DIR)
+    collection = request.args.get("collection")
+    batch_size = request.args.get("batch_size", type=int)
+    wait = bool(_bool_arg("wait"))
+
+    stream_format = resolve_stream_format(request.args.get("stream"), request.accept_mimetypes)
+    if stream_format:
+        return streaming_response(
+            service.iter_import_collection(snapshot_path, collection, batch_size, wait),
+            stream_format
+        )
+
+    try:
+        result, status = service.import_collection(snapshot_path, collection, batch_size=batch_size, wait=wait)
+        return jsonify(result), status
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @qdrant_bp.route("/update_QA", methods=["PUT"])
 @swag_from({
     'tags': ['Qdrant Collection'],
@@ -571,3 +876,73 @@ def get_total_qa():
         return jsonify({"error": str(e)}), 500
 
 
+@qdrant_bp.route("/transport_stats", methods=["GET"])
+@swag_from({
+    'tags': ['Qdrant Collection'],
+    'summary': 'Qdrant transport statistics',
+    'description': 'Returns per-operation call counts, errors, retries and latency (avg/p50/p99) of the pooled Qdrant client.',
+    'responses': {
+        200: {
+            'description': 'Transport statistics',
+            'examples': {
+                'application/json': {
+                    "pool_size": 20,
+                    "max_retries": 3,
+                    "operations": {
+                        "search": {"calls": 1200, "errors": 0, "retries": 2, "avg_ms": 4.1, "p50_ms": 3.2, "p99_ms": 11.8}
+                    }
+                }
+            }
+        }
+    }
+})
+def transport_stats():
+    return jsonify(service.get_transport_stats())
+
+
+@qdrant_bp.route("/cache_stats", methods=["GET"])
+@swag_from({
+    'tags': ['Qdrant Collection'],
+    'summary': 'Search cache statistics',
+    'description': 'Returns counters of the semantic answer cache and the in-process collection replicas used by /search, '
+                   'and of the point-count cache used by /getQAsPaginated. Cached answers and counts of a collection '
+                   'are dropped on every write to it; replicas are updated in place.',
+    'responses': {
+        200: {
+            'description': 'Cache statistics',
+            'examples': {
+                'application/json': {
+                    "answer_cache": {
+                        "collections": {"CustomAi": 42},
+                        "threshold": 0.95,
+                        "max_entries_per_collection": 512,
+                        "ttl_seconds": 600,
+                        "hits": 310,
+                        "misses": 190,
+                        "evictions": 0,
+                        "invalidations": 3,
+                        "hit_rate": 0.62
+                    },
+                    "replicas": {
+                        "collections": {"CustomAi": {"points": 12000, "dim": 768, "age_seconds": 41.3}},
+                        "building": [],
+                        "skipped": {},
+                        "resync_seconds": 300,
+                        "max_staleness_seconds": 600,
+                        "hits": 500,
+                        "misses": 1,
+                        "builds": 1,
+                        "build_errors": 0,
+                        "hit_rate": 0.998
+                    },
+                    "point_counts": {
+                        "size": 1, "max_entries": 1024, "ttl_seconds": 10, "hits": 24, "misses": 3,
+                        "evictions": 0, "expirations": 2, "hit_rate": 0.8889
+                    }
+                }
+            }
+        }
+    }
+})
+def cache_stats():
+    return jsonify(service.get_cache_stats())
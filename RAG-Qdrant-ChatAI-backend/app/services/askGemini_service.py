@@ -3,6 +3,8 @@ import requests
 import os
 from dotenv import load_dotenv
 from app.interfaces.askGemini_interface import GeminiInterface
+from helpers.stream_helper import SSEDecoder, gemini_chunk_texts
+from config import GEMINI_STREAM_URL
 
 load_dotenv()
 
@@ -10,6 +12,7 @@ class GeminiService(GeminiInterface):
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
         self.url =  os.getenv("GEMINI_URL")
+        self.stream_url = GEMINI_STREAM_URL
 
     def ask(self, question: str) -> dict:
         headers = {
@@ -26,3 +29,29 @@ class GeminiService(GeminiInterface):
 
         answer_text = data["candidates"][0]["content"]["parts"][0]["text"]
         return {"question": question, "answer": answer_text}
+
+    def ask_stream(self, question: str):
+        """
+        Call Gemini's streamGenerateContent endpoint (alt=sse) and yield the
+        answer text piece by piece as it is generated.
+        """
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream",
+            "X-goog-api-key": self.api_key
+        }
+        payload = {"contents": [{"parts": [{"text": question}]}]}
+
+        with requests.post(self.stream_url, headers=headers, json=payload, stream=True, timeout=60) as response:
+            if response.status_code != 200:
+                raise Exception(f"Gemini API error: {response.text}")
+
+            decoder = SSEDecoder()
+            # SSE is always UTF-8; requests would decode text/* without a charset as ISO-8859-1
+            for raw_line in response.iter_lines():
+                data = decoder.feed(raw_line.decode("utf-8"))
+                if data:
+                    yield from gemini_chunk_texts(data)
+            data = decoder.flush()
+            if data:
+                yield from gemini_chunk_texts(data)
@@ -0,0 +1,162 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Tuple
+import aiohttp
+from app.services.qdrant_service import QdrantService, answer_cache
+from helpers.async_http_helper import AsyncQdrantTransport, AsyncGeminiClient
+from helpers.get_humanLike_answer_helper import prepare_human_like_prompt
+from helpers.search_response_helper import (
+    cache_hit_events,
+    cache_hit_response,
+    direct_answer_events,
+    direct_answer_response,
+    error_event,
+    llm_answer_response,
+    llm_done_event,
+    no_points_event,
+    no_points_response,
+    points_event,
+    search_failed_event,
+    search_failed_response,
+    token_event,
+)
+from config import ASYNC_EMBED_WORKERS
+
+
+class AsyncSearchService:
+    """
+    Async variant of QdrantService.search_point / search_point_stream. Qdrant and
+    Gemini are called over a shared aiohttp session; embedding, replica top-k and
+    registry lookups (CPU-bound or blocking) run in a small thread pool. Only the
+    awaiting lives here: the cache, replica, direct-answer and prompt decisions are
+    QdrantService methods and the bodies come from search_response_helper, so
+    both paths answer alike.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, qdrant_service: QdrantService = None):
+        self.qdrant_service = qdrant_service or QdrantService()
+        self.qdrant = AsyncQdrantTransport(session)
+        self.gemini = AsyncGeminiClient(session)
+        # Concurrent encodes still meet in the micro-batcher
+        self.executor = ThreadPoolExecutor(max_workers=max(1, ASYNC_EMBED_WORKERS), thread_name_prefix="async-embed")
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_cpu(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    def _embed_sync(self, collection: str, query: str) -> list:
+        # _embedder may hit the SQLite registry, so it runs in the pool along with the encode
+        return self.qdrant_service._embedder(collection).get_embedding(query)
+
+    async def _embed(self, collection: str, query: str) -> list:
+        return await self._run_cpu(self._embed_sync, collection, query)
+
+    async def _search_points(self, collection: str, vector: list, top_k: int, score_threshold: float) -> tuple:
+        """Return (status, points or error details, source) from the replica when fresh, else Qdrant."""
+        service = self.qdrant_service
+        points = await self._run_cpu(service._replica_points, collection, vector, top_k, score_threshold)
+        if points is not None:
+            return 200, points, "replica"
+        # Reads the collection's profile from the registry: keep it off the event loop
+        payload = await self._run_cpu(service._search_payload, collection, vector, top_k, score_threshold)
+        status, body = await self.qdrant.post(f"/collections/{collection}/points/search", op="search",
+                                              json=payload, idempotent=True)
+        return service._qdrant_search_result(status, body)
+
+    async def search_point(self, data: Dict[str, Any]) -> Tuple[dict, int]:
+        """Same request body and response as QdrantService.search_point. Returns (body, status)."""
+        service = self.qdrant_service
+        try:
+            collection = data["collection"]
+            query = data["query"]
+            try:
+                top_k, score_threshold = service._search_params(data)
+            except ValueError as e:
+                return {"error": str(e)}, 400
+            search_params = (top_k, score_threshold)
+
+            vector = await self._embed(collection, query)
+
+            cached = service._cached_answer(collection, vector, search_params)
+            if cached:
+                return cache_hit_response(query, cached), 200
+            generation = answer_cache.generation(collection)
+
+            status, result, source = await self._search_points(collection, vector, top_k, score_threshold)
+            if status != 200:
+                return search_failed_response(result), status
+
+            qdrant_points = result
+            if not qdrant_points:
+                return no_points_response(query), 200
+
+            direct = service._direct_answer_or_rephrase(collection, vector, query, qdrant_points, generation,
+                                                        search_params)
+            if direct:
+                return direct_answer_response(query, qdrant_points, source, direct), 200
+
+            prompt, context = prepare_human_like_prompt(query, qdrant_points)
+            # Cancelled here when the client disconnects; the Gemini connection is dropped with it
+            result = await self.gemini.ask(prompt)
+            service._store_answer(collection, vector, query, result["answer"], qdrant_points, generation,
+                                  search_params)
+            return llm_answer_response(query, result["answer"], qdrant_points, source, context), 200
+
+        except Exception as e:
+            return {"error": str(e)}, 500
+
+    async def search_point_stream(self, data: Dict[str, Any]) -> AsyncIterator[dict]:
+        """Same events as QdrantService.search_point_stream. Closing the generator aborts the Gemini stream."""
+        service = self.qdrant_service
+        try:
+            collection = data["collection"]
+            query = data["query"]
+            top_k, score_threshold = service._search_params(data)
+            search_params = (top_k, score_threshold)
+
+            vector = await self._embed(collection, query)
+
+            cached = service._cached_answer(collection, vector, search_params)
+            if cached:
+                for event in cache_hit_events(query, cached):
+                    yield event
+                return
+            generation = answer_cache.generation(collection)
+
+            status, result, source = await self._search_points(collection, vector, top_k, score_threshold)
+            if status != 200:
+                yield search_failed_event(result)
+                return
+
+            qdrant_points = result
+            yield points_event(query, qdrant_points, source)
+
+            if not qdrant_points:
+                yield no_points_event(query)
+                return
+
+            direct = service._direct_answer_or_rephrase(collection, vector, query, qdrant_points, generation,
+                                                        search_params)
+            if direct:
+                for event in direct_answer_events(query, direct):
+                    yield event
+                return
+
+            prompt, context = prepare_human_like_prompt(query, qdrant_points)
+            answer_parts = []
+            tokens = self.gemini.ask_stream(prompt)
+            try:
+                async for text in tokens:
+                    answer_parts.append(text)
+                    yield token_event(text)
+            finally:
+                await tokens.aclose()
+
+            answer = "".join(answer_parts)
+            service._store_answer(collection, vector, query, answer, qdrant_points, generation, search_params)
+            yield llm_done_event(query, answer, context)
+
+        except Exception as e:
+            yield error_event(str(e))
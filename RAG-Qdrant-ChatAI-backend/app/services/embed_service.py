@@ -1,11 +1,88 @@
-from sentence_transformers import SentenceTransformer
+import re
+import numpy as np
+from typing import Dict, List, Optional, Tuple
 from app.interfaces.embed_interface import EmbedInterface
+from helpers.embedding_model_helper import get_embedding_model, encode_texts, loaded_models, truncate_embeddings
+from helpers.embedding_batcher_helper import get_batcher, batcher_stats
+from helpers.cache_helper import LRUTTLCache
+from config import (
+    EMBEDDING_MODEL_NAME,
+    EMBED_CACHE_MAX_ENTRIES,
+    EMBED_CACHE_TTL_SECONDS,
+    EMBED_BATCHING_ENABLED,
+    EMBEDDING_BACKEND,
+    EMBEDDING_PRECISION,
+)
+
+# Shared by every EmbedService instance in the process
+_query_cache = LRUTTLCache(max_entries=EMBED_CACHE_MAX_ENTRIES, ttl_seconds=EMBED_CACHE_TTL_SECONDS)
+
+
+_services: Dict[Tuple[str, Optional[int]], "EmbedService"] = {}
+
+
+def get_embed_service(model_name: str = EMBEDDING_MODEL_NAME, dim: Optional[int] = None) -> "EmbedService":
+    """Shared EmbedService for a (model, dimension) pair."""
+    key = (model_name, dim)
+    service = _services.get(key)
+    if service is None:
+        service = _services.setdefault(key, EmbedService(model_name, dim))
+    return service
+
+
+def normalize_query_text(text: str) -> str:
+    """Collapse whitespace so trivially different queries share a cache entry."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
 
 class EmbedService(EmbedInterface):
-    def __init__(self):
-        # Using all-mpnet-base-v2 for balanced performance + accuracy
-        self.model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, dim: Optional[int] = None):
+        # Using all-mpnet-base-v2 for balanced performance + accuracy.
+        # The model itself lives in the shared registry and is loaded on first use.
+        self.model_name = model_name
+        # Optional Matryoshka truncation of the model's output
+        self.dim = dim
+
+    @property
+    def model(self):
+        return get_embedding_model(self.model_name)
 
     def get_embedding(self, text: str):
-        # Normalize embeddings for better semantic search consistency
-        return self.model.encode(text, normalize_embeddings=True).tolist()
+        text = normalize_query_text(text)
+        key = (self.model_name, self.dim, text)
+
+        cached = _query_cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        # Normalization settings come from the registry so every path matches
+        vector = self._encode([text])[0].tolist()
+        _query_cache.set(key, vector)
+        return list(vector)
+
+    def get_embeddings(self, texts: List[str]):
+        """
+        Encode many texts in one batched encode call. Returns a float32 matrix.
+        A client batch is already batched, so it skips the micro-batcher (which
+        is for single queries) instead of being cut into EMBED_BATCH_MAX_SIZE passes.
+        """
+        texts = [normalize_query_text(t) for t in texts]
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.asarray(encode_texts(texts, self.model_name, dim=self.dim), dtype=np.float32)
+
+    def _encode(self, texts):
+        """Encode through the micro-batcher so concurrent callers share a forward pass."""
+        if EMBED_BATCHING_ENABLED:
+            return truncate_embeddings(get_batcher(self.model_name).encode(texts), self.dim)
+        return encode_texts(texts, self.model_name, dim=self.dim)
+
+    def stats(self) -> dict:
+        return {
+            "backend": EMBEDDING_BACKEND,
+            "precision": EMBEDDING_PRECISION,
+            "loaded_models": loaded_models(),
+            "cache": _query_cache.stats(),
+            "batching_enabled": EMBED_BATCHING_ENABLED,
+            "batchers": batcher_stats()
+        }
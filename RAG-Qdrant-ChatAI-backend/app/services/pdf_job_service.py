@@ -0,0 +1,211 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from app.interfaces.pdf_job_interface import PDFJobInterface
+from app.services.pdf_service import PDFService
+from helpers.job_store_helper import (
+    PDFJobStore,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_CANCEL_REQUESTED,
+    JOB_CANCELLED,
+    CHUNK_DONE,
+    CHUNK_ERROR,
+)
+from logger import log_line
+from config import (
+    PDF_JOB_DB_PATH,
+    PDF_JOB_SPOOL_DIR,
+    PDF_JOB_WORKERS,
+    PDF_JOB_STALE_SECONDS,
+    PDF_JOB_HEARTBEAT_SECONDS,
+)
+
+
+class PDFJobService(PDFJobInterface):
+    """
+    Runs PDF Q&A extraction as background jobs so /upload can return at once.
+    Job state and per-chunk results are kept in SQLite. Each process
+    heartbeats the jobs it runs and periodically sweeps jobs whose worker died
+    back into the queue, where they resume (skipping finished chunks).
+    """
+
+    def __init__(self, pdf_service: PDFService = None):
+        self.pdf_service = pdf_service or PDFService()
+        self.store = PDFJobStore(PDF_JOB_DB_PATH)
+        os.makedirs(PDF_JOB_SPOOL_DIR, exist_ok=True)
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        # Jobs scheduled on / being run by this process's pool
+        self._scheduled = set()
+        self._running = set()
+        self._jobs_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Create the worker pool and job monitor for this process and resume pending jobs."""
+        # Threads do not survive fork, so every worker process gets its own pool
+        if self._pool is not None and self._pool_pid == os.getpid():
+            return
+        with self._pool_lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                return
+            self._pool = ThreadPoolExecutor(max_workers=PDF_JOB_WORKERS, thread_name_prefix="pdf-job")
+            self._pool_pid = os.getpid()
+            with self._jobs_lock:
+                self._scheduled, self._running = set(), set()
+            threading.Thread(target=self._monitor, name="pdf-job-monitor", daemon=True).start()
+
+        self._sweep()
+
+    def _monitor(self) -> None:
+        # Heartbeat covers long extractions that have not finished a chunk yet
+        while True:
+            time.sleep(PDF_JOB_HEARTBEAT_SECONDS)
+            try:
+                with self._jobs_lock:
+                    running = list(self._running)
+                self.store.heartbeat_jobs(running)
+                self._sweep()
+            except Exception as e:
+                print(f"PDF job monitor error: {e}")
+
+    def _sweep(self) -> None:
+        """Requeue jobs whose worker stopped heartbeating and schedule every queued job."""
+        requeued = self.store.requeue_stale_jobs(PDF_JOB_STALE_SECONDS)
+        if requeued:
+            print(f"Requeued {requeued} interrupted PDF job(s)")
+        for job_id in self.store.list_job_ids(JOB_QUEUED):
+            self._schedule(job_id)
+
+    def _schedule(self, job_id: str) -> None:
+        with self._jobs_lock:
+            if job_id in self._scheduled:
+                return
+            self._scheduled.add(job_id)
+        self._pool.submit(self._run_job, job_id)
+
+    def submit(self, file) -> dict:
+        """Spool the upload to disk, record a queued job and schedule it."""
+        if not file.filename.lower().endswith(".pdf"):
+            raise ValueError("Only PDF allowed")
+
+        self.start()
+        job_id = str(uuid.uuid4())
+        file_path = os.path.join(PDF_JOB_SPOOL_DIR, f"{job_id}.pdf")
+        with open(file_path, "wb") as out:
+            shutil.copyfileobj(file.stream, out)
+
+        self.store.create_job(job_id, file.filename, file_path)
+        self._schedule(job_id)
+        return {"job_id": job_id, "status": JOB_QUEUED}
+
+    def get_status(self, job_id: str):
+        job = self.store.get_job(job_id)
+        if job is None:
+            return None
+        return {
+            "job_id": job["id"],
+            "filename": job["filename"],
+            "status": job["status"],
+            "error": job["error"],
+            "total_chunks": job["total_chunks"],
+            "completed_chunks": job["completed_chunks"],
+            "total_qa_generated": job["total_qa_generated"],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"]
+        }
+
+    def get_result(self, job_id: str):
+        status = self.get_status(job_id)
+        if status is None:
+            return None
+
+        qa_pairs, failed_chunks = [], []
+        for chunk in self.store.get_chunks(job_id):
+            if chunk["status"] == CHUNK_DONE:
+                qa_pairs.extend(chunk["qa_pairs"])
+            else:
+                failed_chunks.append({"index": chunk["chunk_index"], "heading": chunk["heading"], "error": chunk["error"]})
+
+        return {
+            **status,
+            "qa_pairs": qa_pairs,
+            "failed_chunks": failed_chunks
+        }
+
+    def cancel(self, job_id: str):
+        new_status = self.store.request_cancel(job_id)
+        if new_status is None:
+            return None
+        if new_status == JOB_CANCELLED:
+            self._remove_spooled_file(self.store.get_job(job_id)["file_path"])
+        return {"job_id": job_id, "status": new_status}
+
+    def _run_job(self, job_id: str) -> None:
+        try:
+            # Another worker (or an earlier submit) may already own it
+            if not self.store.claim_job(job_id):
+                return
+            with self._jobs_lock:
+                self._running.add(job_id)
+            self._process_job(job_id)
+        finally:
+            with self._jobs_lock:
+                self._scheduled.discard(job_id)
+                self._running.discard(job_id)
+
+    def _process_job(self, job_id: str) -> None:
+        job = self.store.get_job(job_id)
+        try:
+            chunks = self.pdf_service.prepare_chunks_from_path(job["file_path"])
+            self.store.update_job(job_id, total_chunks=len(chunks))
+
+            # Skip chunks finished before a restart
+            done = self.store.completed_chunk_indexes(job_id)
+            pending = [index for index in range(len(chunks)) if index not in done]
+
+            events = self.pdf_service.iter_process_chunks([chunks[index] for index in pending])
+            try:
+                for event in events:
+                    if event["event"] == "chunk":
+                        self.store.save_chunk(job_id, pending[event["index"]], event["heading"], CHUNK_DONE,
+                                              qa_pairs=event["qa_pairs"])
+                    elif event["event"] == "chunk_error":
+                        self.store.save_chunk(job_id, pending[event["index"]], event["heading"], CHUNK_ERROR,
+                                              error=event["error"])
+                    else:
+                        continue
+
+                    current = self.store.get_job(job_id)["status"]
+                    if current == JOB_CANCEL_REQUESTED:
+                        self.store.finish_job(job_id, JOB_CANCELLED)
+                        self._remove_spooled_file(job["file_path"])
+                        return
+                    if current != JOB_RUNNING:
+                        return
+            finally:
+                # Stops queued chunk calls if we leave early
+                events.close()
+
+            if chunks and not self.store.completed_chunk_indexes(job_id):
+                self.store.finish_job(job_id, JOB_FAILED, error=f"All {len(chunks)} chunk(s) failed")
+            else:
+                self.store.finish_job(job_id, JOB_COMPLETED)
+            self._remove_spooled_file(job["file_path"])
+
+        except Exception as e:
+            log_line({"error": str(e), "job_id": job_id})
+            self.store.finish_job(job_id, JOB_FAILED, error=str(e))
+            self._remove_spooled_file(job["file_path"])
+
+    def _remove_spooled_file(self, file_path: str) -> None:
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
@@ -1,59 +1,155 @@
+import os
 from app.interfaces.pdf_interface import PDFInterface
 from helpers.pdf_helper import (
-    validate_pdf_file,
+    spool_pdf_file,
     extract_text_from_pdf,
-    chunk_pdf_text,
+    build_chunks,
     build_gemini_prompt,
     call_gemini_api,
     parse_gemini_response,
+    is_cacheable_gemini_result,
+    PROMPT_TEMPLATE_VERSION,
 )
+from helpers.chunk_cache_helper import ChunkResultCache, chunk_cache_key
 from logger import log_line
+from config import PDF_MAX_CONCURRENT_CHUNKS, CHUNK_CACHE_ENABLED, CHUNK_CACHE_PATH
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 
 class PDFService(PDFInterface):
+    def __init__(self):
+        # Unchanged chunks of re-uploaded PDFs are served from here instead of Gemini
+        self.chunk_cache = ChunkResultCache(CHUNK_CACHE_PATH) if CHUNK_CACHE_ENABLED else None
+
     def process_pdf(self, file) -> dict:
         """
         Process a PDF and extract Q&A pairs (without vectorization).
         These Q&As can later be sent for admin approval before vectorization.
         """
-        pdf_bytes = validate_pdf_file(file)
-        full_text = extract_text_from_pdf(pdf_bytes)
-        chunks = chunk_pdf_text(full_text)
+        chunks = self.prepare_chunks(file)
 
-        if not chunks:
-            raise Exception("No content extracted from PDF")
+        # Events arrive in completion order; re-assemble in chunk order so the
+        # output stays deterministic
+        results_by_index = {}
+        cache_hits = 0
+        for event in self.iter_process_chunks(chunks):
+            if event["event"] == "chunk":
+                results_by_index[event["index"]] = event["qa_pairs"]
+            elif event["event"] == "summary":
+                cache_hits = event["cache_hits"]
 
         qa_results = []
-
-        print(f"Processing {len(chunks)} chunks from PDF...")
-        print(" ")
-
-        for chunk in chunks:
-            try:
-                print("processing chunk with heading:", chunk.get("heading"))
-                prompt = build_gemini_prompt(chunk["text"])
-                print(" ")
-
-                print("prompt built, calling Gemini API...")
-                status, raw_text, data = call_gemini_api(prompt)
-                print(" ")
-
-                print("Gemini API call complete, parsing response...")
-                qa_list = parse_gemini_response(data, raw_text, chunk["text"])
-                print(" ")
-
-                print(f"Extracted {len(qa_list)} Q&A pairs")
-                qa_results.extend(qa_list)
-
-            except Exception as e:
-                log_line({"error": str(e), "chunk_heading": chunk.get("heading")})
-                continue
+        for index in sorted(results_by_index):
+            qa_results.extend(results_by_index[index])
 
         final_output = {
             "total_chunks": len(chunks),
             "total_qa_generated": len(qa_results),
+            "cache_hits": cache_hits,
             "qa_results": qa_results   # <-- clean JSON without vectors
         }
 
         log_line({"message": "PDF processing complete", "summary": qa_results})
         return final_output
+
+    def prepare_chunks(self, file) -> list:
+        """Validate the upload, extract its text and split it into chunks."""
+        pdf_path = spool_pdf_file(file)
+        try:
+            return self.prepare_chunks_from_path(pdf_path)
+        finally:
+            os.remove(pdf_path)
+
+    def prepare_chunks_from_path(self, pdf_path: str) -> list:
+        """Extract text from a PDF already on disk and split it into chunks."""
+        full_text = extract_text_from_pdf(pdf_path)
+        chunks = build_chunks(full_text)
+
+        if not chunks:
+            raise Exception("No content extracted from PDF")
+        return chunks
+
+    def iter_process_chunks(self, chunks: list):
+        """
+        Send chunks to Gemini with bounded concurrency and yield one event per
+        chunk as soon as it is parsed, then a final summary event:
+            {"event": "start", "total_chunks"}
+            {"event": "chunk", "index", "heading", "headings", "completed", "total_chunks", "cached", "qa_pairs"}
+            {"event": "chunk_error", "index", "heading", "completed", "total_chunks", "error"}
+            {"event": "summary", "message", "total_chunks", "total_qa_generated", "cache_hits"}
+        """
+        total_chunks = len(chunks)
+        print(f"Processing {total_chunks} chunks from PDF...")
+        print(" ")
+        yield {"event": "start", "total_chunks": total_chunks}
+
+        # Chunks are independent, so run up to PDF_MAX_CONCURRENT_CHUNKS Gemini calls at once
+        max_workers = max(1, min(PDF_MAX_CONCURRENT_CHUNKS, total_chunks))
+        pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pdf-chunk")
+        total_qa, completed, cache_hits = 0, 0, 0
+        try:
+            futures = {pool.submit(self._process_chunk, chunk): index for index, chunk in enumerate(chunks)}
+
+            for future in as_completed(futures):
+                index = futures[future]
+                heading = chunks[index].get("heading")
+                completed += 1
+                try:
+                    qa_list, cached = future.result()
+                except Exception as e:
+                    log_line({"error": str(e), "chunk_heading": heading})
+                    yield {
+                        "event": "chunk_error",
+                        "index": index,
+                        "heading": heading,
+                        "completed": completed,
+                        "total_chunks": total_chunks,
+                        "error": str(e)
+                    }
+                    continue
+
+                total_qa += len(qa_list)
+                cache_hits += int(cached)
+                yield {
+                    "event": "chunk",
+                    "index": index,
+                    "heading": heading,
+                    "headings": chunks[index].get("headings", [heading]),
+                    "completed": completed,
+                    "total_chunks": total_chunks,
+                    "cached": cached,
+                    "qa_pairs": qa_list
+                }
+        finally:
+            # If the consumer stops early (e.g. client disconnect) drop queued chunks
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        yield {
+            "event": "summary",
+            "message": "Processing complete",
+            "total_chunks": total_chunks,
+            "total_qa_generated": total_qa,
+            "cache_hits": cache_hits
+        }
+
+    def _process_chunk(self, chunk) -> tuple:
+        """Return (qa_pairs, served_from_cache) for one chunk, calling Gemini only on a cache miss."""
+        key = chunk_cache_key(chunk["text"], PROMPT_TEMPLATE_VERSION)
+        if self.chunk_cache is not None:
+            cached = self.chunk_cache.get(key)
+            if cached is not None:
+                print("chunk served from cache:", chunk.get("heading"))
+                return cached, True
+
+        print("processing chunk with heading:", chunk.get("heading"))
+        prompt = build_gemini_prompt(chunk["text"])
+
+        status, raw_text, data = call_gemini_api(prompt)
+
+        qa_list = parse_gemini_response(data, raw_text, chunk["text"])
+        print(f"Extracted {len(qa_list)} Q&A pairs from chunk:", chunk.get("heading"))
+
+        # Only keep real extractions; errors and raw-text fallbacks are retried next time
+        if self.chunk_cache is not None and is_cacheable_gemini_result(status, qa_list, chunk["text"]):
+            self.chunk_cache.set(key, qa_list)
+        return qa_list, False
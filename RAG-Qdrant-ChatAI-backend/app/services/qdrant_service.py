@@ -1,43 +1,216 @@
 from typing import Dict, Any ,List
-import requests
-import uuid
 import json
 from flask import Response
 from flask import jsonify
-from app.services.embed_service import EmbedService
-from config import QDRANT_HOST
+from app.services.embed_service import get_embed_service
 from app.interfaces.qdrant_interface import QdrantInterface
 from logger import log_line
-from helpers.get_humanLike_answer_helper import get_human_like_answer
+from helpers.get_humanLike_answer_helper import get_human_like_answer, stream_human_like_answer
 from app.services.askGemini_service import GeminiService
 from helpers.pdf_helper import vectorize_qa_list
+from helpers.embedding_model_helper import encode_texts, embedding_dimension, get_embedding_model
+from helpers.collection_registry_helper import CollectionRegistry
+from helpers.collection_profile_helper import (
+    DISTANCES,
+    resolve_profile,
+    build_collection_payload,
+    build_search_params,
+    summarize_collection_config,
+)
+from helpers.qdrant_transport_helper import get_qdrant_transport
+from helpers.answer_cache_helper import SemanticAnswerCache
+from helpers.cache_helper import LRUTTLCache
+from helpers.point_id_helper import make_point_id
+from helpers.replica_helper import ReplicaManager
+from helpers.snapshot_helper import iter_snapshot_bytes, read_snapshot_footer, iter_snapshot_batches
+from helpers.search_response_helper import (
+    cache_hit_events,
+    cache_hit_response,
+    direct_answer_events,
+    direct_answer_response,
+    error_event,
+    llm_answer_response,
+    llm_done_event,
+    no_points_event,
+    no_points_response,
+    points_event,
+    search_failed_event,
+    search_failed_response,
+    token_event,
+)
+from config import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_TTL_SECONDS,
+    QDRANT_DETERMINISTIC_IDS,
+    BULK_INSERT_BATCH_SIZE,
+    BULK_INSERT_MAX_IN_FLIGHT,
+    REPLICA_ENABLED,
+    REPLICA_COLLECTIONS,
+    REPLICA_MAX_POINTS,
+    REPLICA_RESYNC_SECONDS,
+    REPLICA_MAX_STALENESS_SECONDS,
+    DIRECT_ANSWER_THRESHOLD,
+    DIRECT_ANSWER_THRESHOLDS,
+    DIRECT_ANSWER_REPHRASE,
+    SEARCH_TOP_K,
+    SEARCH_MAX_TOP_K,
+    SEARCH_SCORE_THRESHOLD,
+    EMBEDDING_MODEL_NAME,
+    COLLECTION_REGISTRY_PATH,
+    COLLECTION_DEFAULT_PROFILE,
+    SNAPSHOT_PAGE_SIZE,
+    SNAPSHOT_SPOOL_DIR,
+    POINT_COUNT_CACHE_TTL_SECONDS,
+    QA_LIST_PAGE_SIZE,
+)
 import traceback
 import math
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+embed_service = get_embed_service()
+collection_registry = CollectionRegistry(COLLECTION_REGISTRY_PATH)
+answer_cache = SemanticAnswerCache(
+    threshold=ANSWER_CACHE_THRESHOLD,
+    max_entries=ANSWER_CACHE_MAX_ENTRIES,
+    ttl_seconds=ANSWER_CACHE_TTL_SECONDS
+)
+# Collection point counts for pagination totals; dropped on every write
+point_count_cache = LRUTTLCache(max_entries=1024, ttl_seconds=POINT_COUNT_CACHE_TTL_SECONDS)
+replica_manager = ReplicaManager(
+    get_qdrant_transport(),
+    collections=REPLICA_COLLECTIONS,
+    max_points=REPLICA_MAX_POINTS,
+    resync_seconds=REPLICA_RESYNC_SECONDS,
+    max_staleness_seconds=REPLICA_MAX_STALENESS_SECONDS
+)
+
+
+def preload_collection_models():
+    """Load the default embedding model and every model a collection was created with."""
+    names = [EMBEDDING_MODEL_NAME] + [entry["model_name"] for entry in collection_registry.list()]
+    for name in dict.fromkeys(names):
+        try:
+            get_embedding_model(name)
+        except Exception as e:
+            print(f"Could not preload embedding model '{name}': {e}")
+
+
+# Background Gemini rephrasing of direct answers (DIRECT_ANSWER_REPHRASE)
+_rephrase_pool = None
+_rephrase_pool_pid = None
+_rephrase_pool_lock = threading.Lock()
+
+
+def _get_rephrase_pool() -> ThreadPoolExecutor:
+    global _rephrase_pool, _rephrase_pool_pid
+    if _rephrase_pool is not None and _rephrase_pool_pid == os.getpid():
+        return _rephrase_pool
+    with _rephrase_pool_lock:
+        if _rephrase_pool is None or _rephrase_pool_pid != os.getpid():
+            _rephrase_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rephrase")
+            _rephrase_pool_pid = os.getpid()
+    return _rephrase_pool
 
-embed_service = EmbedService()
 
 class QdrantService(QdrantInterface):
 
     def __init__(self):
         self.gemini_service = GeminiService()
+        # Pooled, retrying HTTP transport shared by every QdrantService
+        self.qdrant = get_qdrant_transport()
 
-    def create_collection(self, name: str):
-        payload = {
-            "vectors": {
-                "size": 768,
-                "distance": "Cosine"
-            }
-        }
-        r = requests.put(f"{QDRANT_HOST}/collections/{name}", json=payload)
-        return jsonify(r.json()), r.status_code
+    def create_collection(self, name: str, model_name: str = None, dim: int = None, profile=None):
+        """
+        Create a collection for one embedding model. dim defaults to the model's
+        native size; a smaller dim stores Matryoshka-truncated vectors. profile is
+        a preset name or override object (see collection_profile_helper).
+        """
+        try:
+            profile = resolve_profile(profile, COLLECTION_DEFAULT_PROFILE)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        model_name = model_name or EMBEDDING_MODEL_NAME
+        try:
+            native_dim = embedding_dimension(model_name)
+        except Exception as e:
+            return jsonify({"error": f"Could not load embedding model '{model_name}': {e}"}), 400
+        dim = int(dim or native_dim)
+        if not 1 <= dim <= native_dim:
+            return jsonify({"error": f"dim must be between 1 and {native_dim} for '{model_name}'"}), 400
+
+        r = self._put_collection(name, model_name, dim, profile)
+        if not r.ok:
+            return jsonify(r.json()), r.status_code
+        return jsonify({
+            **r.json(),
+            "embedding": {"model_name": model_name, "dim": dim, "native_dim": native_dim},
+            "profile": profile,
+            "search_params": build_search_params(profile)
+        }), r.status_code
+
+    def _put_collection(self, name: str, model_name: str, dim: int, profile: dict, distance: str = "Cosine"):
+        """PUT the collection and, on success, register its embedding settings and profile."""
+        payload = build_collection_payload(dim, profile, distance)
+        # Not retried: a replayed create would fail with "already exists"
+        r = self.qdrant.put(f"/collections/{name}", op="create_collection", json=payload, idempotent=False)
+        self._invalidate_collection(name)
+        replica_manager.drop(name)
+        if r.ok:
+            collection_registry.set(name, model_name, dim, profile)
+        return r
+
+    def get_collection_embedding(self, collection_name: str) -> dict:
+        """Model and dimension used to encode a collection (defaults for collections created before the registry)."""
+        entry = collection_registry.get(collection_name)
+        if entry is None:
+            return {"collection": collection_name, "model_name": EMBEDDING_MODEL_NAME, "dim": None, "registered": False}
+        return {"collection": collection_name, "model_name": entry["model_name"], "dim": entry["dim"], "registered": True}
+
+    def get_collection_config(self, collection_name: str):
+        """Effective storage/index settings as Qdrant reports them, plus the stored profile."""
+        r = self.qdrant.get(f"/collections/{collection_name}", op="collection_info")
+        if r.status_code != 200:
+            return r.json(), r.status_code
+        result = r.json().get("result", {})
+        entry = collection_registry.get(collection_name)
+        profile = entry["profile"] if entry else None
+        return {
+            "collection": collection_name,
+            "status": result.get("status"),
+            "optimizer_status": result.get("optimizer_status"),
+            "points_count": result.get("points_count"),
+            "indexed_vectors_count": result.get("indexed_vectors_count"),
+            "segments_count": result.get("segments_count"),
+            "effective": summarize_collection_config(result.get("config", {})),
+            "profile": profile,
+            "search_params": build_search_params(profile),
+            "config": result.get("config", {})
+        }, 200
+
+    def _embedder(self, collection_name: str):
+        """EmbedService for the collection's own model and dimension."""
+        entry = collection_registry.get(collection_name)
+        if entry is None:
+            return embed_service
+        return get_embed_service(entry["model_name"], entry["dim"])
 
     def insert_point(self, data):
         try:
             collection = data["collection"]
             question = data["question"]
             answer = data["answer"]
-            unique_id = str(uuid.uuid4())
-            vector = embed_service.get_embedding(question)
+            deterministic = data.get("deterministic_id")
+            if deterministic is None:
+                deterministic = QDRANT_DETERMINISTIC_IDS
+            unique_id = make_point_id(collection, question, deterministic)
+            vector = self._embedder(collection).get_embedding(question)
             payload = {
                 "points": [
                     {
@@ -50,14 +223,17 @@ class QdrantService(QdrantInterface):
                     }
                 ]
             }
-            r = requests.put(f"{QDRANT_HOST}/collections/{collection}/points", json=payload)
-            return jsonify(r.json()), r.status_code
+            r = self.qdrant.put(f"/collections/{collection}/points", op="upsert", json=payload)
+            self._invalidate_collection(collection)
+            if r.ok:
+                replica_manager.apply_upsert(collection, payload["points"])
+            return jsonify({**r.json(), "id": unique_id}), r.status_code
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
     def does_collection_exist(self, collection_name: str):
         try:
-            response = requests.get(f"{QDRANT_HOST}/collections/{collection_name}")
+            response = self.qdrant.get(f"/collections/{collection_name}", op="collection_info")
             if response.status_code == 200:
                 return True
             elif response.status_code == 404:
@@ -87,61 +263,174 @@ class QdrantService(QdrantInterface):
         try:
             collection = data["collection"]
             query = data["query"]
+            try:
+                top_k, score_threshold = self._search_params(data)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            # Answers are cached per retrieval setting
+            search_params = (top_k, score_threshold)
 
-            # Step 1: Get vector of user query
-            vector = embed_service.get_embedding(query)
+            # Step 1: Get vector of user query (with the collection's own model)
+            vector = self._embedder(collection).get_embedding(query)
 
-            # Step 2: Search top 5 points from Qdrant
-            payload = {
-                "vector": vector,
-                "top": 5,
-                "with_payload": True
-            }
-            r = requests.post(f"{QDRANT_HOST}/collections/{collection}/points/search", json=payload)
+            # Near-identical question answered recently: skip Qdrant + Gemini
+            cached = self._cached_answer(collection, vector, search_params)
+            if cached:
+                return self._json_response(cache_hit_response(query, cached))
+            generation = answer_cache.generation(collection)
 
-            if r.status_code != 200:
-                return jsonify({"error": "Failed to search points", "details": r.json()}), r.status_code
+            # Step 2: Search top points (local replica when fresh, else Qdrant)
+            status, result, source = self._search_points(collection, vector, top_k, score_threshold)
+
+            if status != 200:
+                return jsonify(search_failed_response(result)), status
 
-            qdrant_points = r.json().get("result", [])
+            qdrant_points = result
 
             # Step 3: Call helper to get human-like answer
             if not qdrant_points:
-                return jsonify({
-                    "user_question": query,
-                    "human_like_answer": "0",
-                    "msg": "No matched points found in Qdrant",
-                    "top_points": []
-                }), 200
+                return jsonify(no_points_response(query)), 200
+
+            # Near-exact match of a curated Q&A: return its stored answer without Gemini
+            direct = self._direct_answer_or_rephrase(collection, vector, query, qdrant_points, generation,
+                                                     search_params)
+            if direct:
+                return self._json_response(direct_answer_response(query, qdrant_points, source, direct))
+
             human_answer = get_human_like_answer(query, qdrant_points, self.gemini_service)
 
             print("DEBUG human_answer:", human_answer)
-            # Step 4: Return both raw Qdrant results and human-like answer
-            data = {
-                "user_question": query,
-                "human_like_answer": human_answer["answer"],
-                "msg": "these are the matched points(questions) from qdrant",
-                "top_points": qdrant_points
-            }
+            self._store_answer(collection, vector, query, human_answer["answer"], qdrant_points, generation,
+                               search_params)
 
-            return Response(json.dumps(data, indent=2, ensure_ascii=False), mimetype="application/json")
+            # Step 4: Return both raw Qdrant results and human-like answer
+            return self._json_response(llm_answer_response(query, human_answer["answer"], qdrant_points, source,
+                                                           human_answer["context"]))
 
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    def search_point_stream(self, data):
+        """
+        Streaming variant of search_point. Yields events instead of one response:
+            {"event": "points", "user_question", "top_points", "search_source"}   (sent first)
+            {"event": "token", "text"}                           (one per Gemini chunk)
+            {"event": "done", "user_question", "human_like_answer", "answer_source", "context"}
+            {"event": "error", "error"}
+        """
+        try:
+            collection = data["collection"]
+            query = data["query"]
+            top_k, score_threshold = self._search_params(data)
+            search_params = (top_k, score_threshold)
+
+            vector = self._embedder(collection).get_embedding(query)
+
+            cached = self._cached_answer(collection, vector, search_params)
+            if cached:
+                yield from cache_hit_events(query, cached)
+                return
+            generation = answer_cache.generation(collection)
+
+            status, result, source = self._search_points(collection, vector, top_k, score_threshold)
+            if status != 200:
+                yield search_failed_event(result)
+                return
+
+            qdrant_points = result
+            yield points_event(query, qdrant_points, source)
+
+            if not qdrant_points:
+                yield no_points_event(query)
+                return
+
+            direct = self._direct_answer_or_rephrase(collection, vector, query, qdrant_points, generation,
+                                                     search_params)
+            if direct:
+                yield from direct_answer_events(query, direct)
+                return
+
+            answer_parts, context = [], {}
+            for text in stream_human_like_answer(query, qdrant_points, self.gemini_service, context=context):
+                answer_parts.append(text)
+                yield token_event(text)
+
+            answer = "".join(answer_parts)
+            self._store_answer(collection, vector, query, answer, qdrant_points, generation, search_params)
+            yield llm_done_event(query, answer, context)
+
+        except Exception as e:
+            yield error_event(str(e))
+
+    @staticmethod
+    def _json_response(data: dict) -> Response:
+        return Response(json.dumps(data, indent=2, ensure_ascii=False), mimetype="application/json")
 
+    def _search_params(self, data: dict) -> tuple:
+        """(top_k, score_threshold) from the request body, falling back to SEARCH_TOP_K / SEARCH_SCORE_THRESHOLD."""
+        top_k = data.get("top_k")
+        top_k = SEARCH_TOP_K if top_k is None else int(top_k)
+        if not 1 <= top_k <= SEARCH_MAX_TOP_K:
+            raise ValueError(f"top_k must be between 1 and {SEARCH_MAX_TOP_K}")
+        score_threshold = data.get("score_threshold")
+        score_threshold = SEARCH_SCORE_THRESHOLD if score_threshold is None else float(score_threshold)
+        return top_k, score_threshold or None
+
+    def _search_points(self, collection: str, vector: list, top_k: int = SEARCH_TOP_K,
+                       score_threshold: float = None) -> tuple:
+        """Return (status, points or error details, source) from the replica when fresh, else Qdrant."""
+        points = self._replica_points(collection, vector, top_k, score_threshold)
+        if points is not None:
+            return 200, points, "replica"
+        r = self._search_qdrant(collection, vector, top_k, score_threshold)
+        return self._qdrant_search_result(r.status_code, r.json())
+
+    def _replica_points(self, collection: str, vector: list, top_k: int, score_threshold: float = None):
+        """Top points from the in-process replica, or None when it is disabled or not fresh enough."""
+        if not REPLICA_ENABLED:
+            return None
+        points = replica_manager.search(collection, vector, top_k)
+        if points is not None and score_threshold is not None:
+            points = [point for point in points if point["score"] >= score_threshold]
+        return points
+
+    @staticmethod
+    def _qdrant_search_result(status: int, body: dict) -> tuple:
+        if status != 200:
+            return status, body, "qdrant"
+        return 200, body.get("result", []), "qdrant"
+
+    def _search_qdrant(self, collection: str, vector: list, top_k: int = SEARCH_TOP_K, score_threshold: float = None):
+        """Run a Qdrant similarity search for the query vector. Returns the raw response."""
+        payload = self._search_payload(collection, vector, top_k, score_threshold)
+        return self.qdrant.post(f"/collections/{collection}/points/search", op="search", json=payload, idempotent=True)
+
+    def _search_payload(self, collection: str, vector: list, top_k: int = SEARCH_TOP_K,
+                        score_threshold: float = None) -> dict:
+        payload = {
+            "vector": vector,
+            "top": top_k,
+            "with_payload": True
+        }
+        if score_threshold is not None:
+            payload["score_threshold"] = score_threshold
+        # Rescoring / oversampling / hnsw_ef from the collection's profile
+        entry = collection_registry.get(collection)
+        params = build_search_params(entry["profile"]) if entry else None
+        if params:
+            payload["params"] = params
+        return payload
 
     def get_questions_answers_paginated(self, collection_name: str, limit: int = 25, offset: str = None):
         try:
-            # 1. Get total number of points in the collection
-            stats_resp = requests.get(f"{QDRANT_HOST}/collections/{collection_name}")
-            if stats_resp.status_code != 200:
+            # 1. Total number of points, cached briefly so paging does not re-fetch collection stats
+            total_points, stats_resp = self._point_count(collection_name)
+            if stats_resp is not None:
                 return jsonify({
                     "error": "Failed to fetch collection stats",
                     "details": stats_resp.json()
                 }), stats_resp.status_code
 
-            total_points = stats_resp.json().get("result", {}).get("points_count", 0)
-
             # 2. Prepare scroll payload
             payload = {
                 "limit": limit,
@@ -152,7 +441,7 @@ class QdrantService(QdrantInterface):
             if offset:
                 payload["offset"] = offset  # for pagination
 
-            r = requests.post(f"{QDRANT_HOST}/collections/{collection_name}/points/scroll", json=payload)
+            r = self.qdrant.post(f"/collections/{collection_name}/points/scroll", op="scroll", json=payload, idempotent=True)
 
             if r.status_code != 200:
                 return jsonify({
@@ -165,17 +454,7 @@ class QdrantService(QdrantInterface):
             next_page_offset = result.get("next_page_offset")  # important for pagination
 
             # 3. Extract Q&A
-            qa_list = []
-            for point in points:
-                payload_data = point.get("payload", {})
-                id = point.get("id")
-                question = payload_data.get("question")
-                answer = payload_data.get("answer")
-                qa_list.append({
-                    "id": id,
-                    "question": question,
-                    "answer": answer
-                })
+            qa_list = [self._qa_item(point) for point in points]
 
             # 4. Response with pagination info
             return jsonify({
@@ -188,15 +467,83 @@ class QdrantService(QdrantInterface):
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
+    def iter_all_questions_answers(self, collection_name: str, page_size: int = None):
+        """
+        Walk the whole collection with points/scroll (payloads only, no vectors), yielding
+            {"event": "start", "collection", "total_points"}
+            {"event": "qa", "id", "question", "answer"}   one per point
+            {"event": "summary", "count", "pages", "elapsed_ms"}
+        or an {"event": "error"} event. Only one scroll page is held in memory at a time.
+        """
+        page_size = max(1, page_size or QA_LIST_PAGE_SIZE)
+        started = time.perf_counter()
+        try:
+            total_points, stats_resp = self._point_count(collection_name)
+            if stats_resp is not None:
+                yield {"event": "error", "error": "Failed to fetch collection stats",
+                       "status_code": stats_resp.status_code}
+                return
+            yield {"event": "start", "collection": collection_name, "total_points": total_points}
+
+            count, pages, offset = 0, 0, None
+            while True:
+                payload = {"limit": page_size, "with_payload": True, "with_vector": False}
+                if offset is not None:
+                    payload["offset"] = offset
+                r = self.qdrant.post(f"/collections/{collection_name}/points/scroll", op="scroll",
+                                     json=payload, idempotent=True)
+                if r.status_code != 200:
+                    yield {"event": "error", "error": "Failed to fetch points", "status_code": r.status_code,
+                           "fetched": count}
+                    return
+                result = r.json().get("result", {})
+                pages += 1
+                for point in result.get("points", []):
+                    count += 1
+                    yield {"event": "qa", **self._qa_item(point)}
+                offset = result.get("next_page_offset")
+                if offset is None:
+                    break
+
+            yield {"event": "summary", "count": count, "pages": pages,
+                   "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)}
+        except Exception as e:
+            yield {"event": "error", "error": str(e)}
+
+    @staticmethod
+    def _qa_item(point: dict) -> dict:
+        payload_data = point.get("payload") or {}
+        return {
+            "id": point.get("id"),
+            "question": payload_data.get("question"),
+            "answer": payload_data.get("answer")
+        }
 
+    def _point_count(self, collection_name: str) -> tuple:
+        """(points_count, None) from the short-lived cache or Qdrant; (None, response) when the stats call fails."""
+        total_points = point_count_cache.get(collection_name)
+        if total_points is not None:
+            return total_points, None
+        stats_resp = self.qdrant.get(f"/collections/{collection_name}", op="collection_info")
+        if stats_resp.status_code != 200:
+            return None, stats_resp
+        total_points = stats_resp.json().get("result", {}).get("points_count") or 0
+        point_count_cache.set(collection_name, total_points)
+        return total_points, None
 
     def delete_collection(self, collection_name: str):
         try:
-            check = requests.get(f"{QDRANT_HOST}/collections/{collection_name}")
-            if check.status_code == 404:
+            # Single round trip: Qdrant answers result=false for an unknown collection
+            response = self.qdrant.delete(f"/collections/{collection_name}", op="delete_collection")
+            self._invalidate_collection(collection_name)
+            replica_manager.drop(collection_name)
+            if response.ok:
+                collection_registry.delete(collection_name)
+            if response.status_code == 404 or (response.ok and response.json().get("result") is False):
                 return jsonify({"error": f"Collection '{collection_name}' not found in QDRANT Collection"}), 404
+            if not response.ok:
+                return jsonify({"error": "Failed to delete collection", "details": response.text}), response.status_code
 
-            response = requests.delete(f"{QDRANT_HOST}/collections/{collection_name}")
             return jsonify({"message": f"Collection '{collection_name}' removed successfully"}), 200
 
         except Exception as e:
@@ -206,8 +553,7 @@ class QdrantService(QdrantInterface):
     def delete_questionById(self, collection_name: str, question_id: str):
         try:
             # 1. Check if the point exists by direct GET
-            check_url = f"{QDRANT_HOST}/collections/{collection_name}/points/{question_id}"
-            check = requests.get(check_url)
+            check = self.qdrant.get(f"/collections/{collection_name}/points/{question_id}", op="get_point")
 
             if check.status_code == 404:
                 return {
@@ -221,11 +567,13 @@ class QdrantService(QdrantInterface):
                 }, check.status_code
 
             # 2. Delete point by id
-            delete_url = f"{QDRANT_HOST}/collections/{collection_name}/points/delete"
             delete_payload = {"points": [question_id]}
-            response = requests.post(delete_url, json=delete_payload)
+            response = self.qdrant.post(f"/collections/{collection_name}/points/delete", op="delete_points",
+                                        json=delete_payload, idempotent=True)
+            self._invalidate_collection(collection_name)
 
             if response.status_code == 200:
+                replica_manager.apply_delete(collection_name, [question_id])
                 return {
                     "message": f"Question with id '{question_id}' deleted successfully from collection '{collection_name}'"
                 }, 200
@@ -240,39 +588,344 @@ class QdrantService(QdrantInterface):
         
 
 
-    def bulk_qa_insert(self, qa_list: list, collection_name: str) -> Any:
-        """Bulk insert multiple Q&A items into a Qdrant collection."""
+    def bulk_qa_insert(self, qa_list: list, collection_name: str, deterministic_ids: bool = None,
+                       batch_size: int = None, wait: bool = False) -> Any:
+        """
+        Bulk insert multiple Q&A items into a Qdrant collection.
+        With deterministic_ids, ids derive from the question, so a retried or
+        repeated batch overwrites its earlier points instead of duplicating them.
+        """
         try:
             if not qa_list:
                 return {"error": "No items provided"}, 400
 
-            enriched_list = vectorize_qa_list(qa_list)
-            points = []
+            batches, summary = [], None
+            for event in self.iter_bulk_qa_insert(qa_list, collection_name, deterministic_ids, batch_size, wait):
+                if event["event"] == "batch":
+                    batches.append(event)
+                elif event["event"] == "summary":
+                    summary = event
 
-            for item in enriched_list:
-                points.append({
-                    "id": str(uuid.uuid4()),
-                    "vector": [float(v) for v in item.get("vector", [])],
-                    "payload": {
-                        "question": item.get("question"),
-                        "answer": item.get("answer")
-                    }
-                })
+            result = {key: value for key, value in summary.items() if key not in ("event", "message")}
+            result["batches"] = [{key: value for key, value in b.items() if key != "event"} for b in batches]
+            return result, 200 if summary["failed_batches"] == 0 else 502
 
-            # Bulk insert all points in one request
-            resp = requests.put(
-                f"{QDRANT_HOST}/collections/{collection_name}/points",
-                json={"points": points}
-            )
+        except Exception as e:
+            return {"error": str(e)}, 500
 
-            return {
-                "inserted_count": len(points),
-                "qdrant_response": resp.json() if resp.ok else resp.text
-            }, resp.status_code
+    def iter_bulk_qa_insert(self, qa_list: list, collection_name: str, deterministic_ids: bool = None,
+                            batch_size: int = None, wait: bool = False):
+        """
+        Embed and upsert qa_list in batches, yielding progress events:
+            {"event": "start", "submitted_count", "total_items", "total_batches", "batch_size"}
+            {"event": "batch", "batch", "start", "count", "status_code", "status", "operation_id",
+             "elapsed_ms", "completed", "total_batches", "error"}
+            {"event": "summary", "message", "inserted_count", "failed_count", "failed_batches", ...}
+        Embedding of the next batch overlaps the upload of earlier ones, with at most
+        BULK_INSERT_MAX_IN_FLIGHT upserts outstanding, so memory stays bounded to a few batches.
+        With deterministic ids, items that map to the same point are merged first (the last
+        one wins, as it would in Qdrant), so counts are of unique points.
+        """
+        if deterministic_ids is None:
+            deterministic_ids = QDRANT_DETERMINISTIC_IDS
+        submitted = len(qa_list)
+        if deterministic_ids:
+            qa_list = self._dedupe_by_point_id(qa_list, collection_name)
+        batch_size = max(1, batch_size or BULK_INSERT_BATCH_SIZE)
+        total_items = len(qa_list)
+        total_batches = math.ceil(total_items / batch_size)
+        yield {"event": "start", "submitted_count": submitted, "total_items": total_items,
+               "total_batches": total_batches, "batch_size": batch_size}
 
+        batches = (
+            (offset, len(items), lambda items=items: self._build_points(items, collection_name, deterministic_ids))
+            for offset, items in ((offset, qa_list[offset:offset + batch_size])
+                                  for offset in range(0, total_items, batch_size))
+        )
+        inserted, failed_items, failed_batches = 0, 0, 0
+        started = time.perf_counter()
+        for event in self._iter_upsert_batches(collection_name, batches, total_batches, wait):
+            if event["error"]:
+                failed_items += event["count"]
+                failed_batches += 1
+            else:
+                inserted += event["count"]
+            yield event
+
+        yield {
+            "event": "summary",
+            "message": "Bulk insert complete",
+            "submitted_count": submitted,
+            "unique_points": total_items,
+            "duplicates_merged": submitted - total_items,
+            "inserted_count": inserted,
+            "failed_count": failed_items,
+            "total_batches": total_batches,
+            "failed_batches": failed_batches,
+            "deterministic_ids": deterministic_ids,
+            "wait": wait,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+
+    def _iter_upsert_batches(self, collection_name: str, batches, total_batches: int, wait: bool):
+        """
+        Upsert batches given as (offset, count, build) where build() returns the points,
+        yielding one "batch" event per batch in order. Building the next batch overlaps
+        the upload of earlier ones, with at most BULK_INSERT_MAX_IN_FLIGHT upserts outstanding.
+        """
+        pool = ThreadPoolExecutor(max_workers=max(1, BULK_INSERT_MAX_IN_FLIGHT), thread_name_prefix="qdrant-upsert")
+        in_flight = deque()
+        completed = 0
+        try:
+            for batch_index, (offset, count, build) in enumerate(batches):
+                try:
+                    points = build()
+                except Exception as e:
+                    log_line({"error": str(e), "collection": collection_name, "batch": batch_index})
+                    in_flight.append((batch_index, offset, count, None, str(e)))
+                else:
+                    future = pool.submit(self._upsert_batch, collection_name, points, wait)
+                    in_flight.append((batch_index, offset, count, future, None))
+
+                # Wait for the oldest upload only once the pipeline is full
+                while in_flight and (len(in_flight) > BULK_INSERT_MAX_IN_FLIGHT or in_flight[0][3] is None):
+                    completed += 1
+                    yield {**self._finish_batch(in_flight.popleft()), "completed": completed, "total_batches": total_batches}
+
+            while in_flight:
+                completed += 1
+                yield {**self._finish_batch(in_flight.popleft()), "completed": completed, "total_batches": total_batches}
+        finally:
+            # Stop queued uploads if the consumer goes away; whatever landed must not be served stale
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._invalidate_collection(collection_name)
+
+    @staticmethod
+    def _dedupe_by_point_id(qa_list: list, collection_name: str) -> list:
+        """Keep one item per deterministic point id: the last one, at the first one's position."""
+        unique = {}
+        for item in qa_list:
+            unique[make_point_id(collection_name, item.get("question"), True)] = item
+        return list(unique.values())
+
+    def _build_points(self, items: list, collection_name: str, deterministic_ids: bool) -> list:
+        # One encode call per batch; tolist() already yields Python floats
+        embedder = self._embedder(collection_name)
+        vectors = encode_texts([item.get("question", "") for item in items], embedder.model_name, dim=embedder.dim)
+        vectors = np.asarray(vectors, dtype=np.float32).tolist()
+        return [
+            {
+                "id": make_point_id(collection_name, item.get("question"), deterministic_ids),
+                "vector": vector,
+                "payload": {
+                    "question": item.get("question"),
+                    "answer": item.get("answer")
+                }
+            }
+            for item, vector in zip(items, vectors)
+        ]
+
+    def _upsert_batch(self, collection_name: str, points: list, wait: bool) -> tuple:
+        started = time.perf_counter()
+        resp = self.qdrant.put(f"/collections/{collection_name}/points", op="upsert",
+                               json={"points": points}, params={"wait": str(bool(wait)).lower()})
+        if resp.ok:
+            replica_manager.apply_upsert(collection_name, points)
+        return resp, (time.perf_counter() - started) * 1000
+
+    def _finish_batch(self, entry: tuple) -> dict:
+        batch_index, offset, count, future, error = entry
+        event = {
+            "event": "batch",
+            "batch": batch_index,
+            "start": offset,
+            "count": count,
+            "status_code": None,
+            "status": None,
+            "operation_id": None,
+            "elapsed_ms": None,
+            "error": error
+        }
+        if future is None:
+            return event
+
+        try:
+            resp, elapsed_ms = future.result()
         except Exception as e:
-            return {"error": str(e)}, 500
-        
+            event["error"] = str(e)
+            return event
+
+        event["status_code"] = resp.status_code
+        event["elapsed_ms"] = round(elapsed_ms, 3)
+        try:
+            body = resp.json()
+        except ValueError:
+            body = {}
+        result = body.get("result") if isinstance(body, dict) else None
+        if isinstance(result, dict):
+            # "acknowledged" with wait=false, "completed" with wait=true
+            event["status"] = result.get("status")
+            event["operation_id"] = result.get("operation_id")
+        if not resp.ok:
+            event["error"] = (body.get("status") if isinstance(body, dict) else None) or resp.text
+            if isinstance(event["error"], dict):
+                event["error"] = event["error"].get("error") or str(event["error"])
+        return event
+
+    def export_collection(self, collection_name: str):
+        """
+        Return (byte chunk generator, 200) streaming the collection as a snapshot
+        (see snapshot_helper), or (error dict, status) when it cannot be exported.
+        """
+        r = self.qdrant.get(f"/collections/{collection_name}", op="collection_info")
+        if r.status_code != 200:
+            return r.json(), r.status_code
+        result = r.json().get("result", {})
+        vectors_config = result.get("config", {}).get("params", {}).get("vectors", {})
+        dim = vectors_config.get("size")
+        if not dim:
+            return {"error": "Only collections with a single unnamed vector can be exported"}, 400
+
+        entry = collection_registry.get(collection_name)
+        metadata = {
+            "collection": collection_name,
+            "distance": vectors_config.get("distance"),
+            "embedding": self.get_collection_embedding(collection_name),
+            "profile": entry["profile"] if entry else None,
+            "exported_at": time.time()
+        }
+        return iter_snapshot_bytes(self._iter_scroll_pages(collection_name), metadata, dim, SNAPSHOT_SPOOL_DIR), 200
+
+    def _iter_scroll_pages(self, collection_name: str):
+        """Every point with payload and vector, one scroll page at a time."""
+        offset = None
+        while True:
+            payload = {"limit": SNAPSHOT_PAGE_SIZE, "with_payload": True, "with_vector": True}
+            if offset is not None:
+                payload["offset"] = offset
+            r = self.qdrant.post(f"/collections/{collection_name}/points/scroll", op="scroll",
+                                 json=payload, idempotent=True)
+            if r.status_code != 200:
+                raise RuntimeError(f"scroll failed with HTTP {r.status_code}: {r.text}")
+            page = r.json().get("result", {})
+            yield page.get("points", [])
+            offset = page.get("next_page_offset")
+            if offset is None:
+                break
+
+    def import_collection(self, snapshot_path: str, collection_name: str = None,
+                          batch_size: int = None, wait: bool = False) -> Any:
+        """Restore a snapshot file (removed afterwards). Returns (result, status)."""
+        batches, summary = [], None
+        for event in self.iter_import_collection(snapshot_path, collection_name, batch_size, wait):
+            if event["event"] == "error":
+                return {"error": event["error"]}, event["status_code"]
+            if event["event"] == "batch":
+                batches.append({key: value for key, value in event.items() if key != "event"})
+            elif event["event"] == "summary":
+                summary = event
+
+        result = {key: value for key, value in summary.items() if key not in ("event", "message")}
+        result["batches"] = batches
+        return result, 200 if summary["failed_batches"] == 0 else 502
+
+    def iter_import_collection(self, snapshot_path: str, collection_name: str = None,
+                               batch_size: int = None, wait: bool = False):
+        """
+        Upsert the points of a snapshot file with their stored ids and vectors (the
+        embedding model is never called), yielding start/batch/summary events like
+        iter_bulk_qa_insert, or one {"event": "error", "status_code"} event. The target
+        collection (default: the exported one) is created from the snapshot's model,
+        dim, distance and profile when missing. The snapshot file is removed when done.
+        """
+        try:
+            try:
+                footer = read_snapshot_footer(snapshot_path)
+            except (ValueError, KeyError) as e:
+                yield {"event": "error", "error": str(e), "status_code": 400}
+                return
+
+            collection_name = collection_name or footer.get("collection")
+            embedding = footer.get("embedding") or {}
+            model_name = embedding.get("model_name") or EMBEDDING_MODEL_NAME
+            dim = footer["dim"]
+            # Snapshots from before the footer recorded it came from Cosine collections
+            distance = footer.get("distance") or "Cosine"
+            if distance not in DISTANCES:
+                yield {"event": "error", "error": f"Unsupported snapshot distance '{distance}'", "status_code": 400}
+                return
+
+            r = self.qdrant.get(f"/collections/{collection_name}", op="collection_info")
+            created = r.status_code == 404
+            if created:
+                r = self._put_collection(collection_name, model_name, dim, footer.get("profile") or resolve_profile(),
+                                         distance)
+                if not r.ok:
+                    yield {"event": "error", "error": r.text, "status_code": r.status_code}
+                    return
+            elif r.status_code != 200:
+                yield {"event": "error", "error": r.text, "status_code": r.status_code}
+                return
+            else:
+                vectors = r.json().get("result", {}).get("config", {}).get("params", {}).get("vectors", {})
+                size = vectors.get("size")
+                if vectors.get("distance") != distance:
+                    yield {
+                        "event": "error",
+                        "error": f"Collection '{collection_name}' uses {vectors.get('distance')} distance; "
+                                 f"the snapshot was exported from a {distance} collection",
+                        "status_code": 409
+                    }
+                    return
+                entry = collection_registry.get(collection_name)
+                if size != dim or (entry and entry["model_name"] != model_name):
+                    yield {
+                        "event": "error",
+                        "error": f"Collection '{collection_name}' holds {size}-d vectors"
+                                 + (f" from '{entry['model_name']}'" if entry else "")
+                                 + f"; the snapshot has {dim}-d vectors from '{model_name}'",
+                        "status_code": 409
+                    }
+                    return
+
+            batch_size = max(1, batch_size or BULK_INSERT_BATCH_SIZE)
+            total_items = footer["count"]
+            total_batches = math.ceil(total_items / batch_size)
+            yield {"event": "start", "collection": collection_name, "source_collection": footer.get("collection"),
+                   "created": created, "total_items": total_items, "total_batches": total_batches,
+                   "batch_size": batch_size}
+
+            batches = (
+                (offset, len(points), lambda points=points: points)
+                for offset, points in iter_snapshot_batches(snapshot_path, footer, batch_size)
+            )
+            inserted, failed_items, failed_batches = 0, 0, 0
+            started = time.perf_counter()
+            for event in self._iter_upsert_batches(collection_name, batches, total_batches, wait):
+                if event["error"]:
+                    failed_items += event["count"]
+                    failed_batches += 1
+                else:
+                    inserted += event["count"]
+                yield event
+
+            yield {
+                "event": "summary",
+                "message": "Snapshot import complete",
+                "collection": collection_name,
+                "created": created,
+                "inserted_count": inserted,
+                "failed_count": failed_items,
+                "total_batches": total_batches,
+                "failed_batches": failed_batches,
+                "wait": wait,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+            }
+        finally:
+            try:
+                os.remove(snapshot_path)
+            except OSError:
+                pass
 
     def update_point(self, collection_name: str, point_id: str, question: str, answer: str) -> Any:
         """
@@ -284,7 +937,8 @@ class QdrantService(QdrantInterface):
             qa_list = [{"question": question, "answer": answer}]
             
             # Step 2: Generate new vector(s)
-            enriched_list = vectorize_qa_list(qa_list)
+            embedder = self._embedder(collection_name)
+            enriched_list = vectorize_qa_list(qa_list, embedder.model_name, embedder.dim)
             if not enriched_list:
                 return {"error": "Failed to generate vector"}, 500
 
@@ -301,10 +955,11 @@ class QdrantService(QdrantInterface):
             }
 
             # Step 4: Send upsert request
-            url = f"{QDRANT_HOST}/collections/{collection_name}/points"
-            resp = requests.put(url, json={"points": [point]})
+            resp = self.qdrant.put(f"/collections/{collection_name}/points", op="upsert", json={"points": [point]})
+            self._invalidate_collection(collection_name)
 
             if resp.status_code == 200:
+                replica_manager.apply_upsert(collection_name, [point])
                 return {
                     "success": True,
                     "message": f"Point {point_id} updated successfully in collection {collection_name}",
@@ -326,7 +981,7 @@ class QdrantService(QdrantInterface):
         Return total number of Q&A stored in a given collection.
         """
         try:
-            resp = requests.get(f"{QDRANT_HOST}/collections/{collection_name}")
+            resp = self.qdrant.get(f"/collections/{collection_name}", op="collection_info")
             
             if resp.status_code != 200:
                 return {
@@ -343,3 +998,65 @@ class QdrantService(QdrantInterface):
 
         except Exception as e:
             return {"error": str(e)}, 500
+
+    def get_transport_stats(self) -> dict:
+        """Latency, error and retry counters of the Qdrant transport, per operation."""
+        return self.qdrant.stats()
+
+    def get_cache_stats(self) -> dict:
+        return {"answer_cache": answer_cache.stats(), "replicas": replica_manager.stats(),
+                "point_counts": point_count_cache.stats()}
+
+    def _cached_answer(self, collection: str, vector: list, search_params: tuple):
+        """search_params is (top_k, score_threshold): an answer is only reused for the same retrieval settings."""
+        if not ANSWER_CACHE_ENABLED:
+            return None
+        return answer_cache.get(collection, vector, variant=search_params)
+
+    def _store_answer(self, collection: str, vector: list, query: str, answer: str, points: list, generation: int,
+                      search_params: tuple):
+        if ANSWER_CACHE_ENABLED:
+            answer_cache.set(collection, vector, {
+                "user_question": query,
+                "human_like_answer": answer,
+                "top_points": points
+            }, generation=generation, variant=search_params)
+
+    def _direct_answer(self, collection: str, points: list):
+        """Stored answer of the top point when its score clears the collection's direct-answer threshold."""
+        threshold = DIRECT_ANSWER_THRESHOLDS.get(collection, DIRECT_ANSWER_THRESHOLD)
+        if not threshold or threshold <= 0 or not points:
+            return None
+        top = points[0]
+        answer = (top.get("payload") or {}).get("answer")
+        if not answer or top.get("score", 0) < threshold:
+            return None
+        return {"answer": answer, "point_id": top.get("id"), "score": top.get("score"), "threshold": threshold}
+
+    def _rephrase_later(self, collection: str, vector: list, query: str, points: list, generation: int,
+                        search_params: tuple):
+        """Generate the Gemini answer in the background and keep it in the answer cache for repeat questions."""
+        if not (DIRECT_ANSWER_REPHRASE and ANSWER_CACHE_ENABLED):
+            return
+
+        def rephrase():
+            try:
+                human_answer = get_human_like_answer(query, points, self.gemini_service)
+                self._store_answer(collection, vector, query, human_answer["answer"], points, generation, search_params)
+            except Exception as e:
+                log_line({"error": str(e), "collection": collection, "rephrase_question": query})
+
+        _get_rephrase_pool().submit(rephrase)
+
+    def _direct_answer_or_rephrase(self, collection: str, vector: list, query: str, points: list, generation: int,
+                                   search_params: tuple):
+        """_direct_answer, scheduling the background Gemini rephrase when there is one."""
+        direct = self._direct_answer(collection, points)
+        if direct:
+            self._rephrase_later(collection, vector, query, points, generation, search_params)
+        return direct
+
+    def _invalidate_collection(self, collection_name: str):
+        """Called after every write so cached answers and counts never outlive the data they came from."""
+        answer_cache.invalidate(collection_name)
+        point_count_cache.delete(collection_name)
@@ -0,0 +1,127 @@
+import asyncio
+import json
+from aiohttp import web
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+from app.services.async_search_service import AsyncSearchService
+from app.services.qdrant_service import preload_collection_models
+from helpers.async_http_helper import create_client_session
+from helpers.stream_helper import STREAM_MIMETYPES, format_event, resolve_stream_format
+from config import EMBEDDING_BACKEND, SERVER_PRELOAD_MODEL, ASYNC_SERVER_HOST, ASYNC_SERVER_PORT
+
+
+# ---------------------------
+# Async search app (aiohttp)
+# ---------------------------
+# Serves POST /qdrantapi/search (same body, responses and ?stream= formats as
+# the Flask route) on an event loop, so a chat waiting on Qdrant or Gemini
+# does not hold a thread. The other endpoints stay on the Flask app.
+#
+#   python async_app.py
+#   gunicorn -c gunicorn.conf.py -k aiohttp.GunicornWebWorker -b 0.0.0.0:5001 "async_app:create_async_app()"
+#
+# When the client disconnects, the in-flight Gemini call (or the wait for the
+# next streamed token) is cancelled.
+
+_DISCONNECT_POLL_SECONDS = 0.25
+
+
+async def _client_session_ctx(app: web.Application):
+    # One session (and connection pool) per worker, created inside its event loop
+    session = create_client_session()
+    app["search_service"] = AsyncSearchService(session)
+    yield
+    app["search_service"].close()
+    await session.close()
+
+
+def _client_gone(request: web.Request) -> bool:
+    transport = request.transport
+    return transport is None or transport.is_closing()
+
+
+class _ClientGone(Exception):
+    pass
+
+
+async def _cancel_on_disconnect(request: web.Request, awaitable):
+    """Await it, cancelling it and raising _ClientGone as soon as the client goes away."""
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=_DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if _client_gone(request):
+                raise _ClientGone()
+    finally:
+        if not task.done():
+            task.cancel()
+            # Let it unwind (closing its upstream connection) before the caller moves on
+            await asyncio.wait({task})
+
+
+async def search(request: web.Request) -> web.StreamResponse:
+    try:
+        data = await request.json()
+    except ValueError:
+        return web.json_response({"error": "JSON body required"}, status=400)
+    service: AsyncSearchService = request.app["search_service"]
+
+    accept = parse_accept_header(request.headers.get("Accept"), MIMEAccept)
+    stream_format = resolve_stream_format(request.query.get("stream"), accept)
+    if not stream_format:
+        try:
+            result, status = await _cancel_on_disconnect(request, service.search_point(data))
+        except _ClientGone:
+            # Nobody is left to read it
+            return web.Response(status=499)
+        return web.Response(text=json.dumps(result, indent=2, ensure_ascii=False), status=status,
+                            content_type="application/json")
+
+    response = web.StreamResponse(headers={
+        "Content-Type": STREAM_MIMETYPES[stream_format],
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+    await response.prepare(request)
+    events = service.search_point_stream(data)
+    try:
+        while True:
+            # Waiting for the next Gemini token races the disconnect watcher, so a stalled
+            # upstream is cancelled when the client leaves, not when the next token arrives
+            event = await _cancel_on_disconnect(request, events.__anext__())
+            await response.write(format_event(event, stream_format).encode("utf-8"))
+    except (StopAsyncIteration, _ClientGone, ConnectionResetError):
+        pass
+    finally:
+        # Exits the Gemini stream's `async with`, closing its connection
+        await events.aclose()
+    return response
+
+
+async def _cors_headers(request: web.Request, response: web.StreamResponse):
+    # Same as flask_cors defaults on the Flask app: any origin
+    response.headers["Access-Control-Allow-Origin"] = "*"
+
+
+async def preflight(request: web.Request) -> web.Response:
+    return web.Response(status=204, headers={
+        "Access-Control-Allow-Methods": "POST, OPTIONS",
+        "Access-Control-Allow-Headers": request.headers.get("Access-Control-Request-Headers", "Content-Type")
+    })
+
+
+def create_async_app() -> web.Application:
+    if SERVER_PRELOAD_MODEL and EMBEDDING_BACKEND == "torch":
+        preload_collection_models()
+    app = web.Application()
+    app.cleanup_ctx.append(_client_session_ctx)
+    app.on_response_prepare.append(_cors_headers)
+    app.router.add_post("/qdrantapi/search", search)
+    app.router.add_route("OPTIONS", "/qdrantapi/search", preflight)
+    return app
+
+
+if __name__ == "__main__":
+    web.run_app(create_async_app(), host=ASYNC_SERVER_HOST, port=ASYNC_SERVER_PORT, handler_cancellation=True)
@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv() 
@@ -6,3 +7,172 @@ load_dotenv()
 QDRANT_HOST = os.getenv("QDRANT_HOST")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_URL = os.getenv("GEMINI_URL")
+
+# Embedding model shared by every encode path (see helpers/embedding_model_helper.py)
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "sentence-transformers/all-mpnet-base-v2")
+EMBEDDING_NORMALIZE = os.getenv("EMBEDDING_NORMALIZE", "true").lower() == "true"
+
+# Inference backend for the embedding model: torch (fp32|bf16|int8) or onnx
+# (fp32|int8, ONNX Runtime). Check drift/speed first with
+# `python -m helpers.embedding_parity_helper --backend onnx --precision int8`.
+# int8 ONNX loads onnx/model_qint8_<EMBEDDING_ONNX_QUANTIZATION>.onnx from the
+# model repo, or exports + quantizes it into EMBEDDING_ONNX_EXPORT_DIR
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_PRECISION = os.getenv("EMBEDDING_PRECISION", "fp32").lower()
+EMBEDDING_ONNX_QUANTIZATION = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2")
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE")
+EMBEDDING_ONNX_EXPORT_DIR = os.getenv("EMBEDDING_ONNX_EXPORT_DIR", "data/onnx")
+
+# Query embedding cache in front of EmbedService.get_embedding
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "2048"))
+EMBED_CACHE_TTL_SECONDS = float(os.getenv("EMBED_CACHE_TTL_SECONDS", "3600"))
+
+# Micro-batching of concurrent embedding requests: wait up to the window
+# (or until the batch is full) and encode everything together
+EMBED_BATCHING_ENABLED = os.getenv("EMBED_BATCHING_ENABLED", "true").lower() == "true"
+EMBED_BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "3"))
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", "32"))
+
+# Upper bound on texts accepted by one /api/vectorEmbed batch request
+EMBED_MAX_TEXTS_PER_REQUEST = int(os.getenv("EMBED_MAX_TEXTS_PER_REQUEST", "512"))
+
+# Qdrant transport: keep-alive pool, timeouts (seconds) and retry/backoff
+QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
+QDRANT_POOL_SIZE = int(os.getenv("QDRANT_POOL_SIZE", "20"))
+QDRANT_MAX_RETRIES = int(os.getenv("QDRANT_MAX_RETRIES", "3"))
+QDRANT_BACKOFF_BASE_SECONDS = float(os.getenv("QDRANT_BACKOFF_BASE_SECONDS", "0.1"))
+QDRANT_BACKOFF_MAX_SECONDS = float(os.getenv("QDRANT_BACKOFF_MAX_SECONDS", "2"))
+QDRANT_CONNECT_TIMEOUT = float(os.getenv("QDRANT_CONNECT_TIMEOUT", "3"))
+# e.g. QDRANT_OP_TIMEOUTS='{"search": 2, "upsert": 60}'
+QDRANT_OP_TIMEOUTS = json.loads(os.getenv("QDRANT_OP_TIMEOUTS", "{}"))
+
+# Max Gemini calls in flight while extracting Q&A from one PDF
+PDF_MAX_CONCURRENT_CHUNKS = int(os.getenv("PDF_MAX_CONCURRENT_CHUNKS", "4"))
+
+# Background PDF ingestion jobs (SQLite job store + spooled uploads)
+PDF_JOB_DB_PATH = os.getenv("PDF_JOB_DB_PATH", "data/pdf_jobs.sqlite3")
+PDF_JOB_SPOOL_DIR = os.getenv("PDF_JOB_SPOOL_DIR", "data/pdf_job_files")
+PDF_JOB_WORKERS = int(os.getenv("PDF_JOB_WORKERS", "2"))
+PDF_JOB_STALE_SECONDS = float(os.getenv("PDF_JOB_STALE_SECONDS", "300"))
+# How often running jobs heartbeat and stale jobs are swept back into the queue
+PDF_JOB_HEARTBEAT_SECONDS = float(os.getenv("PDF_JOB_HEARTBEAT_SECONDS", "30"))
+
+# Gemini streaming endpoint; derived from GEMINI_URL unless set explicitly
+# (point it at a local fake SSE server to test streaming without Gemini)
+def _default_gemini_stream_url(url):
+    if not url or ":generateContent" not in url:
+        return url
+    url = url.replace(":generateContent", ":streamGenerateContent")
+    return url + ("&" if "?" in url else "?") + "alt=sse"
+
+GEMINI_STREAM_URL = os.getenv("GEMINI_STREAM_URL") or _default_gemini_stream_url(GEMINI_URL)
+
+# Semantic answer cache for search_point (per collection, dropped on any write)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "600"))
+
+# On-disk cache of per-chunk Gemini extraction results
+CHUNK_CACHE_ENABLED = os.getenv("CHUNK_CACHE_ENABLED", "true").lower() == "true"
+CHUNK_CACHE_PATH = os.getenv("CHUNK_CACHE_PATH", "data/chunk_cache.sqlite3")
+
+# Derive point ids from (collection, normalized question) so retries and
+# re-ingestion overwrite instead of duplicating; per-request flags override it
+QDRANT_DETERMINISTIC_IDS = os.getenv("QDRANT_DETERMINISTIC_IDS", "false").lower() == "true"
+
+# bulk_qa_insert pipeline: points embedded + upserted per batch, and how many
+# upsert requests may be outstanding while the next batch is embedded
+BULK_INSERT_BATCH_SIZE = int(os.getenv("BULK_INSERT_BATCH_SIZE", "256"))
+BULK_INSERT_MAX_IN_FLIGHT = int(os.getenv("BULK_INSERT_MAX_IN_FLIGHT", "4"))
+
+# PDF text extraction: uploads are spooled to disk (PDF_SPOOL_DIR, default
+# system temp) and documents with at least PDF_PARALLEL_MIN_PAGES pages are
+# split into PDF_PAGES_PER_TASK page ranges across a shared process pool. A
+# document keeps at most memory cap / (base + factor x file size) ranges busy.
+PDF_SPOOL_DIR = os.getenv("PDF_SPOOL_DIR")
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "64"))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "32"))
+PDF_EXTRACT_MAX_MEMORY_MB = float(os.getenv("PDF_EXTRACT_MAX_MEMORY_MB", "1024"))
+PDF_WORKER_BASE_MEMORY_MB = float(os.getenv("PDF_WORKER_BASE_MEMORY_MB", "80"))
+PDF_WORKER_MEMORY_FACTOR = float(os.getenv("PDF_WORKER_MEMORY_FACTOR", "4"))
+
+# PDF chunking: "packed" merges small heading sections up to the target size
+# and splits sections above the max with overlap; "heading" is the old
+# one-chunk-per-heading split. Sizes are estimated tokens (~4 chars each).
+PDF_CHUNK_MODE = os.getenv("PDF_CHUNK_MODE", "packed").lower()
+PDF_CHUNK_TARGET_TOKENS = int(os.getenv("PDF_CHUNK_TARGET_TOKENS", "1500"))
+PDF_CHUNK_MAX_TOKENS = int(os.getenv("PDF_CHUNK_MAX_TOKENS", "3000"))
+PDF_CHUNK_OVERLAP_TOKENS = int(os.getenv("PDF_CHUNK_OVERLAP_TOKENS", "150"))
+
+# In-process read replicas for search_point (off by default). Empty
+# REPLICA_COLLECTIONS replicates every searched collection up to
+# REPLICA_MAX_POINTS; replicas resync after REPLICA_RESYNC_SECONDS and are
+# not served once older than REPLICA_MAX_STALENESS_SECONDS
+REPLICA_ENABLED = os.getenv("REPLICA_ENABLED", "false").lower() == "true"
+REPLICA_COLLECTIONS = [name.strip() for name in os.getenv("REPLICA_COLLECTIONS", "").split(",") if name.strip()]
+REPLICA_MAX_POINTS = int(os.getenv("REPLICA_MAX_POINTS", "200000"))
+REPLICA_RESYNC_SECONDS = float(os.getenv("REPLICA_RESYNC_SECONDS", "300"))
+REPLICA_MAX_STALENESS_SECONDS = float(os.getenv("REPLICA_MAX_STALENESS_SECONDS", "600"))
+
+# Direct-answer fast path for search_point: when the top hit scores at or above
+# the threshold its stored answer is returned without Gemini (0 disables).
+# Per-collection overrides, e.g. DIRECT_ANSWER_THRESHOLDS='{"CustomAi": 0.9}'.
+# With DIRECT_ANSWER_REPHRASE the Gemini answer is generated in the background
+# and put in the answer cache for the next near-identical question.
+DIRECT_ANSWER_THRESHOLD = float(os.getenv("DIRECT_ANSWER_THRESHOLD", "0"))
+DIRECT_ANSWER_THRESHOLDS = {name: float(value) for name, value in json.loads(os.getenv("DIRECT_ANSWER_THRESHOLDS", "{}")).items()}
+DIRECT_ANSWER_REPHRASE = os.getenv("DIRECT_ANSWER_REPHRASE", "false").lower() == "true"
+
+# Retrieval for search_point: defaults for the request's top_k/score_threshold
+# (0 = no threshold) and the prompt context built from the hits. Points are
+# packed in score order into CONTEXT_TOKEN_BUDGET estimated tokens, skipping
+# near-duplicates and cutting answers longer than CONTEXT_MAX_ANSWER_TOKENS
+SEARCH_TOP_K = int(os.getenv("SEARCH_TOP_K", "5"))
+SEARCH_MAX_TOP_K = int(os.getenv("SEARCH_MAX_TOP_K", "50"))
+SEARCH_SCORE_THRESHOLD = float(os.getenv("SEARCH_SCORE_THRESHOLD", "0"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))
+CONTEXT_MAX_ANSWER_TOKENS = int(os.getenv("CONTEXT_MAX_ANSWER_TOKENS", "300"))
+CONTEXT_DEDUPE_SIMILARITY = float(os.getenv("CONTEXT_DEDUPE_SIMILARITY", "0.9"))
+
+# Embedding model + dimension recorded per collection at creation time
+COLLECTION_REGISTRY_PATH = os.getenv("COLLECTION_REGISTRY_PATH", "data/collections.sqlite3")
+
+# Performance profile (quantization / HNSW / on-disk preset) for collections
+# created without one: default | low_memory | low_latency | binary
+COLLECTION_DEFAULT_PROFILE = os.getenv("COLLECTION_DEFAULT_PROFILE", "default")
+
+# Collection snapshots (export/import without re-embedding): points per scroll
+# page on export; vectors and uploads are spooled to SNAPSHOT_SPOOL_DIR
+# (default: system temp dir)
+SNAPSHOT_PAGE_SIZE = int(os.getenv("SNAPSHOT_PAGE_SIZE", "1024"))
+SNAPSHOT_SPOOL_DIR = os.getenv("SNAPSHOT_SPOOL_DIR")
+
+# Q&A listing: point counts reported by getQAsPaginated are cached this long
+# (writes through this process drop them at once); getAllQA scrolls in pages
+# of QA_LIST_PAGE_SIZE points
+POINT_COUNT_CACHE_TTL_SECONDS = float(os.getenv("POINT_COUNT_CACHE_TTL_SECONDS", "10"))
+QA_LIST_PAGE_SIZE = int(os.getenv("QA_LIST_PAGE_SIZE", "256"))
+
+# Production server: gunicorn -c gunicorn.conf.py wsgi:app (see gunicorn.conf.py
+# for the worker sizing). SERVER_WORKERS=0 sizes workers from the core count;
+# the embedding model is loaded before fork so workers share its weights
+SERVER_BIND = os.getenv("SERVER_BIND", "0.0.0.0:5000")
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "0"))
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "8"))
+SERVER_TORCH_THREADS = int(os.getenv("SERVER_TORCH_THREADS", "2"))
+SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", "120"))
+SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "0"))
+SERVER_MAX_REQUESTS_JITTER = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "0"))
+SERVER_PRELOAD_MODEL = os.getenv("SERVER_PRELOAD_MODEL", "true").lower() == "true"
+SERVER_WARMUP = os.getenv("SERVER_WARMUP", "true").lower() == "true"
+
+# Async search app (async_app.py, aiohttp): one shared connection pool per
+# worker for Qdrant + Gemini, and a thread pool for the CPU-bound encodes
+ASYNC_SERVER_HOST = os.getenv("ASYNC_SERVER_HOST", "0.0.0.0")
+ASYNC_SERVER_PORT = int(os.getenv("ASYNC_SERVER_PORT", "5001"))
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "200"))
+ASYNC_HTTP_MAX_PER_HOST = int(os.getenv("ASYNC_HTTP_MAX_PER_HOST", "100"))
+ASYNC_EMBED_WORKERS = int(os.getenv("ASYNC_EMBED_WORKERS", "4"))
@@ -0,0 +1,83 @@
+import gc
+import os
+import sys
+from config import (
+    SERVER_BIND,
+    SERVER_WORKERS,
+    SERVER_THREADS,
+    SERVER_TORCH_THREADS,
+    SERVER_TIMEOUT,
+    SERVER_GRACEFUL_TIMEOUT,
+    SERVER_MAX_REQUESTS,
+    SERVER_MAX_REQUESTS_JITTER,
+    SERVER_WARMUP,
+)
+
+
+# ---------------------------
+# gunicorn settings:  gunicorn -c gunicorn.conf.py wsgi:app
+# ---------------------------
+# Worker sizing. Encoding a query is CPU-bound; waiting on Gemini and Qdrant
+# is not. Each worker process gets SERVER_TORCH_THREADS threads for torch and
+# SERVER_THREADS request threads for the I/O waits, and by default there are
+# only as many workers as keep torch from oversubscribing the cores:
+#
+#     workers = max(1, cores // SERVER_TORCH_THREADS)
+#     concurrent requests = workers * SERVER_THREADS
+#
+# e.g. 8 cores, SERVER_TORCH_THREADS=2 -> 4 workers; with SERVER_THREADS=8
+# that is 32 requests in flight. Use SERVER_TORCH_THREADS=1 for the most
+# throughput under load, or a higher value for lower single-request latency.
+# The model weights are shared, but every worker keeps its own caches and
+# replicas, so memory grows with the worker count.
+#
+# Graceful restarts: `kill -HUP <master pid>` replaces the workers one by one,
+# and in-flight requests (streams included) get SERVER_GRACEFUL_TIMEOUT seconds
+# to finish. Because the app is preloaded, HUP does not pick up new code; for
+# a deploy send USR2 (a new master starts) and then TERM to the old master.
+# SERVER_MAX_REQUESTS > 0 recycles each worker after that many requests.
+
+
+def _available_cores() -> int:
+    try:
+        # Respects CPU affinity / container cpusets
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+torch_threads = max(1, SERVER_TORCH_THREADS)
+# Must be set before torch is imported, which preload does in the master
+os.environ.setdefault("OMP_NUM_THREADS", str(torch_threads))
+os.environ.setdefault("MKL_NUM_THREADS", str(torch_threads))
+
+bind = SERVER_BIND
+workers = SERVER_WORKERS or max(1, _available_cores() // torch_threads)
+worker_class = "gthread"
+threads = max(1, SERVER_THREADS)
+preload_app = True
+timeout = SERVER_TIMEOUT
+graceful_timeout = SERVER_GRACEFUL_TIMEOUT
+max_requests = SERVER_MAX_REQUESTS
+max_requests_jitter = SERVER_MAX_REQUESTS_JITTER
+keepalive = 5
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far (model included) out of the collector's
+    # reach, so GC passes in the workers do not write to the shared pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if "torch" not in sys.modules:
+        return
+    import torch
+    torch.set_num_threads(torch_threads)
+    if SERVER_WARMUP:
+        # First encode starts this worker's thread pool; do it before taking traffic
+        from helpers.embedding_model_helper import encode_texts
+        try:
+            encode_texts(["warm-up"])
+        except Exception as e:
+            server.log.warning(f"Embedding warm-up failed in worker {worker.pid}: {e}")
@@ -0,0 +1,132 @@
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional
+import numpy as np
+
+
+# ---------------------------
+# Semantic answer cache
+# ---------------------------
+# Per-collection cache of generated answers keyed by the query embedding.
+# A new query is served from the cache when its cosine similarity to a
+# cached query is at or above the threshold. Any write to a collection
+# drops that collection's entries. The cache is per process, so TTL also
+# bounds staleness for writes handled by other worker processes. Entries
+# carry a variant (the search settings, e.g. top_k and score threshold) and
+# only match lookups with the same variant, since those shape the answer.
+
+class _CollectionEntries:
+    def __init__(self):
+        self.vectors = []       # unit-length float32 vectors
+        self.values = []
+        self.variants = []
+        self.expires_at = []
+        self.last_used = []
+        self.matrix = None      # stacked vectors, rebuilt lazily after changes
+
+    def remove(self, index: int):
+        for column in (self.vectors, self.values, self.variants, self.expires_at, self.last_used):
+            del column[index]
+        self.matrix = None
+
+
+class SemanticAnswerCache:
+    def __init__(self, threshold: float = 0.95, max_entries: int = 512, ttl_seconds: float = 600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._collections: Dict[str, _CollectionEntries] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def get(self, collection: str, vector, variant: Hashable = None) -> Optional[Dict[str, Any]]:
+        """Return {"value", "similarity"} for the closest fresh entry of this variant above the threshold."""
+        query = self._unit(vector)
+        now = time.monotonic()
+        with self._lock:
+            entries = self._collections.get(collection)
+            if entries is None or not entries.vectors:
+                self.misses += 1
+                return None
+
+            self._drop_expired(entries, now)
+            if not entries.vectors:
+                self.misses += 1
+                return None
+
+            if entries.matrix is None:
+                entries.matrix = np.vstack(entries.vectors)
+            similarities = entries.matrix @ query
+            # Entries of other variants never match
+            same_variant = np.fromiter((v == variant for v in entries.variants), dtype=bool, count=len(entries.variants))
+            similarities = np.where(same_variant, similarities, -np.inf)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                self.misses += 1
+                return None
+
+            entries.last_used[best] = now
+            self.hits += 1
+            return {"value": entries.values[best], "similarity": round(float(similarities[best]), 4)}
+
+    def generation(self, collection: str) -> int:
+        """Bumped on every invalidation; pass it to set() to skip answers computed before a write."""
+        with self._lock:
+            return self._generations.get(collection, 0)
+
+    def set(self, collection: str, vector, value: Any, generation: Optional[int] = None,
+            variant: Hashable = None) -> None:
+        if self.max_entries <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if generation is not None and generation != self._generations.get(collection, 0):
+                return
+            entries = self._collections.setdefault(collection, _CollectionEntries())
+            self._drop_expired(entries, now)
+            while len(entries.vectors) >= self.max_entries:
+                # Least recently used goes first
+                entries.remove(int(np.argmin(entries.last_used)))
+                self.evictions += 1
+            entries.vectors.append(self._unit(vector))
+            entries.values.append(value)
+            entries.variants.append(variant)
+            entries.expires_at.append(now + self.ttl_seconds)
+            entries.last_used.append(now)
+            entries.matrix = None
+
+    def invalidate(self, collection: str) -> None:
+        with self._lock:
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            if self._collections.pop(collection, None) is not None:
+                self.invalidations += 1
+
+    def _drop_expired(self, entries: _CollectionEntries, now: float) -> None:
+        for index in range(len(entries.expires_at) - 1, -1, -1):
+            if entries.expires_at[index] <= now:
+                entries.remove(index)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "collections": {name: len(e.vectors) for name, e in self._collections.items()},
+                "threshold": self.threshold,
+                "max_entries_per_collection": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
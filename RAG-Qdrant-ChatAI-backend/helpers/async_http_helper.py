@@ -0,0 +1,145 @@
+import asyncio
+import json
+import random
+from typing import Any, AsyncIterator, Optional, Tuple
+import aiohttp
+from helpers.qdrant_transport_helper import DEFAULT_OP_TIMEOUTS, RETRY_STATUS_CODES
+from helpers.stream_helper import SSEDecoder, gemini_chunk_texts
+from config import (
+    QDRANT_HOST,
+    QDRANT_API_KEY,
+    QDRANT_MAX_RETRIES,
+    QDRANT_BACKOFF_BASE_SECONDS,
+    QDRANT_BACKOFF_MAX_SECONDS,
+    QDRANT_CONNECT_TIMEOUT,
+    QDRANT_OP_TIMEOUTS,
+    GEMINI_API_KEY,
+    GEMINI_URL,
+    GEMINI_STREAM_URL,
+    ASYNC_HTTP_MAX_CONNECTIONS,
+    ASYNC_HTTP_MAX_PER_HOST,
+)
+
+
+# ---------------------------
+# Non-blocking HTTP clients (aiohttp)
+# ---------------------------
+# Used by the async app (async_app.py). One ClientSession per event loop holds
+# the keep-alive pools for Qdrant and Gemini; a request waiting on either one
+# costs a coroutine, not a thread. Timeouts and retries match the sync
+# QdrantTransport / GeminiService.
+
+GEMINI_TIMEOUT_SECONDS = 60
+
+
+def create_client_session() -> aiohttp.ClientSession:
+    """Shared session; create it inside the running loop and close it on shutdown."""
+    connector = aiohttp.TCPConnector(
+        limit=ASYNC_HTTP_MAX_CONNECTIONS,
+        limit_per_host=ASYNC_HTTP_MAX_PER_HOST,
+        keepalive_timeout=30,
+        ttl_dns_cache=300
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+class AsyncQdrantTransport:
+    def __init__(self, session: aiohttp.ClientSession, base_url: str = QDRANT_HOST,
+                 max_retries: int = QDRANT_MAX_RETRIES):
+        self.session = session
+        self.base_url = (base_url or "").rstrip("/")
+        self.max_retries = max_retries
+        self.timeouts = {**DEFAULT_OP_TIMEOUTS, **QDRANT_OP_TIMEOUTS}
+        self.headers = {"api-key": QDRANT_API_KEY} if QDRANT_API_KEY else {}
+
+    async def request(self, method: str, path: str, op: str = "default", json: Any = None,
+                      params: Optional[dict] = None, idempotent: Optional[bool] = None) -> Tuple[int, Any]:
+        """Send one request to Qdrant. Returns (status, parsed JSON body, or text if not JSON)."""
+        if idempotent is None:
+            idempotent = method.upper() in ("GET", "PUT", "DELETE")
+        timeout = aiohttp.ClientTimeout(sock_connect=QDRANT_CONNECT_TIMEOUT,
+                                        sock_read=self.timeouts.get(op, self.timeouts["default"]))
+        attempts = self.max_retries + 1 if idempotent else 1
+
+        for attempt in range(attempts):
+            try:
+                async with self.session.request(method, f"{self.base_url}{path}", json=json, params=params,
+                                                headers=self.headers, timeout=timeout) as response:
+                    status = response.status
+                    text = await response.text()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt + 1 >= attempts:
+                    raise
+                await self._sleep_backoff(attempt)
+                continue
+
+            if status in RETRY_STATUS_CODES and attempt + 1 < attempts:
+                await self._sleep_backoff(attempt)
+                continue
+            try:
+                return status, _json_loads(text)
+            except ValueError:
+                return status, text
+
+    async def post(self, path: str, op: str = "default", **kwargs) -> Tuple[int, Any]:
+        return await self.request("POST", path, op=op, **kwargs)
+
+    async def _sleep_backoff(self, attempt: int):
+        cap = min(QDRANT_BACKOFF_MAX_SECONDS, QDRANT_BACKOFF_BASE_SECONDS * (2 ** attempt))
+        await asyncio.sleep(random.uniform(0, cap))
+
+
+class AsyncGeminiClient:
+    def __init__(self, session: aiohttp.ClientSession, api_key: str = GEMINI_API_KEY,
+                 url: str = GEMINI_URL, stream_url: str = GEMINI_STREAM_URL):
+        self.session = session
+        self.api_key = api_key
+        self.url = url
+        self.stream_url = stream_url
+        self.timeout = aiohttp.ClientTimeout(total=GEMINI_TIMEOUT_SECONDS)
+
+    def _headers(self, **extra) -> dict:
+        # requests drops None-valued headers; aiohttp refuses them
+        headers = {"Content-Type": "application/json", **extra}
+        if self.api_key:
+            headers["X-goog-api-key"] = self.api_key
+        return headers
+
+    async def ask(self, question: str) -> dict:
+        headers = self._headers()
+        payload = {"contents": [{"parts": [{"text": question}]}]}
+
+        async with self.session.post(self.url, headers=headers, json=payload, timeout=self.timeout) as response:
+            data = json.loads(await response.text())
+            if response.status != 200:
+                raise Exception(f"Gemini API error: {data}")
+
+        answer_text = data["candidates"][0]["content"]["parts"][0]["text"]
+        return {"question": question, "answer": answer_text}
+
+    async def ask_stream(self, question: str) -> AsyncIterator[str]:
+        """Async counterpart of GeminiService.ask_stream: yields answer text as it is generated."""
+        headers = self._headers(Accept="text/event-stream")
+        payload = {"contents": [{"parts": [{"text": question}]}]}
+
+        # No total timeout: a long answer may stream for a while; stalls still time out
+        timeout = aiohttp.ClientTimeout(sock_read=GEMINI_TIMEOUT_SECONDS)
+        async with self.session.post(self.stream_url, headers=headers, json=payload, timeout=timeout) as response:
+            if response.status != 200:
+                raise Exception(f"Gemini API error: {await response.text()}")
+
+            decoder = SSEDecoder()
+            async for raw_line in response.content:
+                data = decoder.feed(raw_line.decode("utf-8"))
+                if data:
+                    for text in gemini_chunk_texts(data):
+                        yield text
+            data = decoder.flush()
+            if data:
+                for text in gemini_chunk_texts(data):
+                    yield text
+
+
+def _json_loads(text: str):
+    # AsyncQdrantTransport.request takes a `json` argument that shadows the module
+    return json.loads(text)
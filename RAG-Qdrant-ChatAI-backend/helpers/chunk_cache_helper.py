@@ -0,0 +1,60 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+
+# ---------------------------
+# Chunk extraction cache (content addressed, SQLite)
+# ---------------------------
+# Parsed Q&A lists are stored under sha256(prompt version + normalized chunk
+# text), so re-uploading a revised PDF only sends new or changed chunks to
+# Gemini. Bumping the prompt template version invalidates every entry.
+
+def chunk_cache_key(chunk_text: str, prompt_version: str) -> str:
+    normalized = re.sub(r"\s+", " ", chunk_text or "").strip()
+    return hashlib.sha256(f"{prompt_version}\n{normalized}".encode("utf-8")).hexdigest()
+
+
+class ChunkResultCache:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunk_cache ("
+                "key TEXT PRIMARY KEY, qa_pairs TEXT NOT NULL, "
+                "created_at REAL NOT NULL, last_hit_at REAL, hit_count INTEGER NOT NULL DEFAULT 0)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT qa_pairs FROM chunk_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE chunk_cache SET hit_count = hit_count + 1, last_hit_at = ? WHERE key = ?",
+                (time.time(), key)
+            )
+        return json.loads(row[0])
+
+    def set(self, key: str, qa_pairs: List[dict]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO chunk_cache (key, qa_pairs, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(qa_pairs, ensure_ascii=False), time.time())
+            )
@@ -0,0 +1,203 @@
+import copy
+from typing import Any, Dict, Optional
+
+
+# ---------------------------
+# Collection performance profiles
+# ---------------------------
+# A profile is the storage/index part of a Qdrant collection: quantization,
+# HNSW graph parameters, what lives on disk and when indexing starts. It is
+# given to /create_collection either as a preset name or as an object that
+# may name a preset and override parts of it:
+#
+#   {"preset": "low_memory", "hnsw": {"m": 32}, "quantization": {"oversampling": 3.0}}
+#
+# Rescoring and oversampling are search-time settings in Qdrant, so they are
+# returned separately and stored with the collection for every search.
+
+PRESETS: Dict[str, Dict[str, Any]] = {
+    # Qdrant defaults: float32 vectors and HNSW graph in RAM
+    "default": {},
+    # Float32 vectors on disk, int8 copies in RAM, rescored from disk
+    "low_memory": {
+        "on_disk": True,
+        "on_disk_payload": True,
+        "quantization": {"type": "scalar", "quantile": 0.99, "always_ram": True,
+                         "rescore": True, "oversampling": 2.0}
+    },
+    # Everything in RAM, int8 search without rescoring, denser graph
+    "low_latency": {
+        "on_disk": False,
+        "hnsw": {"m": 32, "ef_construct": 200},
+        "quantization": {"type": "scalar", "quantile": 0.99, "always_ram": True,
+                         "rescore": False}
+    },
+    # 1-bit vectors in RAM; only worth it for large (>= 768-d) models
+    "binary": {
+        "on_disk": True,
+        "on_disk_payload": True,
+        "quantization": {"type": "binary", "always_ram": True,
+                         "rescore": True, "oversampling": 3.0}
+    },
+}
+
+QUANTIZATION_TYPES = ("none", "scalar", "binary")
+# Qdrant vector distances; collections are created as Cosine unless restored from a snapshot
+DISTANCES = ("Cosine", "Dot", "Euclid", "Manhattan")
+
+_TOP_LEVEL_KEYS = {"preset", "on_disk", "on_disk_payload", "hnsw", "quantization", "indexing_threshold", "hnsw_ef"}
+_HNSW_KEYS = {"m", "ef_construct", "on_disk"}
+_QUANTIZATION_KEYS = {"type", "quantile", "always_ram", "rescore", "oversampling"}
+
+
+def _check_keys(section: str, value: dict, allowed: set):
+    if not isinstance(value, dict):
+        raise ValueError(f"{section} must be an object")
+    unknown = sorted(set(value) - allowed)
+    if unknown:
+        raise ValueError(f"Unknown {section} option(s): {', '.join(unknown)}")
+
+
+def _check_bool(name: str, value):
+    if value is not None and not isinstance(value, bool):
+        raise ValueError(f"{name} must be true or false")
+
+
+def _check_int(name: str, value, low: int, high: Optional[int] = None):
+    if value is None:
+        return
+    if isinstance(value, bool) or not isinstance(value, int) or value < low or (high is not None and value > high):
+        bounds = f"between {low} and {high}" if high is not None else f">= {low}"
+        raise ValueError(f"{name} must be an integer {bounds}")
+
+
+def _check_number(name: str, value, low: float, high: float):
+    if value is None:
+        return
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not low <= value <= high:
+        raise ValueError(f"{name} must be a number between {low} and {high}")
+
+
+def resolve_profile(profile=None, default_preset: str = "default") -> Dict[str, Any]:
+    """Merge a preset name or override object onto its preset and validate it. Raises ValueError."""
+    if profile is None:
+        profile = default_preset
+    if isinstance(profile, str):
+        profile = {"preset": profile}
+    _check_keys("profile", profile, _TOP_LEVEL_KEYS)
+
+    preset = profile.get("preset") or "default"
+    if preset not in PRESETS:
+        raise ValueError(f"Unknown profile preset '{preset}' (expected one of {', '.join(PRESETS)})")
+    resolved = copy.deepcopy(PRESETS[preset])
+    resolved["preset"] = preset
+
+    for key, value in profile.items():
+        if key in ("hnsw", "quantization"):
+            _check_keys(key, value, _HNSW_KEYS if key == "hnsw" else _QUANTIZATION_KEYS)
+            section = resolved.setdefault(key, {})
+            if key == "quantization" and value.get("type") not in (None, section.get("type")):
+                # Switching type: the preset's type-specific settings no longer apply
+                section.clear()
+            section.update(value)
+        elif key != "preset":
+            resolved[key] = value
+
+    _check_bool("on_disk", resolved.get("on_disk"))
+    _check_bool("on_disk_payload", resolved.get("on_disk_payload"))
+    _check_int("indexing_threshold", resolved.get("indexing_threshold"), 0)
+    _check_int("hnsw_ef", resolved.get("hnsw_ef"), 1, 4096)
+
+    hnsw = resolved.get("hnsw", {})
+    # m = 0 disables the graph (payload-filtered or brute-force collections)
+    _check_int("hnsw.m", hnsw.get("m"), 0, 128)
+    _check_int("hnsw.ef_construct", hnsw.get("ef_construct"), 4, 1024)
+    _check_bool("hnsw.on_disk", hnsw.get("on_disk"))
+
+    quantization = resolved.get("quantization", {})
+    q_type = quantization.setdefault("type", "none") if quantization else "none"
+    if q_type not in QUANTIZATION_TYPES:
+        raise ValueError(f"quantization.type must be one of {', '.join(QUANTIZATION_TYPES)}")
+    if q_type != "scalar" and quantization.get("quantile") is not None:
+        raise ValueError("quantization.quantile only applies to scalar quantization")
+    if q_type == "none" and any(quantization.get(key) is not None
+                                for key in ("always_ram", "rescore", "oversampling")):
+        raise ValueError("quantization options need quantization.type scalar or binary")
+    _check_number("quantization.quantile", quantization.get("quantile"), 0.5, 1.0)
+    _check_bool("quantization.always_ram", quantization.get("always_ram"))
+    _check_bool("quantization.rescore", quantization.get("rescore"))
+    _check_number("quantization.oversampling", quantization.get("oversampling"), 1.0, 16.0)
+    return resolved
+
+
+def build_collection_payload(dim: int, profile: Dict[str, Any], distance: str = "Cosine") -> Dict[str, Any]:
+    """Body for PUT /collections/{name} from a resolved profile."""
+    vectors = {"size": dim, "distance": distance}
+    if profile.get("on_disk") is not None:
+        vectors["on_disk"] = profile["on_disk"]
+    payload = {"vectors": vectors}
+
+    if profile.get("on_disk_payload") is not None:
+        payload["on_disk_payload"] = profile["on_disk_payload"]
+
+    hnsw = {key: value for key, value in profile.get("hnsw", {}).items() if value is not None}
+    if hnsw:
+        payload["hnsw_config"] = hnsw
+
+    if profile.get("indexing_threshold") is not None:
+        payload["optimizers_config"] = {"indexing_threshold": profile["indexing_threshold"]}
+
+    quantization = profile.get("quantization", {})
+    q_type = quantization.get("type", "none")
+    if q_type == "scalar":
+        scalar = {"type": "int8"}
+        for key in ("quantile", "always_ram"):
+            if quantization.get(key) is not None:
+                scalar[key] = quantization[key]
+        payload["quantization_config"] = {"scalar": scalar}
+    elif q_type == "binary":
+        binary = {}
+        if quantization.get("always_ram") is not None:
+            binary["always_ram"] = quantization["always_ram"]
+        payload["quantization_config"] = {"binary": binary}
+    return payload
+
+
+def build_search_params(profile: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The "params" block for points/search, or None when Qdrant's defaults apply."""
+    if not profile:
+        return None
+    params = {}
+    if profile.get("hnsw_ef") is not None:
+        params["hnsw_ef"] = profile["hnsw_ef"]
+    quantization = profile.get("quantization", {})
+    if quantization.get("type", "none") != "none":
+        search_quantization = {}
+        for key in ("rescore", "oversampling"):
+            if quantization.get(key) is not None:
+                search_quantization[key] = quantization[key]
+        if search_quantization:
+            params["quantization"] = search_quantization
+    return params or None
+
+
+def summarize_collection_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten Qdrant's collection config to the settings a profile controls."""
+    params = config.get("params", {})
+    vectors = params.get("vectors", {})
+    hnsw = config.get("hnsw_config", {})
+    quantization = config.get("quantization_config") or {}
+    q_type = next(iter(quantization), "none")
+    return {
+        "size": vectors.get("size"),
+        "distance": vectors.get("distance"),
+        "vectors_on_disk": bool(vectors.get("on_disk", False)),
+        "payload_on_disk": bool(params.get("on_disk_payload", False)),
+        "hnsw": {
+            "m": hnsw.get("m"),
+            "ef_construct": hnsw.get("ef_construct"),
+            "on_disk": bool(hnsw.get("on_disk", False))
+        },
+        "quantization": {"type": q_type, **quantization.get(q_type, {})} if q_type != "none" else {"type": "none"},
+        "indexing_threshold": config.get("optimizer_config", {}).get("indexing_threshold")
+    }
@@ -0,0 +1,81 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from helpers.cache_helper import LRUTTLCache
+
+
+# ---------------------------
+# Per-collection embedding settings (SQLite)
+# ---------------------------
+# Which embedding model and vector dimension each collection was created
+# with, so inserts, updates and searches encode with the same model, and
+# the performance profile whose search settings apply to it. Entries found
+# are cached briefly in-process; the file is shared by all worker processes.
+
+class CollectionRegistry:
+    def __init__(self, db_path: str, cache_ttl_seconds: float = 30):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS collections ("
+                "name TEXT PRIMARY KEY, model_name TEXT NOT NULL, dim INTEGER NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(collections)")}
+            if "profile" not in columns:
+                conn.execute("ALTER TABLE collections ADD COLUMN profile TEXT")
+        self._cache = LRUTTLCache(max_entries=1024, ttl_seconds=cache_ttl_seconds)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        cached = self._cache.get(name)
+        if cached is not None:
+            return cached
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM collections WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            # Misses are not cached: another worker may be creating the collection right now
+            return None
+        entry = self._entry(row)
+        self._cache.set(name, entry)
+        return entry
+
+    @staticmethod
+    def _entry(row) -> Dict[str, Any]:
+        entry = dict(row)
+        entry["profile"] = json.loads(entry["profile"]) if entry.get("profile") else None
+        return entry
+
+    def set(self, name: str, model_name: str, dim: int, profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        entry = {"name": name, "model_name": model_name, "dim": int(dim), "created_at": time.time(), "profile": profile}
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO collections (name, model_name, dim, created_at, profile) VALUES (?, ?, ?, ?, ?)",
+                (name, model_name, int(dim), entry["created_at"], json.dumps(profile) if profile else None)
+            )
+        self._cache.set(name, entry)
+        return entry
+
+    def delete(self, name: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM collections WHERE name = ?", (name,))
+        self._cache.delete(name)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM collections ORDER BY name").fetchall()
+        return [self._entry(row) for row in rows]
@@ -0,0 +1,133 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List
+from helpers.embedding_model_helper import encode_texts
+from config import EMBED_BATCH_WINDOW_MS, EMBED_BATCH_MAX_SIZE
+
+
+# ---------------------------
+# Dynamic micro-batching
+# ---------------------------
+# Request threads enqueue single texts; one worker thread per model drains
+# the queue, waiting at most window_ms (or until max_batch_size items) so
+# concurrent requests are encoded together in one batched forward pass.
+
+class EmbeddingBatcher:
+    def __init__(self, model_name: str, window_ms: float = EMBED_BATCH_WINDOW_MS,
+                 max_batch_size: int = EMBED_BATCH_MAX_SIZE):
+        self.model_name = model_name
+        self.window_ms = window_ms
+        self.max_batch_size = max(1, max_batch_size)
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_pid = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+        self._full_batches = 0
+        self._total_wait_ms = 0.0
+        self._total_encode_ms = 0.0
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so restart the worker in each child process
+        if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            if self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._run, name=f"embed-batcher-{self.model_name}", daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue one text for encoding; the future resolves to its vector."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def encode(self, texts: List[str]):
+        """Encode texts through the shared queue and return their vectors in order."""
+        futures = [self.submit(text) for text in texts]
+        return [f.result() for f in futures]
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            texts = [item[0] for item in batch]
+            started = time.perf_counter()
+            try:
+                vectors = encode_texts(texts, self.model_name)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finished = time.perf_counter()
+
+            for (_, future, enqueued), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+            with self._stats_lock:
+                self._batches += 1
+                self._items += len(batch)
+                self._largest_batch = max(self._largest_batch, len(batch))
+                if len(batch) >= self.max_batch_size:
+                    self._full_batches += 1
+                self._total_wait_ms += sum((started - item[2]) * 1000 for item in batch)
+                self._total_encode_ms += (finished - started) * 1000
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "model": self.model_name,
+                "window_ms": self.window_ms,
+                "max_batch_size": self.max_batch_size,
+                "queue_depth": self._queue.qsize(),
+                "batches": self._batches,
+                "items": self._items,
+                "largest_batch": self._largest_batch,
+                "full_batches": self._full_batches,
+                "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+                "avg_queue_wait_ms": round(self._total_wait_ms / self._items, 3) if self._items else 0.0,
+                "avg_encode_ms": round(self._total_encode_ms / self._batches, 3) if self._batches else 0.0
+            }
+
+
+_batchers: Dict[str, EmbeddingBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(model_name: str) -> EmbeddingBatcher:
+    """Return the process-wide batcher for model_name."""
+    batcher = _batchers.get(model_name)
+    if batcher is None:
+        with _batchers_lock:
+            batcher = _batchers.get(model_name)
+            if batcher is None:
+                batcher = EmbeddingBatcher(model_name)
+                _batchers[model_name] = batcher
+    return batcher
+
+
+def batcher_stats() -> List[dict]:
+    return [b.stats() for b in _batchers.values()]
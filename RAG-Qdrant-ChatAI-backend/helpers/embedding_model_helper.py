@@ -0,0 +1,140 @@
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config import (
+    EMBEDDING_MODEL_NAME,
+    EMBEDDING_NORMALIZE,
+    EMBEDDING_BACKEND,
+    EMBEDDING_PRECISION,
+    EMBEDDING_ONNX_QUANTIZATION,
+    EMBEDDING_ONNX_FILE,
+    EMBEDDING_ONNX_EXPORT_DIR,
+)
+
+
+# ---------------------------
+# Embedding Model Registry
+# ---------------------------
+# One SentenceTransformer per (model, backend, precision) per process. Every
+# caller (EmbedService, vectorize_qa_list, the /api/vectorEmbed route) goes
+# through here so weights are loaded once, on first use.
+#
+# Backends (EMBEDDING_BACKEND / EMBEDDING_PRECISION):
+#   torch  fp32 | bf16 | int8   (int8 = torch dynamic quantization of Linear layers)
+#   onnx   fp32 | int8          (ONNX Runtime; needs `pip install optimum[onnxruntime]`)
+
+BACKENDS = ("torch", "onnx")
+PRECISIONS = ("fp32", "bf16", "int8")
+
+_models: Dict[Tuple[str, str, str], object] = {}
+_models_lock = threading.Lock()
+
+
+def _resolve(model_name, backend, precision) -> Tuple[str, str, str]:
+    name = model_name or EMBEDDING_MODEL_NAME
+    backend = (backend or EMBEDDING_BACKEND).lower()
+    precision = (precision or EMBEDDING_PRECISION).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {BACKENDS})")
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown embedding precision '{precision}' (expected one of {PRECISIONS})")
+    if backend == "onnx" and precision == "bf16":
+        raise ValueError("bf16 is only supported by the torch backend; use int8 or fp32 with onnx")
+    return name, backend, precision
+
+
+def get_embedding_model(model_name: Optional[str] = None, backend: Optional[str] = None,
+                        precision: Optional[str] = None):
+    """Return the shared model for model_name, loading it on first use."""
+    key = _resolve(model_name, backend, precision)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            print(f"Loading embedding model '{key[0]}' ({key[1]}, {key[2]})...")
+            model = _load_torch(*key) if key[1] == "torch" else _load_onnx(*key)
+            _models[key] = model
+    return model
+
+
+def _load_torch(name: str, backend: str, precision: str):
+    # Imported lazily so importing the app does not pull in torch
+    import torch
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(name, device="cpu")
+    if precision == "bf16":
+        model = model.to(torch.bfloat16)
+    elif precision == "int8":
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def _load_onnx(name: str, backend: str, precision: str):
+    from sentence_transformers import SentenceTransformer
+    if precision == "fp32":
+        model_kwargs = {"file_name": EMBEDDING_ONNX_FILE} if EMBEDDING_ONNX_FILE else None
+        return SentenceTransformer(name, backend="onnx", model_kwargs=model_kwargs)
+
+    file_suffix = f"qint8_{EMBEDDING_ONNX_QUANTIZATION}"
+    # One name for both the hub lookup and the local export, so a fresh export is the file that gets loaded
+    file_name = EMBEDDING_ONNX_FILE or f"onnx/model_{file_suffix}.onnx"
+    try:
+        # Many hub models (all-mpnet-base-v2 included) ship pre-quantized exports.
+        # export=False: a missing file must raise, not be replaced by an fp32 export
+        model = SentenceTransformer(name, backend="onnx", model_kwargs={"file_name": file_name, "export": False})
+        print(f"Loaded ONNX '{file_name}' for '{name}'")
+        return model
+    except Exception as e:
+        print(f"No '{file_name}' for '{name}' ({e}); exporting and quantizing locally...")
+
+    from sentence_transformers import export_dynamic_quantized_onnx_model
+    export_dir = os.path.join(EMBEDDING_ONNX_EXPORT_DIR, name.replace("/", "__"))
+    target = os.path.join(export_dir, file_name)
+    if not os.path.exists(target):
+        base = SentenceTransformer(name, backend="onnx")
+        base.save_pretrained(export_dir)
+        # Written as onnx/model_<file_suffix>.onnx; moved if EMBEDDING_ONNX_FILE names another file
+        export_dynamic_quantized_onnx_model(base, EMBEDDING_ONNX_QUANTIZATION, export_dir, file_suffix=file_suffix)
+        exported = os.path.join(export_dir, "onnx", f"model_{file_suffix}.onnx")
+        if os.path.abspath(exported) != os.path.abspath(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(exported, target)
+    model = SentenceTransformer(export_dir, backend="onnx", model_kwargs={"file_name": file_name, "export": False})
+    print(f"Loaded ONNX '{target}' for '{name}'")
+    return model
+
+
+def encode_texts(texts: List[str], model_name: Optional[str] = None, backend: Optional[str] = None,
+                 precision: Optional[str] = None, dim: Optional[int] = None):
+    """Encode a list of texts with the shared settings. Returns a numpy array."""
+    model = get_embedding_model(model_name, backend, precision)
+    return truncate_embeddings(model.encode(texts, normalize_embeddings=EMBEDDING_NORMALIZE), dim)
+
+
+def embedding_dimension(model_name: Optional[str] = None) -> int:
+    """Native output dimension of the model (loads it if needed)."""
+    return get_embedding_model(model_name).get_sentence_embedding_dimension()
+
+
+def truncate_embeddings(vectors, dim: Optional[int] = None):
+    """
+    Matryoshka-style truncation: keep the first dim components and re-normalize.
+    Only meaningful for models trained for it (e.g. nomic-embed, mxbai, gte-*-matryoshka).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if not dim or dim >= vectors.shape[-1]:
+        return vectors
+    vectors = vectors[..., :dim]
+    if EMBEDDING_NORMALIZE:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+    return vectors
+
+
+def loaded_models() -> List[str]:
+    """Models currently held in memory, as "name (backend, precision)"."""
+    return [f"{name} ({backend}, {precision})" for name, backend, precision in _models.keys()]
@@ -0,0 +1,107 @@
+import argparse
+import json
+import time
+from typing import List, Optional
+import numpy as np
+from helpers.embedding_model_helper import encode_texts
+
+
+# ---------------------------
+# Embedding backend parity + throughput check
+# ---------------------------
+# Compares a candidate backend/precision against the torch fp32 baseline on
+# a sample set: per-text cosine similarity of the two embeddings (drift =
+# 1 - cosine) and texts/second of each. Run before switching
+# EMBEDDING_BACKEND / EMBEDDING_PRECISION in production:
+#
+#   python -m helpers.embedding_parity_helper --backend onnx --precision int8
+#   python -m helpers.embedding_parity_helper --precision bf16 --texts-file questions.txt
+
+SAMPLE_TEXTS = [
+    "What is artificial intelligence?",
+    "How do I reset my password?",
+    "Who is the author of the document?",
+    "What is the date on the invoice?",
+    "Can I change my delivery address after ordering?",
+    "What are the office opening hours on weekends?",
+    "How long does a refund take to reach my bank account?",
+    "Explain the difference between supervised and unsupervised learning.",
+    "Which documents do I need to open a new account?",
+    "Is there a limit on the number of users per workspace?",
+    "How do I export my data as a CSV file?",
+    "What happens if I miss a monthly payment?",
+    "Does the warranty cover accidental damage?",
+    "How can I contact customer support outside business hours?",
+    "What programming languages does the SDK support?",
+    "Where can I find the API rate limits?",
+]
+
+
+def _cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return np.sum(a * b, axis=1)
+
+
+def _throughput(texts: List[str], model_name, backend, precision, batch_size: int, repeats: int) -> float:
+    encode_texts(texts[:batch_size], model_name, backend, precision)   # warm-up
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for i in range(0, len(texts), batch_size):
+            encode_texts(texts[i:i + batch_size], model_name, backend, precision)
+    return len(texts) * repeats / (time.perf_counter() - started)
+
+
+def run_parity_check(backend: str, precision: str, texts: Optional[List[str]] = None,
+                     model_name: Optional[str] = None, batch_size: int = 32, repeats: int = 3) -> dict:
+    texts = texts or SAMPLE_TEXTS
+    baseline = np.asarray(encode_texts(texts, model_name, "torch", "fp32"), dtype=np.float32)
+    candidate = np.asarray(encode_texts(texts, model_name, backend, precision), dtype=np.float32)
+    cosine = _cosine_rows(baseline, candidate)
+    worst = int(np.argmin(cosine))
+
+    baseline_tps = _throughput(texts, model_name, "torch", "fp32", batch_size, repeats)
+    candidate_tps = _throughput(texts, model_name, backend, precision, batch_size, repeats)
+    return {
+        "candidate": {"backend": backend, "precision": precision},
+        "samples": len(texts),
+        "cosine": {
+            "mean": round(float(cosine.mean()), 6),
+            "min": round(float(cosine.min()), 6),
+            "p05": round(float(np.percentile(cosine, 5)), 6)
+        },
+        "max_drift": round(float(1 - cosine.min()), 6),
+        "worst_text": texts[worst],
+        "throughput_texts_per_sec": {
+            "torch_fp32": round(baseline_tps, 1),
+            f"{backend}_{precision}": round(candidate_tps, 1),
+            "speedup": round(candidate_tps / baseline_tps, 2) if baseline_tps else None
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare an embedding backend against the torch fp32 baseline.")
+    parser.add_argument("--backend", default="onnx", choices=["torch", "onnx"])
+    parser.add_argument("--precision", default="int8", choices=["fp32", "bf16", "int8"])
+    parser.add_argument("--model", default=None, help="model name (default EMBEDDING_MODEL_NAME)")
+    parser.add_argument("--texts-file", default=None, help="one sample text per line (default: built-in samples)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-cosine", type=float, default=0.99,
+                        help="exit non-zero if any sample falls below this cosine")
+    args = parser.parse_args()
+
+    texts = None
+    if args.texts_file:
+        with open(args.texts_file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    report = run_parity_check(args.backend, args.precision, texts, args.model, args.batch_size, args.repeats)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if report["cosine"]["min"] < args.min_cosine:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,80 @@
 # app/helpers/gemini_helper.py
+import re
 from app.services.askGemini_service import GeminiService
+from helpers.token_helper import estimate_tokens, tokens_to_chars
+from config import CONTEXT_TOKEN_BUDGET, CONTEXT_MAX_ANSWER_TOKENS, CONTEXT_DEDUPE_SIMILARITY
 
-def get_human_like_answer(user_question: str, qdrant_points: list, gemini_service: GeminiService):
+def _word_set(text: str) -> set:
+    return set(re.findall(r"\w+", (text or "").casefold()))
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    max_chars = tokens_to_chars(max_tokens)
+    if max_tokens <= 0 or len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    # Prefer ending on a word boundary
+    if " " in cut[max_chars // 2:]:
+        cut = cut[:cut.rfind(" ")]
+    return cut.rstrip() + " ..."
+
+
+def pack_context_points(points: list, token_budget: int = CONTEXT_TOKEN_BUDGET,
+                        max_answer_tokens: int = CONTEXT_MAX_ANSWER_TOKENS,
+                        dedupe_similarity: float = CONTEXT_DEDUPE_SIMILARITY):
     """
-    Takes user question and Qdrant search points, sends a prompt to Gemini to get a human-like answer.
+    Choose which matched points go into the prompt. Points are taken in score
+    order, near-duplicates (word-set Jaccard of question + answer at or above
+    dedupe_similarity) are skipped, long answers are truncated, and packing stops
+    once the next point would exceed token_budget. Returns (points, stats).
     """
+    ordered = sorted(points, key=lambda point: point.get("score") or 0, reverse=True)
+    packed, seen, used_tokens = [], [], 0
+    duplicates, over_budget, truncated = 0, 0, 0
+
+    for point in ordered:
+        payload = point.get("payload") or {}
+        question = payload.get("question", "") or ""
+        answer = payload.get("answer", "") or ""
+
+        words = _word_set(f"{question} {answer}")
+        if any(len(words & other) / max(1, len(words | other)) >= dedupe_similarity for other in seen):
+            duplicates += 1
+            continue
+
+        short_answer = _truncate_to_tokens(answer, max_answer_tokens)
+        truncated += int(short_answer != answer)
+        tokens = estimate_tokens(question) + estimate_tokens(short_answer)
+        # Always keep the best point, even if it alone is over budget
+        if packed and used_tokens + tokens > token_budget:
+            over_budget += 1
+            continue
+
+        packed.append({**point, "payload": {**payload, "answer": short_answer}})
+        seen.append(words)
+        used_tokens += tokens
+
+    return packed, {
+        "points_received": len(points),
+        "points_used": len(packed),
+        "dropped_duplicates": duplicates,
+        "dropped_over_budget": over_budget,
+        "truncated_answers": truncated,
+        "context_tokens": used_tokens,
+        "token_budget": token_budget
+    }
+
+
+def build_human_like_prompt(user_question: str, qdrant_points: list) -> str:
+    """Build the Gemini prompt from the user question and the matched Qdrant points."""
     # Step 1: Format Qdrant points into readable Q&A
-    formatted = ""
-    for i, point in enumerate(qdrant_points, 1):
-        q = point["payload"].get("question", "")
-        a = point["payload"].get("answer", "")
-        formatted += f"{i}. Q: {q}\n   A: {a}\n"
+    formatted = "".join(
+        f"{i}. Q: {point['payload'].get('question', '')}\n   A: {point['payload'].get('answer', '')}\n"
+        for i, point in enumerate(qdrant_points, 1)
+    )
 
     # Step 2: Build prompt for Gemini
-    prompt = (
+    return (
         "You are a helpful AI assistant. Based on the following Q&A pairs, "
         "answer the user's question in a clear, human-like way. if the answer is not clear then just send single 0. thats it no more text just 0\n\n"
         f"{formatted}\n"
@@ -21,6 +82,32 @@ def get_human_like_answer(user_question: str, qdrant_points: list, gemini_servic
         "Answer:"
     )
 
+
+def prepare_human_like_prompt(user_question: str, qdrant_points: list):
+    """Pack the points into the context budget and build the prompt. Returns (prompt, context stats)."""
+    packed, context = pack_context_points(qdrant_points)
+    prompt = build_human_like_prompt(user_question, packed)
+    context["prompt_tokens"] = estimate_tokens(prompt)
+    return prompt, context
+
+
+def get_human_like_answer(user_question: str, qdrant_points: list, gemini_service: GeminiService):
+    """
+    Takes user question and Qdrant search points, sends a prompt to Gemini to get a human-like answer.
+    """
+    prompt, context = prepare_human_like_prompt(user_question, qdrant_points)
+
     # Step 3: Call Gemini service directly (not the Flask route)
     result = gemini_service.ask(prompt)
-    return {"answer": result['answer']}
+    return {"answer": result['answer'], "context": context}
+
+def stream_human_like_answer(user_question: str, qdrant_points: list, gemini_service: GeminiService,
+                             context: dict = None):
+    """
+    Same prompt as get_human_like_answer, but yields the answer text as Gemini generates it.
+    If a dict is passed as context it is filled with the context stats before the first token.
+    """
+    prompt, stats = prepare_human_like_prompt(user_question, qdrant_points)
+    if context is not None:
+        context.update(stats)
+    yield from gemini_service.ask_stream(prompt)
@@ -0,0 +1,208 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+# ---------------------------
+# Persistent PDF job store (SQLite)
+# ---------------------------
+# Job rows and per-chunk results live on disk so queued/running jobs and
+# finished chunks survive a restart. Every call opens its own connection,
+# which keeps the store safe to use from worker threads and from several
+# server processes sharing the same file.
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCEL_REQUESTED = "cancel_requested"
+JOB_CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING, JOB_CANCEL_REQUESTED)
+
+CHUNK_DONE = "done"
+CHUNK_ERROR = "error"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pdf_jobs (
+    id TEXT PRIMARY KEY,
+    filename TEXT,
+    file_path TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    total_chunks INTEGER,
+    completed_chunks INTEGER NOT NULL DEFAULT 0,
+    total_qa_generated INTEGER NOT NULL DEFAULT 0,
+    owner_pid INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    heartbeat_at REAL
+);
+CREATE TABLE IF NOT EXISTS pdf_job_chunks (
+    job_id TEXT NOT NULL,
+    chunk_index INTEGER NOT NULL,
+    heading TEXT,
+    status TEXT NOT NULL,
+    qa_pairs TEXT,
+    qa_count INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (job_id, chunk_index)
+);
+"""
+
+
+class PDFJobStore:
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---- jobs ----
+
+    def create_job(self, job_id: str, filename: str, file_path: str) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO pdf_jobs (id, filename, file_path, status, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, filename, file_path, JOB_QUEUED, now, now)
+            )
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM pdf_jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def claim_job(self, job_id: str) -> bool:
+        """Atomically move a queued job to running for this process."""
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE pdf_jobs SET status = ?, owner_pid = ?, heartbeat_at = ?, updated_at = ? "
+                "WHERE id = ? AND status = ?",
+                (JOB_RUNNING, os.getpid(), now, now, job_id, JOB_QUEUED)
+            )
+            return cur.rowcount == 1
+
+    def update_job(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE pdf_jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def finish_job(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        self.update_job(job_id, status=status, error=error, heartbeat_at=None)
+
+    def request_cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a queued job outright, or flag a running one. Returns the new status."""
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE pdf_jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (JOB_CANCELLED, now, job_id, JOB_QUEUED)
+            )
+            if cur.rowcount == 1:
+                return JOB_CANCELLED
+            cur = conn.execute(
+                "UPDATE pdf_jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (JOB_CANCEL_REQUESTED, now, job_id, JOB_RUNNING)
+            )
+            if cur.rowcount == 1:
+                return JOB_CANCEL_REQUESTED
+        job = self.get_job(job_id)
+        return job["status"] if job else None
+
+    def heartbeat_jobs(self, job_ids: List[str]) -> None:
+        """Mark jobs this process is working on as alive."""
+        if not job_ids:
+            return
+        now = time.time()
+        placeholders = ", ".join("?" for _ in job_ids)
+        with self._connect() as conn:
+            conn.execute(
+                f"UPDATE pdf_jobs SET heartbeat_at = ? WHERE id IN ({placeholders}) "
+                "AND owner_pid = ? AND status IN (?, ?)",
+                (now, *job_ids, os.getpid(), JOB_RUNNING, JOB_CANCEL_REQUESTED)
+            )
+
+    def requeue_stale_jobs(self, stale_after_seconds: float) -> int:
+        """Put running jobs whose worker stopped heartbeating back in the queue."""
+        cutoff = time.time() - stale_after_seconds
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE pdf_jobs SET status = ?, owner_pid = NULL, updated_at = ? "
+                "WHERE status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (JOB_QUEUED, time.time(), JOB_RUNNING, cutoff)
+            )
+            # A cancel that was never acted on is final once the worker is gone
+            conn.execute(
+                "UPDATE pdf_jobs SET status = ?, updated_at = ? "
+                "WHERE status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                (JOB_CANCELLED, time.time(), JOB_CANCEL_REQUESTED, cutoff)
+            )
+            return cur.rowcount
+
+    def list_job_ids(self, status: str) -> List[str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id FROM pdf_jobs WHERE status = ? ORDER BY created_at", (status,)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    # ---- chunks ----
+
+    def save_chunk(self, job_id: str, chunk_index: int, heading: str, status: str,
+                   qa_pairs: Optional[list] = None, error: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pdf_job_chunks "
+                "(job_id, chunk_index, heading, status, qa_pairs, qa_count, error, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, chunk_index, heading, status,
+                 json.dumps(qa_pairs, ensure_ascii=False) if qa_pairs is not None else None,
+                 len(qa_pairs or []), error, time.time())
+            )
+            conn.execute(
+                "UPDATE pdf_jobs SET "
+                "completed_chunks = (SELECT COUNT(*) FROM pdf_job_chunks WHERE job_id = ?), "
+                "total_qa_generated = (SELECT COALESCE(SUM(qa_count), 0) FROM pdf_job_chunks WHERE job_id = ?), "
+                "heartbeat_at = ?, updated_at = ? WHERE id = ?",
+                (job_id, job_id, time.time(), time.time(), job_id)
+            )
+
+    def completed_chunk_indexes(self, job_id: str) -> set:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT chunk_index FROM pdf_job_chunks WHERE job_id = ? AND status = ?", (job_id, CHUNK_DONE)
+            ).fetchall()
+        return {row["chunk_index"] for row in rows}
+
+    def get_chunks(self, job_id: str) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT chunk_index, heading, status, qa_pairs, error FROM pdf_job_chunks "
+                "WHERE job_id = ? ORDER BY chunk_index", (job_id,)
+            ).fetchall()
+        chunks = []
+        for row in rows:
+            chunk = dict(row)
+            chunk["qa_pairs"] = json.loads(chunk["qa_pairs"]) if chunk["qa_pairs"] else []
+            chunks.append(chunk)
+        return chunks
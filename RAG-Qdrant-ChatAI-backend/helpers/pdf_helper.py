@@ -1,11 +1,33 @@
 import PyPDF2
-import io
+import os
 import re
 import json
+import math
+import shutil
+import tempfile
+import threading
+import multiprocessing
 import requests
-from config import GEMINI_API_KEY, GEMINI_URL 
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from config import (
+    GEMINI_API_KEY,
+    GEMINI_URL,
+    PDF_SPOOL_DIR,
+    PDF_EXTRACT_WORKERS,
+    PDF_PARALLEL_MIN_PAGES,
+    PDF_PAGES_PER_TASK,
+    PDF_EXTRACT_MAX_MEMORY_MB,
+    PDF_WORKER_BASE_MEMORY_MB,
+    PDF_WORKER_MEMORY_FACTOR,
+    PDF_CHUNK_MODE,
+    PDF_CHUNK_TARGET_TOKENS,
+    PDF_CHUNK_MAX_TOKENS,
+    PDF_CHUNK_OVERLAP_TOKENS,
+)
+from helpers.token_helper import tokens_to_chars
 from typing import List, Dict, Any
-from sentence_transformers import SentenceTransformer
+from helpers.embedding_model_helper import encode_texts
 
 
 
@@ -17,17 +39,110 @@ def validate_pdf_file(file):
     """Validate uploaded file type."""
     if not file.filename.lower().endswith(".pdf"):
         raise ValueError("Only PDF allowed")
-    return file.read()
 
 
-def extract_text_from_pdf(pdf_bytes):
-    """Extract full text from PDF bytes."""
-    reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
-    full_text = ""
-    for page in reader.pages:
-        text = page.extract_text() or ""
-        full_text += text + "\n"
-    return full_text
+def spool_pdf_file(file) -> str:
+    """
+    Validate the upload and copy it to a temp file in fixed-size blocks, so the
+    PDF is never held in memory as one bytes object. Caller removes the file.
+    """
+    validate_pdf_file(file)
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=PDF_SPOOL_DIR or None)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(file.stream, out, 1024 * 1024)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def _read_page_range(pdf_path, start, stop):
+    """Text of pages [start, stop). Runs in extraction worker processes."""
+    # An open file handle lets PdfReader seek lazily instead of loading the whole file
+    with open(pdf_path, "rb") as stream:
+        reader = PyPDF2.PdfReader(stream)
+        return [reader.pages[index].extract_text() or "" for index in range(start, stop)]
+
+
+def _count_pages(pdf_path):
+    with open(pdf_path, "rb") as stream:
+        return len(PyPDF2.PdfReader(stream).pages)
+
+
+def _max_ranges_in_flight(pdf_path, page_count):
+    """
+    Page ranges one document may have in extraction at once. Each busy worker
+    keeps its own parsed copy of the PDF, estimated at PDF_WORKER_MEMORY_FACTOR
+    x file size on top of a PDF_WORKER_BASE_MEMORY_MB interpreter, so the count
+    is capped to keep the sum under PDF_EXTRACT_MAX_MEMORY_MB. 1 means in-process.
+    """
+    if PDF_EXTRACT_WORKERS <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        return 1
+    file_mb = os.path.getsize(pdf_path) / (1024 * 1024)
+    per_worker_mb = PDF_WORKER_BASE_MEMORY_MB + PDF_WORKER_MEMORY_FACTOR * file_mb
+    by_memory = int(PDF_EXTRACT_MAX_MEMORY_MB // per_worker_mb) if per_worker_mb else PDF_EXTRACT_WORKERS
+    by_pages = math.ceil(page_count / PDF_PAGES_PER_TASK)
+    return max(1, min(PDF_EXTRACT_WORKERS, by_memory, by_pages))
+
+
+_extract_pool = None
+_extract_pool_pid = None
+_extract_pool_lock = threading.Lock()
+
+
+def _get_extract_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all extractions in this server process, created on first use."""
+    global _extract_pool, _extract_pool_pid
+    if _extract_pool is not None and _extract_pool_pid == os.getpid():
+        return _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None or _extract_pool_pid != os.getpid():
+            # spawn, not fork: the server process has threads (and maybe torch) we must not copy
+            _extract_pool = ProcessPoolExecutor(max_workers=PDF_EXTRACT_WORKERS,
+                                                mp_context=multiprocessing.get_context("spawn"))
+            _extract_pool_pid = os.getpid()
+    return _extract_pool
+
+
+def iter_pdf_pages(pdf_path):
+    """
+    Yield the text of each page in order. Large documents are split into
+    page ranges and extracted on the process pool, with only as many ranges
+    in flight as the memory cap allows.
+    """
+    page_count = _count_pages(pdf_path)
+    in_flight = _max_ranges_in_flight(pdf_path, page_count)
+
+    if in_flight == 1:
+        with open(pdf_path, "rb") as stream:
+            reader = PyPDF2.PdfReader(stream)
+            for page in reader.pages:
+                yield page.extract_text() or ""
+        return
+
+    ranges = [(start, min(start + PDF_PAGES_PER_TASK, page_count))
+              for start in range(0, page_count, PDF_PAGES_PER_TASK)]
+    pool = _get_extract_pool()
+    pending = deque()
+    next_range = 0
+    try:
+        while next_range < len(ranges) or pending:
+            while next_range < len(ranges) and len(pending) < in_flight:
+                pending.append(pool.submit(_read_page_range, pdf_path, *ranges[next_range]))
+                next_range += 1
+            for text in pending.popleft().result():
+                yield text
+    finally:
+        # Consumer stopped early: drop ranges that have not started
+        for future in pending:
+            future.cancel()
+
+
+def extract_text_from_pdf(pdf_path):
+    """Extract full text from a PDF on disk (one newline-terminated block per page)."""
+    # Joined once at the end instead of growing a string page by page
+    return "".join(text + "\n" for text in iter_pdf_pages(pdf_path))
 
 
 def chunk_pdf_text(full_text):
@@ -55,10 +170,114 @@ def chunk_pdf_text(full_text):
     return chunks
 
 
+def _char_windows(word, max_chars, overlap_chars):
+    """Fixed windows of max_chars over one over-long word (unspaced text such as CJK), overlapping by overlap_chars."""
+    if len(word) <= max_chars:
+        return [word]
+    step = max(1, max_chars - overlap_chars)
+    # The last window ends at the end of the word, so no window is a tail already covered by the previous one
+    return [word[start:start + max_chars] for start in range(0, len(word) - overlap_chars, step)]
+
+
+def _split_section(heading, text, max_chars, overlap_chars):
+    """
+    Cut one oversized section into word-aligned windows that overlap by ~overlap_chars.
+    Words longer than max_chars fall back to fixed character windows.
+    """
+    words = [piece for word in text.split() for piece in _char_windows(word, max_chars, overlap_chars)]
+    pieces, start = [], 0
+    while start < len(words):
+        end, size = start, 0
+        while end < len(words) and (size + len(words[end]) + 1 <= max_chars or end == start):
+            size += len(words[end]) + 1
+            end += 1
+        pieces.append(" ".join(words[start:end]))
+        if end >= len(words):
+            break
+        # Step back far enough to repeat ~overlap_chars of context, but always move forward
+        back, overlap = end, 0
+        while back > start + 1 and overlap + len(words[back - 1]) + 1 <= overlap_chars:
+            back -= 1
+            overlap += len(words[back]) + 1
+        if overlap + len(words[end]) + 1 > max_chars:
+            # The next word would not fit next to the repeated context; a window of overlap alone is useless
+            back = end
+        start = back
+    return [
+        {"heading": heading, "headings": [heading], "part": index + 1, "parts": len(pieces), "text": piece}
+        for index, piece in enumerate(pieces)
+    ]
+
+
+def pack_chunks(sections, target_tokens, max_tokens, overlap_tokens):
+    """
+    Turn heading sections into evenly sized prompts: short sections (under a
+    quarter of target_tokens) are merged into the chunk before them while it
+    stays under target_tokens, and any section above max_tokens is split with
+    overlap_tokens of repeated context. Every other section starts a new chunk,
+    so editing one section only changes the chunks of its own group and the
+    chunk cache keeps hitting for the rest of a re-uploaded document. Every
+    chunk keeps "heading" (its first section) and "headings" (all it covers).
+    """
+    target_chars = tokens_to_chars(target_tokens)
+    max_chars = tokens_to_chars(max(max_tokens, target_tokens))
+    overlap_chars = min(tokens_to_chars(overlap_tokens), target_chars // 2)
+    # Below this a section is a fragment (stray heading, short note) worth merging
+    merge_below_chars = target_chars // 4
+
+    chunks, group, group_chars = [], [], 0
+
+    def flush():
+        if not group:
+            return
+        if len(group) == 1:
+            heading, text = group[0]
+            chunks.append({"heading": heading, "headings": [heading], "text": text})
+        else:
+            chunks.append({
+                "heading": group[0][0],
+                "headings": [heading for heading, _ in group],
+                # Keep the headings inline so the model still sees the section boundaries
+                "text": "\n\n".join(f"{heading}\n{text}" for heading, text in group)
+            })
+        group.clear()
+
+    for section in sections:
+        heading, text = section["heading"], section["text"].strip()
+        if not text:
+            continue
+        if len(text) > max_chars:
+            flush()
+            group_chars = 0
+            chunks.extend(_split_section(heading, text, target_chars, overlap_chars))
+            continue
+        section_chars = len(heading) + len(text) + 2
+        # Boundaries depend only on the sections since the last full-size one, not the whole document
+        if group and (section_chars >= merge_below_chars or group_chars + section_chars > target_chars):
+            flush()
+            group_chars = 0
+        group.append((heading, text))
+        group_chars += section_chars
+    flush()
+    return chunks
+
+
+def build_chunks(full_text):
+    """Chunk extracted text according to PDF_CHUNK_MODE ("packed" or legacy "heading")."""
+    sections = chunk_pdf_text(full_text)
+    if PDF_CHUNK_MODE != "packed":
+        return sections
+    return pack_chunks(sections, PDF_CHUNK_TARGET_TOKENS, PDF_CHUNK_MAX_TOKENS, PDF_CHUNK_OVERLAP_TOKENS)
+
+
 # ---------------------------
 # Gemini Helpers
 # ---------------------------
 
+# Bump whenever build_gemini_prompt changes so cached chunk results are not reused
+PROMPT_TEMPLATE_VERSION = "1"
+
+
 def build_gemini_prompt(text):
     """Build a clean JSON-only instruction prompt for Gemini."""
     return f"""
@@ -124,13 +343,20 @@ def parse_gemini_response(data, raw_text, chunk_text):
         return [{"question": chunk_text[:50], "answer": answer_text}]
 
 
+def is_cacheable_gemini_result(status, qa_list, chunk_text):
+    """True when Gemini answered OK and returned a real Q&A list (not the raw-text fallback)."""
+    if status != 200 or not isinstance(qa_list, list):
+        return False
+    if len(qa_list) == 1 and qa_list[0].get("question") == chunk_text[:50]:
+        return False
+    return all(isinstance(item, dict) and "question" in item for item in qa_list)
+
+
 # ---------------------------
 # Vectorization Helper
 # ---------------------------
 
-_embedding_model = SentenceTransformer("sentence-transformers/all-mpnet-base-v2")
-
-def vectorize_qa_list(qa_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def vectorize_qa_list(qa_list: List[Dict[str, Any]], model_name: str = None, dim: int = None) -> List[Dict[str, Any]]:
     """
     Vectorize a list of Q/A pairs into embeddings.
 
@@ -138,6 +364,8 @@ def vectorize_qa_list(qa_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         qa_list: List of dicts with keys:
             - "question" (str)
             - "answer" (str)
+        model_name: embedding model (default EMBEDDING_MODEL_NAME)
+        dim: optional Matryoshka truncation of the vectors
 
     Returns:
         List of dicts with keys:
@@ -151,8 +379,8 @@ def vectorize_qa_list(qa_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     # Extract questions
     questions = [item.get("question", "") for item in qa_list]
 
-    # Get embeddings
-    vectors = _embedding_model.encode(questions).tolist()
+    # Get embeddings (shared model, same normalization as EmbedService)
+    vectors = encode_texts(questions, model_name, dim=dim).tolist()
 
     # Build enriched response
     enriched = []
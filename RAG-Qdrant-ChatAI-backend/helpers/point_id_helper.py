@@ -0,0 +1,24 @@
+import re
+import uuid
+
+
+# ---------------------------
+# Point ID helpers
+# ---------------------------
+
+# Fixed namespace so the same (collection, question) maps to the same id everywhere
+QA_POINT_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "rag-based-AiChatbot/qa-point")
+
+
+def normalize_question(question: str) -> str:
+    return re.sub(r"\s+", " ", question or "").strip().casefold()
+
+
+def make_point_id(collection: str, question: str, deterministic: bool) -> str:
+    """
+    Deterministic ids are uuid5(collection + normalized question), so re-ingesting
+    the same Q&A overwrites the existing point instead of adding a duplicate.
+    """
+    if deterministic:
+        return str(uuid.uuid5(QA_POINT_NAMESPACE, f"{collection}\n{normalize_question(question)}"))
+    return str(uuid.uuid4())
@@ -0,0 +1,173 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from config import (
+    QDRANT_HOST,
+    QDRANT_API_KEY,
+    QDRANT_POOL_SIZE,
+    QDRANT_MAX_RETRIES,
+    QDRANT_BACKOFF_BASE_SECONDS,
+    QDRANT_BACKOFF_MAX_SECONDS,
+    QDRANT_CONNECT_TIMEOUT,
+    QDRANT_OP_TIMEOUTS,
+)
+
+
+# ---------------------------
+# Qdrant HTTP transport
+# ---------------------------
+# Keep-alive connection pool, per-operation timeouts, jittered retries for
+# idempotent calls and per-operation latency counters. Every QdrantService
+# call goes through one shared instance.
+
+# Read timeouts (seconds) per logical operation; QDRANT_OP_TIMEOUTS overrides
+DEFAULT_OP_TIMEOUTS = {
+    "search": 5,
+    "scroll": 15,
+    "get_point": 5,
+    "collection_info": 5,
+    "create_collection": 30,
+    "delete_collection": 30,
+    "upsert": 30,
+    "delete_points": 15,
+    "default": 10
+}
+
+RETRY_STATUS_CODES = {429, 502, 503, 504}
+_LATENCY_SAMPLES = 512
+
+
+class QdrantTransport:
+    def __init__(self, base_url: str = QDRANT_HOST, pool_size: int = QDRANT_POOL_SIZE,
+                 max_retries: int = QDRANT_MAX_RETRIES):
+        self.base_url = (base_url or "").rstrip("/")
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.timeouts = {**DEFAULT_OP_TIMEOUTS, **QDRANT_OP_TIMEOUTS}
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _get_session(self) -> requests.Session:
+        # Pooled sockets must not be shared across forked workers
+        if self._session is not None and self._session_pid == os.getpid():
+            return self._session
+        with self._session_lock:
+            if self._session is None or self._session_pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                if QDRANT_API_KEY:
+                    session.headers["api-key"] = QDRANT_API_KEY
+                self._session = session
+                self._session_pid = os.getpid()
+        return self._session
+
+    def request(self, method: str, path: str, op: str = "default", json: Any = None,
+                params: Optional[dict] = None, idempotent: Optional[bool] = None,
+                timeout: Optional[float] = None) -> requests.Response:
+        """
+        Send one request to Qdrant. Idempotent calls (GET/PUT/DELETE by default,
+        or any call flagged idempotent=True) are retried with jittered backoff on
+        connection errors, timeouts and 429/502/503/504.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in ("GET", "PUT", "DELETE")
+        read_timeout = timeout or self.timeouts.get(op, self.timeouts["default"])
+        url = f"{self.base_url}{path}"
+        attempts = self.max_retries + 1 if idempotent else 1
+
+        for attempt in range(attempts):
+            started = time.perf_counter()
+            try:
+                response = self._get_session().request(
+                    method, url, json=json, params=params,
+                    timeout=(QDRANT_CONNECT_TIMEOUT, read_timeout)
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                self._record(op, time.perf_counter() - started, error=True, retried=attempt > 0)
+                if attempt + 1 >= attempts:
+                    raise
+                self._sleep_backoff(attempt)
+                continue
+
+            self._record(op, time.perf_counter() - started,
+                         error=response.status_code >= 500, retried=attempt > 0)
+            if response.status_code in RETRY_STATUS_CODES and attempt + 1 < attempts:
+                self._sleep_backoff(attempt)
+                continue
+            return response
+
+    def get(self, path: str, op: str = "default", **kwargs) -> requests.Response:
+        return self.request("GET", path, op=op, **kwargs)
+
+    def post(self, path: str, op: str = "default", **kwargs) -> requests.Response:
+        return self.request("POST", path, op=op, **kwargs)
+
+    def put(self, path: str, op: str = "default", **kwargs) -> requests.Response:
+        return self.request("PUT", path, op=op, **kwargs)
+
+    def delete(self, path: str, op: str = "default", **kwargs) -> requests.Response:
+        return self.request("DELETE", path, op=op, **kwargs)
+
+    def _sleep_backoff(self, attempt: int):
+        # Full jitter: sleep somewhere in [0, min(max, base * 2^attempt)]
+        cap = min(QDRANT_BACKOFF_MAX_SECONDS, QDRANT_BACKOFF_BASE_SECONDS * (2 ** attempt))
+        time.sleep(random.uniform(0, cap))
+
+    def _record(self, op: str, elapsed: float, error: bool, retried: bool):
+        with self._stats_lock:
+            entry = self._stats.get(op)
+            if entry is None:
+                entry = {"calls": 0, "errors": 0, "retries": 0, "total_ms": 0.0,
+                         "samples": deque(maxlen=_LATENCY_SAMPLES)}
+                self._stats[op] = entry
+            entry["calls"] += 1
+            entry["errors"] += int(error)
+            entry["retries"] += int(retried)
+            entry["total_ms"] += elapsed * 1000
+            entry["samples"].append(elapsed * 1000)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            result = {}
+            for op, entry in self._stats.items():
+                samples = sorted(entry["samples"])
+                result[op] = {
+                    "calls": entry["calls"],
+                    "errors": entry["errors"],
+                    "retries": entry["retries"],
+                    "avg_ms": round(entry["total_ms"] / entry["calls"], 3) if entry["calls"] else 0.0,
+                    "p50_ms": round(_percentile(samples, 0.50), 3),
+                    "p99_ms": round(_percentile(samples, 0.99), 3)
+                }
+            return {"pool_size": self.pool_size, "max_retries": self.max_retries, "operations": result}
+
+
+def _percentile(sorted_samples, q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_qdrant_transport() -> QdrantTransport:
+    """Return the process-wide Qdrant transport."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = QdrantTransport()
+    return _transport
@@ -0,0 +1,339 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+
+# ---------------------------
+# In-process collection replicas
+# ---------------------------
+# A read replica of a Qdrant collection: ids, payloads and one contiguous
+# float32 matrix of unit vectors, so a cosine top-k is a single mat-vec.
+# Replicas are loaded in the background with points/scroll, kept current by
+# the service's own writes (write-through) and fully resynced on a timer,
+# which also bounds staleness for writes made by other worker processes.
+# Searches on a replica run concurrently (numpy releases the GIL for the
+# mat-vec); a write waits for them and blocks new ones only while it applies.
+
+_SCROLL_PAGE = 1024
+# After a failed or skipped build, wait this long before trying the collection again
+_BUILD_RETRY_SECONDS = 30
+
+
+class _ReadWriteLock:
+    """Many readers or one writer. Waiting writers go first, so searches cannot starve them."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+class CollectionReplica:
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.lock = _ReadWriteLock()
+        self.size = 0
+        self.matrix = np.empty((0, dim), dtype=np.float32)
+        self.ids: List[Any] = []
+        self.payloads: List[Any] = []
+        self.rows: Dict[str, int] = {}
+        self.synced_at = time.monotonic()
+
+    @staticmethod
+    def _unit_rows(vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def _ensure_capacity(self, needed: int):
+        if needed <= self.matrix.shape[0]:
+            return
+        # Grow geometrically so single inserts stay amortized O(dim)
+        grown = np.empty((max(needed, self.matrix.shape[0] * 2, 64), self.dim), dtype=np.float32)
+        grown[:self.size] = self.matrix[:self.size]
+        self.matrix = grown
+
+    def upsert(self, points: List[dict]):
+        if not points:
+            return
+        vectors = self._unit_rows([point["vector"] for point in points])
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Replica dimension {self.dim} does not match vector dimension {vectors.shape[1]}")
+        self._ensure_capacity(self.size + len(points))
+        for point, vector in zip(points, vectors):
+            key = str(point["id"])
+            row = self.rows.get(key)
+            if row is None:
+                row = self.size
+                self.size += 1
+                self.ids.append(point["id"])
+                self.payloads.append(point.get("payload"))
+                self.rows[key] = row
+            else:
+                self.payloads[row] = point.get("payload")
+            self.matrix[row] = vector
+
+    def delete(self, point_ids: List[Any]):
+        for point_id in point_ids:
+            row = self.rows.pop(str(point_id), None)
+            if row is None:
+                continue
+            # Move the last row into the hole to keep the matrix contiguous
+            last = self.size - 1
+            if row != last:
+                self.matrix[row] = self.matrix[last]
+                self.ids[row] = self.ids[last]
+                self.payloads[row] = self.payloads[last]
+                self.rows[str(self.ids[row])] = row
+            self.ids.pop()
+            self.payloads.pop()
+            self.size -= 1
+
+    def search(self, vector, top: int) -> List[dict]:
+        if self.size == 0 or top <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = self.matrix[:self.size] @ query
+        top = min(top, self.size)
+        best = np.argpartition(-scores, top - 1)[:top]
+        best = best[np.argsort(-scores[best])]
+        return [
+            {"id": self.ids[row], "score": float(scores[row]), "payload": self.payloads[row]}
+            for row in best
+        ]
+
+
+class ReplicaManager:
+    def __init__(self, transport, collections: Optional[List[str]] = None, max_points: int = 200000,
+                 resync_seconds: float = 300, max_staleness_seconds: float = 600):
+        self.transport = transport
+        # None means every collection that gets searched
+        self.collections = set(collections) if collections else None
+        self.max_points = max_points
+        self.resync_seconds = resync_seconds
+        self.max_staleness_seconds = max_staleness_seconds
+        self._replicas: Dict[str, CollectionReplica] = {}
+        self._building: Dict[str, list] = {}     # collection -> writes seen while its build runs
+        self._skipped: Dict[str, str] = {}       # collection -> reason it is not replicated
+        self._retry_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.build_errors = 0
+
+    def _check_pid(self):
+        # A forked worker starts empty: build threads do not survive fork
+        if self._pid != os.getpid():
+            self._replicas, self._building, self._skipped, self._retry_at = {}, {}, {}, {}
+            self._pid = os.getpid()
+
+    def wants(self, collection: str) -> bool:
+        return self.collections is None or collection in self.collections
+
+    def search(self, collection: str, vector, top: int) -> Optional[List[dict]]:
+        """Top-k from the local replica, or None when it is missing or stale (caller asks Qdrant)."""
+        if not self.wants(collection):
+            return None
+        with self._lock:
+            self._check_pid()
+            replica = self._replicas.get(collection)
+            age = time.monotonic() - replica.synced_at if replica else None
+            if replica is None or age > self.resync_seconds:
+                self._start_build(collection)
+            if replica is None or age > self.max_staleness_seconds:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # Score outside the manager lock: other searches and writes to other collections go on meanwhile
+        with replica.lock.read():
+            return replica.search(vector, top)
+
+    def apply_upsert(self, collection: str, points: List[dict]):
+        """Write-through for points the service just upserted (each with id, vector, payload)."""
+        self._apply(collection, "upsert", points)
+
+    def apply_delete(self, collection: str, point_ids: List[Any]):
+        self._apply(collection, "delete", point_ids)
+
+    def drop(self, collection: str):
+        """Forget a collection (deleted or recreated); the next search rebuilds it."""
+        with self._lock:
+            self._check_pid()
+            self._replicas.pop(collection, None)
+            self._skipped.pop(collection, None)
+            self._retry_at.pop(collection, None)
+            if collection in self._building:
+                self._building[collection].append(("drop", None))
+
+    def _apply(self, collection: str, op: str, items: list):
+        with self._lock:
+            self._check_pid()
+            if collection in self._building:
+                self._building[collection].append((op, items))
+            replica = self._replicas.get(collection)
+            if replica is None:
+                return
+
+        try:
+            with replica.lock.write():
+                getattr(replica, op)(items)
+        except Exception as e:
+            # Cannot mirror this write: stop serving the replica until it is rebuilt
+            print(f"Replica of '{collection}' dropped after failed {op}: {e}")
+            self._forget(collection, replica)
+            return
+        if replica.size > self.max_points:
+            self._forget(collection, replica, skip_reason=f"more than {self.max_points} points")
+
+    def _forget(self, collection: str, replica: CollectionReplica, skip_reason: str = None):
+        with self._lock:
+            # It may already have been dropped or replaced by a rebuild
+            if self._replicas.get(collection) is not replica:
+                return
+            self._replicas.pop(collection)
+            if skip_reason:
+                self._skipped[collection] = skip_reason
+
+    def _start_build(self, collection: str):
+        # Caller holds self._lock
+        if collection in self._building or collection in self._skipped:
+            return
+        if time.monotonic() < self._retry_at.get(collection, 0):
+            return
+        self._building[collection] = []
+        threading.Thread(target=self._build, args=(collection,), name=f"replica-{collection}", daemon=True).start()
+
+    def _build(self, collection: str):
+        try:
+            replica = self._load(collection)
+        except Exception as e:
+            print(f"Replica build for '{collection}' failed: {e}")
+            with self._lock:
+                self.build_errors += 1
+                self._building.pop(collection, None)
+                self._retry_at[collection] = time.monotonic() + _BUILD_RETRY_SECONDS
+            return
+
+        with self._lock:
+            pending = self._building.pop(collection, [])
+            if replica is None:
+                self._retry_at[collection] = time.monotonic() + _BUILD_RETRY_SECONDS
+                return
+            dropped = False
+            # Replay writes that raced with the scroll
+            for op, items in pending:
+                if op == "drop":
+                    dropped = True
+                    continue
+                try:
+                    getattr(replica, op)(items)
+                except Exception:
+                    dropped = True
+            if not dropped:
+                self._replicas[collection] = replica
+                self.builds += 1
+
+    def _load(self, collection: str) -> Optional[CollectionReplica]:
+        info = self.transport.get(f"/collections/{collection}", op="collection_info")
+        if info.status_code != 200:
+            return None
+        result = info.json().get("result", {})
+        points_count = result.get("points_count") or 0
+        if points_count > self.max_points:
+            with self._lock:
+                self._skipped[collection] = f"more than {self.max_points} points"
+            return None
+        vectors_config = result.get("config", {}).get("params", {}).get("vectors", {})
+        dim = vectors_config.get("size")
+        if not dim:
+            # Named vectors are not replicated
+            with self._lock:
+                self._skipped[collection] = "unsupported vectors config"
+            return None
+        if vectors_config.get("distance", "Cosine") != "Cosine":
+            # Rows are stored as unit vectors, so only cosine scores match Qdrant's
+            with self._lock:
+                self._skipped[collection] = f"{vectors_config['distance']} distance"
+            return None
+
+        replica = CollectionReplica(dim)
+        replica._ensure_capacity(points_count)
+        offset = None
+        while True:
+            payload = {"limit": _SCROLL_PAGE, "with_payload": True, "with_vector": True}
+            if offset is not None:
+                payload["offset"] = offset
+            r = self.transport.post(f"/collections/{collection}/points/scroll", op="scroll",
+                                    json=payload, idempotent=True)
+            if r.status_code != 200:
+                raise RuntimeError(f"scroll failed with HTTP {r.status_code}")
+            page = r.json().get("result", {})
+            replica.upsert([point for point in page.get("points", []) if point.get("vector") is not None])
+            offset = page.get("next_page_offset")
+            if offset is None:
+                break
+        replica.synced_at = time.monotonic()
+        return replica
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._check_pid()
+            now = time.monotonic()
+            lookups = self.hits + self.misses
+            return {
+                "collections": {
+                    name: {"points": replica.size, "dim": replica.dim,
+                           "age_seconds": round(now - replica.synced_at, 1)}
+                    for name, replica in self._replicas.items()
+                },
+                "building": list(self._building),
+                "skipped": dict(self._skipped),
+                "resync_seconds": self.resync_seconds,
+                "max_staleness_seconds": self.max_staleness_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "builds": self.builds,
+                "build_errors": self.build_errors,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,110 @@
+from typing import List
+
+
+# ---------------------------
+# searchPoint response bodies and stream events
+# ---------------------------
+# Built here once so QdrantService and AsyncSearchService answer with the same
+# shapes; the services only decide which one applies and do the I/O.
+
+def _cache_info(cached: dict) -> dict:
+    return {"hit": True, "similarity": cached["similarity"], "cached_question": cached["value"]["user_question"]}
+
+
+def _direct_info(direct: dict) -> dict:
+    return {key: direct[key] for key in ("point_id", "score", "threshold")}
+
+
+def search_failed_response(details) -> dict:
+    return {"error": "Failed to search points", "details": details}
+
+
+def cache_hit_response(query: str, cached: dict) -> dict:
+    return {
+        "user_question": query,
+        "human_like_answer": cached["value"]["human_like_answer"],
+        "msg": "answer served from cache for a near-identical question",
+        "top_points": cached["value"]["top_points"],
+        "answer_source": "cache",
+        "answer_cache": _cache_info(cached)
+    }
+
+
+def no_points_response(query: str) -> dict:
+    return {
+        "user_question": query,
+        "human_like_answer": "0",
+        "msg": "No matched points found in Qdrant",
+        "top_points": []
+    }
+
+
+def direct_answer_response(query: str, points: list, source: str, direct: dict) -> dict:
+    return {
+        "user_question": query,
+        "human_like_answer": direct["answer"],
+        "msg": "stored answer of a near-exact match, returned without Gemini",
+        "top_points": points,
+        "search_source": source,
+        "answer_source": "direct",
+        "direct_answer": _direct_info(direct),
+        "answer_cache": {"hit": False}
+    }
+
+
+def llm_answer_response(query: str, answer: str, points: list, source: str, context: dict) -> dict:
+    return {
+        "user_question": query,
+        "human_like_answer": answer,
+        "msg": "these are the matched points(questions) from qdrant",
+        "top_points": points,
+        "search_source": source,
+        "answer_source": "llm",
+        "context": context,
+        "answer_cache": {"hit": False}
+    }
+
+
+# Stream events (see QdrantService.search_point_stream for the sequence)
+
+def search_failed_event(details) -> dict:
+    return {"event": "error", **search_failed_response(details)}
+
+
+def error_event(error: str) -> dict:
+    return {"event": "error", "error": error}
+
+
+def points_event(query: str, points: list, source: str) -> dict:
+    return {"event": "points", "user_question": query, "top_points": points, "search_source": source}
+
+
+def token_event(text: str) -> dict:
+    return {"event": "token", "text": text}
+
+
+def cache_hit_events(query: str, cached: dict) -> List[dict]:
+    answer = cached["value"]["human_like_answer"]
+    return [
+        {"event": "points", "user_question": query, "top_points": cached["value"]["top_points"]},
+        token_event(answer),
+        {"event": "done", "user_question": query, "human_like_answer": answer, "answer_source": "cache",
+         "answer_cache": _cache_info(cached)}
+    ]
+
+
+def no_points_event(query: str) -> dict:
+    return {"event": "done", "user_question": query, "human_like_answer": "0", "msg": "No matched points found in Qdrant"}
+
+
+def direct_answer_events(query: str, direct: dict) -> List[dict]:
+    return [
+        token_event(direct["answer"]),
+        {"event": "done", "user_question": query, "human_like_answer": direct["answer"], "answer_source": "direct",
+         "direct_answer": _direct_info(direct), "answer_cache": {"hit": False}}
+    ]
+
+
+def llm_done_event(query: str, answer: str, context: dict) -> dict:
+    return {"event": "done", "user_question": query, "human_like_answer": answer, "answer_source": "llm",
+            "context": context, "answer_cache": {"hit": False}}
@@ -0,0 +1,148 @@
+import json
+import os
+import shutil
+import struct
+import tempfile
+from typing import Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from helpers.vector_codec_helper import OCTET_STREAM_MIMETYPE, pack_float32
+
+
+# ---------------------------
+# Collection snapshot file format
+# ---------------------------
+# A snapshot holds every point of a collection so it can be restored or
+# cloned without re-embedding:
+#
+#   magic        8 bytes  b"QASNAP01"
+#   payloads     NDJSON, one {"id", "payload"} line per point, in vector order
+#   padding      zeros up to a 64-byte boundary
+#   vectors      count x dim little-endian float32, row-major
+#   footer       JSON: collection, count, dim, offsets, embedding settings
+#   footer size  8 bytes, little-endian uint64
+#   magic        8 bytes  b"QASNAP01"
+#
+# The footer comes last so export can stream points as they are scrolled;
+# the vector block sits at a known offset so import can np.memmap it.
+
+SNAPSHOT_MAGIC = b"QASNAP01"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MIMETYPE = OCTET_STREAM_MIMETYPE
+SNAPSHOT_EXTENSION = ".qasnap"
+_ALIGN = 64
+_TRAILER = struct.Struct("<Q8s")
+_FOOTER_INT_FIELDS = ("count", "dim", "payload_offset", "vector_offset")
+
+
+def iter_snapshot_bytes(pages: Iterable[List[dict]], metadata: dict, dim: int,
+                        spool_dir: Optional[str] = None) -> Iterator[bytes]:
+    """
+    Encode pages of points (each with id, payload, vector) as a snapshot, yielding
+    byte chunks. Payload lines are yielded as they arrive; vectors are spooled to a
+    temp file until the payload section is complete.
+    """
+    spool = tempfile.TemporaryFile(dir=spool_dir or None)
+    try:
+        yield SNAPSHOT_MAGIC
+        offset, count = len(SNAPSHOT_MAGIC), 0
+        for points in pages:
+            if not points:
+                continue
+            vectors = []
+            for point in points:
+                vector = point.get("vector")
+                if not isinstance(vector, list) or len(vector) != dim:
+                    raise ValueError(f"Point {point.get('id')} has no {dim}-d vector (named vectors are not supported)")
+                vectors.append(vector)
+            lines = "".join(
+                json.dumps({"id": point["id"], "payload": point.get("payload")}, ensure_ascii=False) + "\n"
+                for point in points
+            ).encode("utf-8")
+            spool.write(pack_float32(vectors))
+            count += len(points)
+            offset += len(lines)
+            yield lines
+
+        payload_bytes = offset - len(SNAPSHOT_MAGIC)
+        padding = -offset % _ALIGN
+        yield b"\0" * padding
+        vector_offset = offset + padding
+
+        spool.seek(0)
+        while True:
+            block = spool.read(1024 * 1024)
+            if not block:
+                break
+            yield block
+
+        footer = json.dumps({
+            **metadata,
+            "format": "qa-snapshot",
+            "version": SNAPSHOT_VERSION,
+            "count": count,
+            "dim": dim,
+            "payload_offset": len(SNAPSHOT_MAGIC),
+            "payload_bytes": payload_bytes,
+            "vector_offset": vector_offset,
+            "vector_bytes": count * dim * 4
+        }, ensure_ascii=False).encode("utf-8")
+        yield footer + _TRAILER.pack(len(footer), SNAPSHOT_MAGIC)
+    finally:
+        spool.close()
+
+
+def spool_snapshot_file(file, spool_dir: Optional[str] = None) -> str:
+    """Copy an uploaded snapshot to a temp file in fixed-size blocks. Caller removes the file."""
+    fd, path = tempfile.mkstemp(suffix=SNAPSHOT_EXTENSION, dir=spool_dir or None)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(file.stream, out, 1024 * 1024)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def read_snapshot_footer(path: str) -> dict:
+    """Validate the snapshot framing and return its footer. Raises ValueError."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        if size < len(SNAPSHOT_MAGIC) + _TRAILER.size or f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError("Not a Q&A snapshot file")
+        f.seek(size - _TRAILER.size)
+        footer_size, magic = _TRAILER.unpack(f.read(_TRAILER.size))
+        if magic != SNAPSHOT_MAGIC or footer_size > size - _TRAILER.size:
+            raise ValueError("Snapshot is truncated")
+        f.seek(size - _TRAILER.size - footer_size)
+        try:
+            footer = json.loads(f.read(footer_size).decode("utf-8"))
+        except ValueError:
+            raise ValueError("Snapshot footer is corrupt")
+    if not isinstance(footer, dict) or not all(isinstance(footer.get(key), int) for key in _FOOTER_INT_FIELDS):
+        raise ValueError("Snapshot footer is corrupt")
+
+    if footer.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {footer.get('version')}")
+    vector_end = footer["vector_offset"] + footer["count"] * footer["dim"] * 4
+    if vector_end > size - _TRAILER.size - footer_size:
+        raise ValueError("Snapshot is truncated")
+    return footer
+
+
+def iter_snapshot_batches(path: str, footer: dict, batch_size: int) -> Iterator[Tuple[int, List[dict]]]:
+    """Yield (offset, points) batches; vectors are read from a memory map of the vector block."""
+    count, dim = footer["count"], footer["dim"]
+    if count == 0:
+        return
+    vectors = np.memmap(path, dtype="<f4", mode="r", offset=footer["vector_offset"], shape=(count, dim))
+    with open(path, "rb") as f:
+        f.seek(footer["payload_offset"])
+        for offset in range(0, count, batch_size):
+            rows = range(offset, min(offset + batch_size, count))
+            records = [json.loads(f.readline()) for _ in rows]
+            # One copy out of the map per batch; tolist() yields Python floats for the JSON body
+            block = np.asarray(vectors[rows.start:rows.stop]).tolist()
+            yield offset, [
+                {"id": record["id"], "vector": vector, "payload": record.get("payload")}
+                for record, vector in zip(records, block)
+            ]
@@ -0,0 +1,105 @@
+import json
+from typing import Iterable, Iterator, List, Optional
+from flask import Response, stream_with_context
+
+
+# ---------------------------
+# Streaming response helpers
+# ---------------------------
+# Events are plain dicts with an "event" key. They are written either as
+# NDJSON (one JSON object per line) or as Server-Sent Events. SSEDecoder and
+# gemini_chunk_texts read Gemini's own SSE stream (streamGenerateContent).
+
+NDJSON = "ndjson"
+SSE = "sse"
+
+STREAM_MIMETYPES = {
+    NDJSON: "application/x-ndjson",
+    SSE: "text/event-stream"
+}
+
+
+def resolve_stream_format(requested: Optional[str], accept_mimetypes=None) -> Optional[str]:
+    """
+    Pick the stream format from an explicit ?stream= value (ndjson|sse|true)
+    or, failing that, from the Accept header. Returns None for a normal response.
+    """
+    if requested:
+        requested = requested.lower()
+        if requested in (NDJSON, SSE):
+            return requested
+        if requested in ("1", "true", "yes"):
+            return NDJSON
+
+    if accept_mimetypes is not None:
+        best = accept_mimetypes.best_match(list(STREAM_MIMETYPES.values()) + ["application/json"])
+        # Only stream when the client explicitly prefers a stream type over JSON
+        if best and best != "application/json" and accept_mimetypes[best] > accept_mimetypes["application/json"]:
+            return NDJSON if best == STREAM_MIMETYPES[NDJSON] else SSE
+    return None
+
+
+def format_event(event: dict, fmt: str) -> str:
+    data = json.dumps(event, ensure_ascii=False)
+    if fmt == SSE:
+        return f"event: {event.get('event', 'message')}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+def streaming_response(events: Iterable[dict], fmt: str) -> Response:
+    """Wrap an event generator in a Flask streaming response."""
+    def generate():
+        for event in events:
+            yield format_event(event, fmt)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype=STREAM_MIMETYPES[fmt],
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop nginx-style proxies from buffering the whole stream
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+class SSEDecoder:
+    """
+    Incremental Server-Sent Events decoder. Feed it the stream one line at a
+    time; it returns an event's data once the blank line ending the event
+    arrives. Multi-line data fields are joined with newlines, as the spec says.
+    """
+
+    def __init__(self):
+        self._data: List[str] = []
+
+    def feed(self, line: str) -> Optional[str]:
+        line = line.rstrip("\r\n")
+        if not line:
+            return self.flush()
+        if line.startswith(":"):
+            # Comment / keep-alive
+            return None
+        field, _, value = line.partition(":")
+        if field == "data":
+            self._data.append(value[1:] if value.startswith(" ") else value)
+        return None
+
+    def flush(self) -> Optional[str]:
+        """Data of a final event the stream ended without a blank line for, if any."""
+        if not self._data:
+            return None
+        data = "\n".join(self._data)
+        self._data = []
+        return data
+
+
+def gemini_chunk_texts(data: str) -> Iterator[str]:
+    """Answer text in one streamGenerateContent event. An error event raises."""
+    chunk = json.loads(data)
+    if "error" in chunk:
+        raise Exception(f"Gemini API error: {chunk['error']}")
+    for candidate in chunk.get("candidates", []):
+        for part in candidate.get("content", {}).get("parts", []):
+            if part.get("text"):
+                yield part["text"]
@@ -0,0 +1,21 @@
+import math
+
+
+# ---------------------------
+# Token estimates
+# ---------------------------
+# Sizing only: no tokenizer is loaded. English prose averages roughly four
+# characters per token for Gemini and sentence-transformer vocabularies,
+# which is close enough to keep prompts and contexts inside their budgets.
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def tokens_to_chars(tokens: int) -> int:
+    return max(0, int(tokens)) * CHARS_PER_TOKEN
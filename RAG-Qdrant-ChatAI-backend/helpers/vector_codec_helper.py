@@ -0,0 +1,32 @@
+import base64
+import numpy as np
+
+
+# ---------------------------
+# Binary vector encoding
+# ---------------------------
+
+OCTET_STREAM_MIMETYPE = "application/octet-stream"
+BASE64_MIMETYPE = "application/x-float32-base64"
+
+
+def to_float32_matrix(vectors) -> np.ndarray:
+    """Return vectors as a 2-D little-endian float32 array (one row per vector)."""
+    matrix = np.asarray(vectors, dtype="<f4")
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    return matrix
+
+
+def pack_float32(vectors) -> bytes:
+    """Pack vectors row-major as little-endian float32."""
+    return np.ascontiguousarray(to_float32_matrix(vectors)).tobytes()
+
+
+def pack_float32_base64(vectors) -> bytes:
+    return base64.b64encode(pack_float32(vectors))
+
+
+def unpack_float32(buffer: bytes, dim: int) -> np.ndarray:
+    """Inverse of pack_float32."""
+    return np.frombuffer(buffer, dtype="<f4").reshape(-1, dim)
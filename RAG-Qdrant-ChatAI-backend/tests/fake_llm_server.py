@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ---------------------------
+# Fake streaming LLM + Qdrant search server for tests
+# ---------------------------
+# Serves Gemini's streamGenerateContent (SSE) and Qdrant's points/search on
+# 127.0.0.1 with an ephemeral port. What the stream sends is picked by a
+# marker in the prompt (which contains the user's question):
+#
+#   SPLIT_FRAMES   tokens written in small TCP pieces, a comment line, and one
+#                  event whose JSON spans two "data:" lines
+#   HTTP_ERROR     HTTP 500 before any data
+#   STREAM_ERROR   one token, then an SSE event carrying {"error": ...}
+#   MULTIBYTE      non-ASCII tokens, sent as raw UTF-8 and split inside a
+#                  multi-byte character, with no charset on the Content-Type
+#   (otherwise)    "Hello", " world" as one event each
+#
+# Searches on a collection whose name starts with "missing" return 404.
+
+POINTS = [
+    {"id": 1, "score": 0.42, "payload": {"question": "What is Qdrant?", "answer": "A vector database."}},
+    {"id": 2, "score": 0.38, "payload": {"question": "What is RAG?", "answer": "Retrieval-augmented generation."}}
+]
+
+
+MULTIBYTE_TOKENS = ["नमस्ते", " — ✓", " 你好 🙂"]
+
+
+def gemini_event(text: str, ensure_ascii: bool = True) -> str:
+    return json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]}, ensure_ascii=ensure_ascii)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode("utf-8")
+        if self.path.startswith("/collections/"):
+            self._search()
+        elif "streamGenerateContent" in self.path:
+            self._stream(body)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _search(self):
+        collection = self.path.split("/")[2]
+        if collection.startswith("missing"):
+            self._send_json(404, {"status": {"error": f"Collection `{collection}` doesn't exist!"}})
+        else:
+            self._send_json(200, {"result": POINTS, "status": "ok"})
+
+    def _stream(self, body: str):
+        if "HTTP_ERROR" in body:
+            self._send_json(500, {"error": {"code": 500, "message": "upstream exploded"}})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        if "SPLIT_FRAMES" in body:
+            frame = f"data: {gemini_event('Hello')}\r\n\r\n"
+            # One event cut into pieces, so lines arrive across several reads
+            for piece in (frame[:7], frame[7:20], frame[20:]):
+                self._write(piece)
+            self._write(": keep-alive\n\n")
+            split = gemini_event(" world")
+            middle = split.index("[{")
+            self._write(f"data: {split[:middle]}\ndata: {split[middle:]}\n\n")
+            # Last event ends without the blank line
+            self._write(f"data: {gemini_event('!')}\n")
+        elif "MULTIBYTE" in body:
+            raw = "".join(f"data: {gemini_event(text, ensure_ascii=False)}\n\n"
+                          for text in MULTIBYTE_TOKENS).encode("utf-8")
+            # Cut in the middle of the first multi-byte character
+            cut = raw.index("न".encode("utf-8")) + 1
+            self._write_bytes(raw[:cut])
+            self._write_bytes(raw[cut:])
+        elif "STREAM_ERROR" in body:
+            self._write(f"data: {gemini_event('Partial')}\n\n")
+            self._write(f"data: {json.dumps({'error': {'code': 503, 'message': 'overloaded'}})}\n\n")
+        else:
+            self._write(f"data: {gemini_event('Hello')}\n\n")
+            self._write(f"data: {gemini_event(' world')}\n\n")
+
+    def _write(self, text: str):
+        self._write_bytes(text.encode("utf-8"))
+
+    def _write_bytes(self, data: bytes):
+        self.wfile.write(data)
+        self.wfile.flush()
+        time.sleep(0.01)
+
+
+class FakeLLMServer:
+    def __init__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self.stream_url = f"{self.url}/v1beta/models/fake:streamGenerateContent?alt=sse"
+
+    def start(self) -> "FakeLLMServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
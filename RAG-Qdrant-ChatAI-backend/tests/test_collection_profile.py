@@ -0,0 +1,84 @@
+import unittest
+
+from helpers.collection_profile_helper import (
+    PRESETS,
+    build_collection_payload,
+    build_search_params,
+    resolve_profile,
+)
+
+
+class ResolveProfileTest(unittest.TestCase):
+    def test_invalid_profiles_are_rejected(self):
+        cases = [
+            ("fast", "Unknown profile preset 'fast'"),
+            ({"preset": "nope"}, "Unknown profile preset 'nope'"),
+            ([], "profile must be an object"),
+            ({"replicas": 2}, "Unknown profile option(s): replicas"),
+            ({"hnsw": []}, "hnsw must be an object"),
+            ({"hnsw": {"m": 16, "levels": 3}}, "Unknown hnsw option(s): levels"),
+            ({"quantization": {"bits": 4}}, "Unknown quantization option(s): bits"),
+            ({"on_disk": "yes"}, "on_disk must be true or false"),
+            ({"on_disk_payload": 1}, "on_disk_payload must be true or false"),
+            ({"indexing_threshold": -1}, "indexing_threshold must be an integer >= 0"),
+            ({"hnsw_ef": 0}, "hnsw_ef must be an integer between 1 and 4096"),
+            ({"hnsw_ef": True}, "hnsw_ef must be an integer between 1 and 4096"),
+            ({"hnsw": {"m": 129}}, "hnsw.m must be an integer between 0 and 128"),
+            ({"hnsw": {"m": 16.5}}, "hnsw.m must be an integer between 0 and 128"),
+            ({"hnsw": {"ef_construct": 2}}, "hnsw.ef_construct must be an integer between 4 and 1024"),
+            ({"quantization": {"type": "product"}}, "quantization.type must be one of none, scalar, binary"),
+            ({"preset": "binary", "quantization": {"quantile": 0.9}},
+             "quantization.quantile only applies to scalar quantization"),
+            ({"quantization": {"rescore": True}}, "quantization options need quantization.type scalar or binary"),
+            ({"quantization": {"type": "scalar", "quantile": 0.2}},
+             "quantization.quantile must be a number between 0.5 and 1.0"),
+            ({"quantization": {"type": "scalar", "oversampling": 20}},
+             "quantization.oversampling must be a number between 1.0 and 16.0"),
+            ({"quantization": {"type": "scalar", "always_ram": "true"}},
+             "quantization.always_ram must be true or false"),
+        ]
+        for profile, message in cases:
+            with self.subTest(profile=profile):
+                with self.assertRaises(ValueError) as raised:
+                    resolve_profile(profile)
+                self.assertIn(message, str(raised.exception))
+
+    def test_default_and_named_presets(self):
+        self.assertEqual(resolve_profile(), {"preset": "default"})
+        self.assertEqual(resolve_profile(None, default_preset="low_memory")["preset"], "low_memory")
+        for name in PRESETS:
+            with self.subTest(preset=name):
+                self.assertEqual(resolve_profile(name)["preset"], name)
+
+    def test_overrides_merge_onto_the_preset(self):
+        resolved = resolve_profile({"preset": "low_memory", "hnsw": {"m": 32}, "quantization": {"oversampling": 3.0}})
+        self.assertEqual(resolved["hnsw"], {"m": 32})
+        self.assertEqual(resolved["quantization"]["oversampling"], 3.0)
+        self.assertEqual(resolved["quantization"]["quantile"], 0.99)
+        self.assertTrue(resolved["on_disk"])
+        # The preset itself is left alone
+        self.assertEqual(PRESETS["low_memory"]["quantization"]["oversampling"], 2.0)
+
+    def test_switching_quantization_type_drops_preset_settings(self):
+        resolved = resolve_profile({"preset": "low_memory", "quantization": {"type": "binary"}})
+        self.assertEqual(resolved["quantization"], {"type": "binary"})
+
+
+class ProfilePayloadTest(unittest.TestCase):
+    def test_low_memory_payload_and_search_params(self):
+        profile = resolve_profile("low_memory")
+        self.assertEqual(build_collection_payload(384, profile), {
+            "vectors": {"size": 384, "distance": "Cosine", "on_disk": True},
+            "on_disk_payload": True,
+            "quantization_config": {"scalar": {"type": "int8", "quantile": 0.99, "always_ram": True}}
+        })
+        self.assertEqual(build_search_params(profile), {"quantization": {"rescore": True, "oversampling": 2.0}})
+
+    def test_default_profile_uses_qdrant_defaults(self):
+        profile = resolve_profile()
+        self.assertEqual(build_collection_payload(768, profile), {"vectors": {"size": 768, "distance": "Cosine"}})
+        self.assertIsNone(build_search_params(profile))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import os
+import tempfile
+import unittest
+
+from helpers.collection_registry_helper import CollectionRegistry
+
+_DATA_DIR = tempfile.mkdtemp(prefix="rag-registry-tests-")
+
+
+class CollectionRegistryTest(unittest.TestCase):
+    def setUp(self):
+        path = os.path.join(tempfile.mkdtemp(dir=_DATA_DIR), "collections.sqlite3")
+        # Two registries on one file stand in for two worker processes
+        self.worker_a = CollectionRegistry(path)
+        self.worker_b = CollectionRegistry(path)
+
+    def test_collection_created_by_another_worker_is_seen_at_once(self):
+        self.assertIsNone(self.worker_a.get("faq"))
+        self.worker_b.set("faq", "intfloat/e5-small-v2", 384, {"preset": "low_memory"})
+        entry = self.worker_a.get("faq")
+        self.assertEqual((entry["model_name"], entry["dim"]), ("intfloat/e5-small-v2", 384))
+        self.assertEqual(entry["profile"], {"preset": "low_memory"})
+
+    def test_own_writes_and_deletes(self):
+        self.worker_a.set("faq", "model-a", 768)
+        self.assertEqual(self.worker_a.get("faq")["model_name"], "model-a")
+        self.worker_a.delete("faq")
+        self.assertIsNone(self.worker_a.get("faq"))
+        self.assertEqual(self.worker_b.list(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import tempfile
+import time
+import unittest
+
+# Keep the SQLite stores out of the working tree; must happen before config is imported
+_DATA_DIR = tempfile.mkdtemp(prefix="rag-job-tests-")
+os.environ.setdefault("PDF_JOB_DB_PATH", os.path.join(_DATA_DIR, "pdf_jobs.sqlite3"))
+os.environ.setdefault("PDF_JOB_SPOOL_DIR", os.path.join(_DATA_DIR, "pdf_job_files"))
+os.environ.setdefault("COLLECTION_REGISTRY_PATH", os.path.join(_DATA_DIR, "collections.sqlite3"))
+os.environ.setdefault("CHUNK_CACHE_PATH", os.path.join(_DATA_DIR, "chunk_cache.sqlite3"))
+
+from app.services.pdf_job_service import PDFJobService  # noqa: E402
+from helpers.job_store_helper import (  # noqa: E402
+    PDFJobStore,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_CANCEL_REQUESTED,
+    JOB_CANCELLED,
+    CHUNK_DONE,
+    CHUNK_ERROR,
+)
+
+
+class _ChunkedPDFService:
+    # Stands in for PDFService: fixed chunks, and records which ones were sent to Gemini
+    def __init__(self, chunks, failing=()):
+        self.chunks = chunks
+        self.failing = set(failing)
+        self.processed = []
+
+    def prepare_chunks_from_path(self, file_path):
+        return self.chunks
+
+    def iter_process_chunks(self, chunks):
+        for index, chunk in enumerate(chunks):
+            self.processed.append(chunk["heading"])
+            if chunk["heading"] in self.failing:
+                yield {"event": "chunk_error", "index": index, "heading": chunk["heading"], "error": "boom"}
+            else:
+                yield {"event": "chunk", "index": index, "heading": chunk["heading"],
+                       "qa_pairs": [{"question": f"{chunk['heading']}?", "answer": chunk["text"]}]}
+
+
+def _chunks(count):
+    return [{"heading": f"H{index}", "text": f"text {index}"} for index in range(count)]
+
+
+class PDFJobStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = PDFJobStore(os.path.join(tempfile.mkdtemp(dir=_DATA_DIR), "jobs.sqlite3"))
+        self.store.create_job("job", "doc.pdf", "/nowhere/doc.pdf")
+
+    def test_claim_is_exclusive(self):
+        self.assertTrue(self.store.claim_job("job"))
+        self.assertFalse(self.store.claim_job("job"))
+        job = self.store.get_job("job")
+        self.assertEqual(job["status"], JOB_RUNNING)
+        self.assertEqual(job["owner_pid"], os.getpid())
+
+    def test_stale_running_job_is_requeued(self):
+        self.store.claim_job("job")
+        self.assertEqual(self.store.requeue_stale_jobs(60), 0)
+
+        self.store.update_job("job", heartbeat_at=time.time() - 120)
+        self.assertEqual(self.store.requeue_stale_jobs(60), 1)
+        job = self.store.get_job("job")
+        self.assertEqual(job["status"], JOB_QUEUED)
+        self.assertIsNone(job["owner_pid"])
+        self.assertEqual(self.store.list_job_ids(JOB_QUEUED), ["job"])
+
+    def test_heartbeat_keeps_a_job_alive(self):
+        self.store.claim_job("job")
+        self.store.update_job("job", heartbeat_at=time.time() - 120)
+        self.store.heartbeat_jobs(["job"])
+        self.assertEqual(self.store.requeue_stale_jobs(60), 0)
+
+    def test_stale_cancel_request_becomes_cancelled(self):
+        self.store.claim_job("job")
+        self.assertEqual(self.store.request_cancel("job"), JOB_CANCEL_REQUESTED)
+        self.store.update_job("job", heartbeat_at=time.time() - 120)
+        self.store.requeue_stale_jobs(60)
+        self.assertEqual(self.store.get_job("job")["status"], JOB_CANCELLED)
+
+    def test_only_done_chunks_count_as_completed(self):
+        self.store.save_chunk("job", 0, "H0", CHUNK_DONE, qa_pairs=[{"question": "q", "answer": "a"}])
+        self.store.save_chunk("job", 1, "H1", CHUNK_ERROR, error="boom")
+        self.assertEqual(self.store.completed_chunk_indexes("job"), {0})
+        job = self.store.get_job("job")
+        self.assertEqual((job["completed_chunks"], job["total_qa_generated"]), (2, 1))
+
+
+class PDFJobResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.pdf_service = _ChunkedPDFService(_chunks(4))
+        self.jobs = PDFJobService(pdf_service=self.pdf_service)
+        self.jobs.store = PDFJobStore(os.path.join(tempfile.mkdtemp(dir=_DATA_DIR), "jobs.sqlite3"))
+        self.store = self.jobs.store
+        self.store.create_job("job", "doc.pdf", os.path.join(_DATA_DIR, "missing.pdf"))
+
+    def test_requeued_job_resumes_after_finished_chunks(self):
+        # A worker finished chunks 0 and 2 (and failed 1) before it died
+        self.store.claim_job("job")
+        self.store.save_chunk("job", 0, "H0", CHUNK_DONE, qa_pairs=[])
+        self.store.save_chunk("job", 1, "H1", CHUNK_ERROR, error="boom")
+        self.store.save_chunk("job", 2, "H2", CHUNK_DONE, qa_pairs=[])
+        self.store.update_job("job", heartbeat_at=time.time() - 120)
+        self.store.requeue_stale_jobs(60)
+
+        self.assertTrue(self.store.claim_job("job"))
+        self.jobs._process_job("job")
+
+        self.assertEqual(self.pdf_service.processed, ["H1", "H3"])
+        self.assertEqual(self.store.get_job("job")["status"], JOB_COMPLETED)
+        self.assertEqual(self.store.completed_chunk_indexes("job"), {0, 1, 2, 3})
+
+    def test_job_fails_when_every_chunk_fails(self):
+        self.pdf_service.failing = {"H0", "H1", "H2", "H3"}
+        self.store.claim_job("job")
+        self.jobs._process_job("job")
+        job = self.store.get_job("job")
+        self.assertEqual(job["status"], JOB_FAILED)
+        self.assertIn("All 4 chunk(s) failed", job["error"])
+
+    def test_cancel_stops_a_running_job(self):
+        self.store.claim_job("job")
+        self.store.request_cancel("job")
+        self.jobs._process_job("job")
+        self.assertEqual(self.pdf_service.processed, ["H0"])
+        self.assertEqual(self.store.get_job("job")["status"], JOB_CANCELLED)
+
+
+if __name__ == "__main__":
+    unittest.main()
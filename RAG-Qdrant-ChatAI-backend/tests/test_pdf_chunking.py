@@ -0,0 +1,101 @@
+import random
+import unittest
+
+from helpers.pdf_helper import _char_windows, _split_section, pack_chunks
+from helpers.token_helper import tokens_to_chars
+
+TARGET, MAX, OVERLAP = 100, 200, 10
+TARGET_CHARS, OVERLAP_CHARS = tokens_to_chars(TARGET), tokens_to_chars(OVERLAP)
+
+
+def _words(count, seed):
+    rng = random.Random(seed)
+    return " ".join("".join(rng.choice("abcdefghij") for _ in range(rng.randint(2, 9))) for _ in range(count))
+
+
+def _document(seed=0):
+    """Sections of mixed size: fragments, full-size ones and a few above MAX."""
+    rng = random.Random(seed)
+    sections = []
+    for index in range(40):
+        size = rng.choice([3, 12, 20, 20, 25, 25, 400])
+        sections.append({"heading": f"Section {index}", "text": _words(size, seed * 1000 + index)})
+    return sections
+
+
+class CharWindowsTest(unittest.TestCase):
+    def test_short_word_is_kept(self):
+        self.assertEqual(_char_windows("abc", 10, 2), ["abc"])
+
+    def test_windows_overlap_and_cover_the_word(self):
+        word = "".join(chr(0x4e00 + i % 500) for i in range(10000))
+        windows = _char_windows(word, 400, 40)
+        self.assertTrue(all(len(window) <= 400 for window in windows))
+        for previous, current in zip(windows, windows[1:]):
+            self.assertEqual(previous[-40:], current[:40])
+        self.assertTrue(word.endswith(windows[-1]))
+        self.assertEqual(windows[0] + "".join(window[40:] for window in windows[1:]), word)
+
+
+class SplitSectionTest(unittest.TestCase):
+    def test_word_windows_stay_in_bounds_and_overlap(self):
+        text = _words(2000, 1)
+        pieces = _split_section("H", text, TARGET_CHARS, OVERLAP_CHARS)
+        self.assertGreater(len(pieces), 1)
+        self.assertTrue(all(len(piece["text"]) <= TARGET_CHARS for piece in pieces))
+        self.assertEqual([piece["part"] for piece in pieces], list(range(1, len(pieces) + 1)))
+        for previous, current in zip(pieces, pieces[1:]):
+            # The next window starts with words repeated from the end of the previous one
+            words = current["text"].split(" ")
+            self.assertTrue(any(previous["text"].endswith(" ".join(words[:n])) for n in range(1, len(words))))
+        self.assertEqual(pieces[-1]["text"].split()[-1], text.split()[-1])
+
+    def test_unspaced_text_is_bounded(self):
+        text = "字" * 100000
+        pieces = _split_section("H", text, TARGET_CHARS, OVERLAP_CHARS)
+        self.assertTrue(all(len(piece["text"]) <= TARGET_CHARS for piece in pieces))
+
+    def test_no_overlap_only_window_before_a_long_word(self):
+        text = "hello world " + "x" * 5000 + " tail"
+        pieces = [piece["text"] for piece in _split_section("H", text, TARGET_CHARS, OVERLAP_CHARS)]
+        self.assertEqual(pieces[0], "hello world")
+        self.assertNotIn("world", pieces[1:])
+
+
+class PackChunksTest(unittest.TestCase):
+    def test_fragments_merge_into_the_previous_chunk(self):
+        sections = [
+            {"heading": "Intro", "text": _words(40, 1)},
+            {"heading": "Note:", "text": "short"},
+            {"heading": "Details", "text": _words(40, 2)}
+        ]
+        chunks = pack_chunks(sections, TARGET, MAX, OVERLAP)
+        self.assertEqual([chunk["headings"] for chunk in chunks], [["Intro", "Note:"], ["Details"]])
+        self.assertIn("Note:\nshort", chunks[0]["text"])
+
+    def test_chunks_stay_under_the_max(self):
+        chunks = pack_chunks(_document(), TARGET, MAX, OVERLAP)
+        self.assertTrue(all(len(chunk["text"]) <= tokens_to_chars(MAX) for chunk in chunks))
+
+    def test_editing_one_section_keeps_other_chunks_identical(self):
+        sections = _document(seed=3)
+        before = pack_chunks(sections, TARGET, MAX, OVERLAP)
+
+        def full_size(section):
+            return TARGET_CHARS // 4 <= len(section["text"]) <= tokens_to_chars(MAX)
+
+        # A full-size section followed by another, so no fragment can change groups
+        index = next(i for i in range(5, len(sections) - 1) if full_size(sections[i]) and full_size(sections[i + 1]))
+        edited = [dict(section) for section in sections]
+        edited[index]["text"] += " " + _words(30, 99)
+        after = pack_chunks(edited, TARGET, MAX, OVERLAP)
+
+        heading = edited[index]["heading"]
+        untouched_before = [chunk["text"] for chunk in before if heading not in chunk["headings"]]
+        untouched_after = [chunk["text"] for chunk in after if heading not in chunk["headings"]]
+        self.assertEqual(untouched_before, untouched_after)
+        self.assertNotEqual([chunk["text"] for chunk in before], [chunk["text"] for chunk in after])
+
+
+if __name__ == "__main__":
+    unittest.main()
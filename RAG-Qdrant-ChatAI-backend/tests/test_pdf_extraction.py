@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from helpers import pdf_helper
+from helpers.pdf_helper import _max_ranges_in_flight, extract_text_from_pdf, iter_pdf_pages
+
+_DATA_DIR = tempfile.mkdtemp(prefix="rag-pdf-tests-")
+
+
+def _write_text_pdf(path, page_texts):
+    """Minimal PDF with one line of Helvetica text per page."""
+    count = len(page_texts)
+    kids = " ".join(f"{4 + 2 * index} 0 R" for index in range(count))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {count} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for index, text in enumerate(page_texts):
+        content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {5 + 2 * index} 0 R "
+                       f"/Resources << /Font << /F1 3 0 R >> >> >>".encode())
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as stream:
+        stream.write(out)
+    return path
+
+
+class PDFExtractionTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pages = [f"Page {index} text" for index in range(1, 10)]
+        cls.path = _write_text_pdf(os.path.join(_DATA_DIR, "nine_pages.pdf"), cls.pages)
+
+    def test_in_process_extraction_keeps_page_order(self):
+        with mock.patch.object(pdf_helper, "PDF_EXTRACT_WORKERS", 1):
+            self.assertEqual([text.strip() for text in iter_pdf_pages(self.path)], self.pages)
+
+    def test_parallel_extraction_keeps_page_order(self):
+        with mock.patch.multiple(pdf_helper, PDF_EXTRACT_WORKERS=2, PDF_PARALLEL_MIN_PAGES=1, PDF_PAGES_PER_TASK=2):
+            try:
+                self.assertEqual(_max_ranges_in_flight(self.path, len(self.pages)), 2)
+                self.assertEqual([text.strip() for text in iter_pdf_pages(self.path)], self.pages)
+            finally:
+                pdf_helper._get_extract_pool().shutdown()
+                pdf_helper._extract_pool = None
+
+    def test_full_text_has_one_line_per_page(self):
+        with mock.patch.object(pdf_helper, "PDF_EXTRACT_WORKERS", 1):
+            text = extract_text_from_pdf(self.path)
+        self.assertEqual([line.strip() for line in text.splitlines()], self.pages)
+
+    def test_memory_cap_limits_ranges_in_flight(self):
+        with mock.patch.multiple(pdf_helper, PDF_EXTRACT_WORKERS=8, PDF_PARALLEL_MIN_PAGES=1, PDF_PAGES_PER_TASK=1,
+                                 PDF_WORKER_BASE_MEMORY_MB=100, PDF_WORKER_MEMORY_FACTOR=0,
+                                 PDF_EXTRACT_MAX_MEMORY_MB=350):
+            self.assertEqual(_max_ranges_in_flight(self.path, 9), 3)
+        with mock.patch.multiple(pdf_helper, PDF_EXTRACT_WORKERS=8, PDF_PARALLEL_MIN_PAGES=1,
+                                 PDF_WORKER_BASE_MEMORY_MB=100, PDF_WORKER_MEMORY_FACTOR=0,
+                                 PDF_EXTRACT_MAX_MEMORY_MB=50):
+            # Never below one: a single range runs in-process
+            self.assertEqual(_max_ranges_in_flight(self.path, 9), 1)
+
+    def test_small_documents_stay_in_process(self):
+        with mock.patch.multiple(pdf_helper, PDF_EXTRACT_WORKERS=4, PDF_PARALLEL_MIN_PAGES=50):
+            self.assertEqual(_max_ranges_in_flight(self.path, 9), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+import uuid
+
+# Keep the SQLite stores out of the working tree; must happen before config is imported
+_DATA_DIR = tempfile.mkdtemp(prefix="rag-point-id-tests-")
+os.environ.setdefault("COLLECTION_REGISTRY_PATH", os.path.join(_DATA_DIR, "collections.sqlite3"))
+os.environ.setdefault("CHUNK_CACHE_PATH", os.path.join(_DATA_DIR, "chunk_cache.sqlite3"))
+
+from app.services.qdrant_service import QdrantService  # noqa: E402
+from helpers.point_id_helper import QA_POINT_NAMESPACE, make_point_id, normalize_question  # noqa: E402
+
+
+class MakePointIdTest(unittest.TestCase):
+    def test_deterministic_id_is_uuid5_of_collection_and_question(self):
+        point_id = make_point_id("faq", "What is Qdrant?", True)
+        self.assertEqual(point_id, str(uuid.uuid5(QA_POINT_NAMESPACE, "faq\nwhat is qdrant?")))
+        self.assertEqual(uuid.UUID(point_id).version, 5)
+
+    def test_case_and_whitespace_do_not_change_the_id(self):
+        self.assertEqual(normalize_question("  What   is\tQdrant? "), "what is qdrant?")
+        self.assertEqual(make_point_id("faq", "What is Qdrant?", True),
+                         make_point_id("faq", "  what IS   qdrant?\n", True))
+
+    def test_id_is_per_collection(self):
+        self.assertNotEqual(make_point_id("faq", "What is Qdrant?", True),
+                            make_point_id("docs", "What is Qdrant?", True))
+
+    def test_random_ids_when_not_deterministic(self):
+        first, second = make_point_id("faq", "q", False), make_point_id("faq", "q", False)
+        self.assertNotEqual(first, second)
+        self.assertEqual(uuid.UUID(first).version, 4)
+
+
+class DedupeByPointIdTest(unittest.TestCase):
+    def test_last_duplicate_wins_at_the_first_position(self):
+        qa_list = [
+            {"question": "What is Qdrant?", "answer": "old"},
+            {"question": "What is RAG?", "answer": "rag"},
+            {"question": "what is  qdrant?", "answer": "new"},
+        ]
+        deduped = QdrantService._dedupe_by_point_id(qa_list, "faq")
+        self.assertEqual([item["answer"] for item in deduped], ["new", "rag"])
+
+    def test_distinct_questions_are_kept_in_order(self):
+        qa_list = [{"question": f"q{index}", "answer": str(index)} for index in range(5)]
+        self.assertEqual(QdrantService._dedupe_by_point_id(qa_list, "faq"), qa_list)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import random
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from helpers.replica_helper import CollectionReplica, ReplicaManager
+
+DIM = 8
+
+
+def _brute_force(points: dict, vector, top: int) -> list:
+    """Cosine top-k over {id: (vector, payload)}, computed directly."""
+    query = np.asarray(vector, dtype=np.float64)
+    scored = []
+    for point_id, (stored, payload) in points.items():
+        stored = np.asarray(stored, dtype=np.float64)
+        score = float(stored @ query / (np.linalg.norm(stored) * np.linalg.norm(query)))
+        scored.append((score, point_id, payload))
+    scored.sort(key=lambda item: -item[0])
+    return scored[:top]
+
+
+class CollectionReplicaTest(unittest.TestCase):
+    def assertMatchesBruteForce(self, replica, points, vector, top):
+        expected = _brute_force(points, vector, top)
+        scores = {point_id: score for score, point_id, _ in _brute_force(points, vector, len(points))}
+        found = replica.search(vector, top)
+        self.assertEqual(len(found), len(expected))
+        for hit, (score, _, _) in zip(found, expected):
+            # Same score at each rank (ties may swap ids), and each hit carries its own score and payload
+            self.assertAlmostEqual(hit["score"], score, places=5)
+            self.assertAlmostEqual(hit["score"], scores[hit["id"]], places=5)
+            self.assertEqual(hit["payload"], points[hit["id"]][1])
+        self.assertEqual([hit["score"] for hit in found], sorted((hit["score"] for hit in found), reverse=True))
+
+    def test_random_upserts_and_deletes_match_brute_force(self):
+        rng = random.Random(7)
+        replica, points = CollectionReplica(DIM), {}
+
+        def random_vector():
+            return [rng.uniform(-1, 1) for _ in range(DIM)]
+
+        for step in range(300):
+            op = rng.random()
+            if op < 0.6 or not points:
+                batch = [{"id": rng.randrange(150), "vector": random_vector(), "payload": {"step": step}}
+                         for _ in range(rng.randint(1, 5))]
+                replica.upsert(batch)
+                for point in batch:
+                    points[point["id"]] = (point["vector"], point["payload"])
+            else:
+                doomed = rng.sample(sorted(points), k=min(len(points), rng.randint(1, 4))) + [9999]
+                replica.delete(doomed)
+                for point_id in doomed:
+                    points.pop(point_id, None)
+
+            self.assertEqual(replica.size, len(points))
+            if step % 10 == 0:
+                self.assertMatchesBruteForce(replica, points, random_vector(), rng.randint(1, 20))
+        self.assertMatchesBruteForce(replica, points, random_vector(), len(points) + 5)
+
+    def test_string_and_int_ids_share_a_key(self):
+        replica = CollectionReplica(2)
+        replica.upsert([{"id": 5, "vector": [1, 0], "payload": "old"}])
+        replica.upsert([{"id": "5", "vector": [0, 1], "payload": "new"}])
+        self.assertEqual(replica.size, 1)
+        self.assertEqual(replica.search([0, 1], 1)[0]["payload"], "new")
+
+    def test_zero_vectors_and_empty_replica(self):
+        replica = CollectionReplica(2)
+        self.assertEqual(replica.search([1, 0], 3), [])
+        replica.upsert([{"id": 1, "vector": [0, 0], "payload": None}])
+        self.assertEqual(replica.search([1, 0], 3)[0]["score"], 0.0)
+        self.assertEqual(replica.search([1, 0], 0), [])
+
+    def test_dimension_mismatch_is_rejected(self):
+        replica = CollectionReplica(DIM)
+        with self.assertRaises(ValueError):
+            replica.upsert([{"id": 1, "vector": [1.0, 0.0], "payload": None}])
+        self.assertEqual(replica.size, 0)
+
+
+class _Response:
+    def __init__(self, body, status_code=200):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class _InMemoryQdrant:
+    # Answers the collection info and scroll calls ReplicaManager makes to build a replica
+    def __init__(self, points, distance="Cosine"):
+        self.points = points
+        self.distance = distance
+
+    def get(self, path, op=None):
+        return _Response({"result": {"points_count": len(self.points),
+                                     "config": {"params": {"vectors": {"size": DIM, "distance": self.distance}}}}})
+
+    def post(self, path, op=None, json=None, idempotent=False):
+        start = json.get("offset") or 0
+        page = self.points[start:start + json["limit"]]
+        next_offset = start + len(page) if start + len(page) < len(self.points) else None
+        return _Response({"result": {"points": page, "next_page_offset": next_offset}})
+
+
+class ReplicaManagerTest(unittest.TestCase):
+    def wait_for_build(self, manager, collection):
+        deadline = time.monotonic() + 5
+        while manager.search(collection, [1.0] * DIM, 1) is None:
+            self.assertLess(time.monotonic(), deadline, "replica was not built")
+            time.sleep(0.01)
+
+    def test_builds_on_first_search_then_writes_through(self):
+        rng = random.Random(3)
+        stored = [{"id": index, "vector": [rng.uniform(-1, 1) for _ in range(DIM)], "payload": {"n": index}}
+                  for index in range(2500)]
+        manager = ReplicaManager(_InMemoryQdrant(stored), resync_seconds=300, max_staleness_seconds=600)
+
+        self.assertIsNone(manager.search("faq", stored[0]["vector"], 1))
+        self.wait_for_build(manager, "faq")
+        self.assertEqual(manager.search("faq", stored[42]["vector"], 1)[0]["id"], 42)
+
+        manager.apply_upsert("faq", [{"id": "new", "vector": [1.0] * DIM, "payload": {"n": "new"}}])
+        self.assertEqual(manager.search("faq", [1.0] * DIM, 1)[0]["id"], "new")
+        manager.apply_delete("faq", ["new"])
+        self.assertNotEqual(manager.search("faq", [1.0] * DIM, 1)[0]["id"], "new")
+        self.assertEqual(manager.stats()["collections"]["faq"]["points"], 2500)
+
+    def test_concurrent_searches_during_writes(self):
+        manager = ReplicaManager(_InMemoryQdrant([]), resync_seconds=300, max_staleness_seconds=600)
+        self.wait_for_build(manager, "faq")
+        errors = []
+
+        def search():
+            try:
+                for _ in range(200):
+                    manager.search("faq", [1.0] * DIM, 5)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=search) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for index in range(200):
+            manager.apply_upsert("faq", [{"id": index, "vector": [float(index % 7 + 1)] * DIM, "payload": None}])
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(manager.stats()["collections"]["faq"]["points"], 200)
+
+    def test_non_cosine_collections_are_not_replicated(self):
+        manager = ReplicaManager(_InMemoryQdrant([], distance="Dot"))
+        self.assertIsNone(manager.search("dot_faq", [1.0] * DIM, 1))
+        deadline = time.monotonic() + 5
+        while "dot_faq" not in manager.stats()["skipped"]:
+            self.assertLess(time.monotonic(), deadline, "build did not finish")
+            time.sleep(0.01)
+        self.assertEqual(manager.stats()["skipped"]["dot_faq"], "Dot distance")
+        self.assertIsNone(manager.search("dot_faq", [1.0] * DIM, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
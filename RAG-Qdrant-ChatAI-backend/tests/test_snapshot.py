@@ -0,0 +1,227 @@
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+
+# Keep the SQLite stores out of the working tree; must happen before config is imported
+_DATA_DIR = tempfile.mkdtemp(prefix="rag-snapshot-tests-")
+os.environ.setdefault("COLLECTION_REGISTRY_PATH", os.path.join(_DATA_DIR, "collections.sqlite3"))
+os.environ.setdefault("CHUNK_CACHE_PATH", os.path.join(_DATA_DIR, "chunk_cache.sqlite3"))
+
+from app.services.qdrant_service import QdrantService  # noqa: E402
+from helpers.snapshot_helper import (  # noqa: E402
+    SNAPSHOT_MAGIC,
+    iter_snapshot_batches,
+    iter_snapshot_bytes,
+    read_snapshot_footer,
+)
+
+DIM = 5
+
+
+def _points(count, seed=0):
+    rng = np.random.default_rng(seed)
+    # float32 values survive the float32 vector block exactly
+    vectors = rng.standard_normal((count, DIM)).astype(np.float32).tolist()
+    return [
+        {"id": index if index % 2 else f"00000000-0000-0000-0000-{index:012d}", "vector": vector,
+         "payload": {"question": f"Frage {index} — ü?", "answer": f"答案 {index}"}}
+        for index, vector in enumerate(vectors)
+    ]
+
+
+def _pages(points, page_size):
+    return [points[start:start + page_size] for start in range(0, len(points), page_size)]
+
+
+class SnapshotRoundTripTest(unittest.TestCase):
+    def write(self, name, points, page_size=4, metadata=None):
+        path = os.path.join(_DATA_DIR, name)
+        metadata = metadata if metadata is not None else {"collection": "faq", "distance": "Cosine"}
+        with open(path, "wb") as out:
+            for block in iter_snapshot_bytes(_pages(points, page_size), metadata, DIM):
+                out.write(block)
+        return path
+
+    def read_all(self, path, batch_size):
+        footer = read_snapshot_footer(path)
+        return [point for _, batch in iter_snapshot_batches(path, footer, batch_size) for point in batch]
+
+    def test_round_trip_restores_ids_payloads_and_vectors(self):
+        points = _points(23)
+        path = self.write("round_trip.qasnap", points)
+
+        footer = read_snapshot_footer(path)
+        self.assertEqual((footer["count"], footer["dim"]), (23, DIM))
+        self.assertEqual((footer["collection"], footer["distance"]), ("faq", "Cosine"))
+        self.assertEqual(footer["vector_offset"] % 64, 0)
+
+        for batch_size in (1, 4, 23, 100):
+            with self.subTest(batch_size=batch_size):
+                self.assertEqual(self.read_all(path, batch_size), points)
+
+    def test_batch_offsets(self):
+        path = self.write("offsets.qasnap", _points(10))
+        footer = read_snapshot_footer(path)
+        batches = [(offset, len(batch)) for offset, batch in iter_snapshot_batches(path, footer, 4)]
+        self.assertEqual(batches, [(0, 4), (4, 4), (8, 2)])
+
+    def test_empty_collection(self):
+        path = self.write("empty.qasnap", [])
+        self.assertEqual(read_snapshot_footer(path)["count"], 0)
+        self.assertEqual(self.read_all(path, 10), [])
+
+    def test_wrong_dimension_is_rejected_on_export(self):
+        points = _points(3)
+        points[1]["vector"] = points[1]["vector"][:-1]
+        with self.assertRaisesRegex(ValueError, "has no 5-d vector"):
+            self.write("bad_dim.qasnap", points)
+
+
+class CorruptSnapshotTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.path = os.path.join(_DATA_DIR, "source.qasnap")
+        with open(cls.path, "wb") as out:
+            for block in iter_snapshot_bytes(_pages(_points(12), 5), {"collection": "faq"}, DIM):
+                out.write(block)
+        with open(cls.path, "rb") as f:
+            cls.data = f.read()
+
+    def write(self, name, data):
+        path = os.path.join(_DATA_DIR, name)
+        with open(path, "wb") as out:
+            out.write(data)
+        return path
+
+    def with_footer(self, name, footer_bytes):
+        """The source snapshot with its footer replaced by footer_bytes."""
+        footer_size, _ = struct.unpack("<Q8s", self.data[-16:])
+        body = self.data[:-16 - footer_size]
+        return self.write(name, body + footer_bytes + struct.pack("<Q8s", len(footer_bytes), SNAPSHOT_MAGIC))
+
+    def test_truncated_files_are_rejected(self):
+        footer_size, _ = struct.unpack("<Q8s", self.data[-16:])
+        vector_offset = read_snapshot_footer(self.path)["vector_offset"]
+        for keep in (0, 7, 20, vector_offset + 16, len(self.data) - 16 - footer_size, len(self.data) - 9,
+                     len(self.data) - 1):
+            with self.subTest(keep=keep):
+                path = self.write(f"truncated_{keep}.qasnap", self.data[:keep])
+                with self.assertRaisesRegex(ValueError, "Not a Q&A snapshot file|truncated"):
+                    read_snapshot_footer(path)
+
+    def test_missing_vector_bytes_are_detected(self):
+        # Footer intact but part of the vector block gone
+        vector_offset = read_snapshot_footer(self.path)["vector_offset"]
+        path = self.write("short_vectors.qasnap", self.data[:vector_offset + 8] + self.data[vector_offset + 40:])
+        with self.assertRaisesRegex(ValueError, "truncated"):
+            read_snapshot_footer(path)
+
+    def test_not_a_snapshot(self):
+        path = self.write("other.qasnap", b"%PDF-1.4" + b"\0" * 64)
+        with self.assertRaisesRegex(ValueError, "Not a Q&A snapshot file"):
+            read_snapshot_footer(path)
+
+    def test_corrupt_footers_are_rejected(self):
+        footer = read_snapshot_footer(self.path)
+        cases = {
+            "garbage": b"\xff{not json",
+            "list": b"[1, 2, 3]",
+            "missing_dim": json.dumps({key: value for key, value in footer.items() if key != "dim"}).encode(),
+            "text_count": json.dumps({**footer, "count": "12"}).encode(),
+        }
+        for name, footer_bytes in cases.items():
+            with self.subTest(footer=name):
+                with self.assertRaisesRegex(ValueError, "Snapshot footer is corrupt"):
+                    read_snapshot_footer(self.with_footer(f"footer_{name}.qasnap", footer_bytes))
+
+    def test_unsupported_version(self):
+        footer = {**read_snapshot_footer(self.path), "version": 99}
+        path = self.with_footer("version.qasnap", json.dumps(footer).encode())
+        with self.assertRaisesRegex(ValueError, "Unsupported snapshot version 99"):
+            read_snapshot_footer(path)
+
+    def test_corrupt_payload_line_fails_the_batch(self):
+        # Same length, so the footer offsets still line up
+        path = self.write("payload.qasnap", self.data.replace(b'{"id": 1,', b'{"id" 1, ', 1))
+        with self.assertRaises(ValueError):
+            list(iter_snapshot_batches(path, read_snapshot_footer(path), 4))
+
+
+class _Response:
+    def __init__(self, body, status_code=200):
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self._body = body
+        self.text = json.dumps(body)
+
+    def json(self):
+        return self._body
+
+
+class _InMemoryQdrant:
+    # Just enough of Qdrant's collection info, create and upsert calls for an import
+    def __init__(self, collections=None):
+        self.collections = collections or {}
+        self.points = {}
+
+    def get(self, path, op=None, **kwargs):
+        name = path.split("/")[2]
+        if name not in self.collections:
+            return _Response({"status": {"error": "Not found"}}, 404)
+        return _Response({"result": {"config": {"params": {"vectors": self.collections[name]["vectors"]}}}})
+
+    def put(self, path, op=None, json=None, **kwargs):
+        name = path.split("/")[2]
+        if op == "create_collection":
+            self.collections[name] = json
+        else:
+            self.points.update({point["id"]: point for point in json["points"]})
+        return _Response({"result": {"status": "completed"}, "status": "ok"})
+
+
+class SnapshotImportTest(unittest.TestCase):
+    def setUp(self):
+        self.service = QdrantService()
+        self.service.qdrant = _InMemoryQdrant()
+
+    def snapshot(self, name, metadata):
+        path = os.path.join(_DATA_DIR, name)
+        with open(path, "wb") as out:
+            for block in iter_snapshot_bytes(_pages(_points(7), 3), metadata, DIM):
+                out.write(block)
+        return path
+
+    def test_collection_is_created_with_the_snapshot_distance(self):
+        path = self.snapshot("dot.qasnap", {"collection": "dot_faq", "distance": "Dot"})
+        result, status = self.service.import_collection(path, batch_size=3)
+        self.assertEqual(status, 200)
+        self.assertTrue(result["created"])
+        self.assertEqual(self.service.qdrant.collections["dot_faq"]["vectors"], {"size": DIM, "distance": "Dot"})
+        self.assertEqual(len(self.service.qdrant.points), 7)
+
+    def test_snapshot_without_distance_is_cosine(self):
+        path = self.snapshot("legacy.qasnap", {"collection": "legacy_faq"})
+        self.assertEqual(self.service.import_collection(path)[1], 200)
+        self.assertEqual(self.service.qdrant.collections["legacy_faq"]["vectors"]["distance"], "Cosine")
+
+    def test_existing_collection_with_another_distance_conflicts(self):
+        self.service.qdrant.collections["faq"] = {"vectors": {"size": DIM, "distance": "Cosine"}}
+        path = self.snapshot("conflict.qasnap", {"collection": "faq", "distance": "Euclid"})
+        result, status = self.service.import_collection(path)
+        self.assertEqual(status, 409)
+        self.assertIn("uses Cosine distance", result["error"])
+        self.assertEqual(self.service.qdrant.points, {})
+
+    def test_unknown_distance_is_rejected(self):
+        path = self.snapshot("hamming.qasnap", {"collection": "faq", "distance": "Hamming"})
+        result, status = self.service.import_collection(path)
+        self.assertEqual((result, status), ({"error": "Unsupported snapshot distance 'Hamming'"}, 400))
+        self.assertEqual(self.service.qdrant.collections, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
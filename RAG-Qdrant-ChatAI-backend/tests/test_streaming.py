@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+
+# Keep the SQLite stores out of the working tree; must happen before config is imported
+_DATA_DIR = tempfile.mkdtemp(prefix="rag-stream-tests-")
+os.environ.setdefault("COLLECTION_REGISTRY_PATH", os.path.join(_DATA_DIR, "collections.sqlite3"))
+os.environ.setdefault("CHUNK_CACHE_PATH", os.path.join(_DATA_DIR, "chunk_cache.sqlite3"))
+
+from app.services.askGemini_service import GeminiService  # noqa: E402
+from app.services.qdrant_service import QdrantService  # noqa: E402
+from helpers.qdrant_transport_helper import QdrantTransport  # noqa: E402
+from helpers.stream_helper import SSEDecoder  # noqa: E402
+from tests.fake_llm_server import FakeLLMServer, MULTIBYTE_TOKENS, POINTS  # noqa: E402
+
+
+class _FixedEmbedder:
+    # Stands in for EmbedService so the tests do not load a model
+    def get_embedding(self, text):
+        return [0.1, 0.2, 0.3, 0.4]
+
+
+class SSEDecoderTest(unittest.TestCase):
+    def test_joins_multiline_data_and_skips_comments(self):
+        decoder = SSEDecoder()
+        lines = [": ping", "event: message", "data: {\"a\":", "data: 1}", "", "data: x"]
+        events = [decoder.feed(line) for line in lines]
+        self.assertEqual([event for event in events if event], ["{\"a\":\n1}"])
+        self.assertEqual(decoder.flush(), "x")
+        self.assertIsNone(decoder.flush())
+
+
+class GeminiStreamTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeLLMServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.gemini = GeminiService()
+        self.gemini.stream_url = self.server.stream_url
+
+    def test_plain_stream(self):
+        self.assertEqual(list(self.gemini.ask_stream("hi")), ["Hello", " world"])
+
+    def test_split_frames(self):
+        self.assertEqual(list(self.gemini.ask_stream("SPLIT_FRAMES")), ["Hello", " world", "!"])
+
+    def test_multibyte_text_round_trips(self):
+        self.assertEqual(list(self.gemini.ask_stream("MULTIBYTE")), MULTIBYTE_TOKENS)
+
+    def test_http_error(self):
+        with self.assertRaisesRegex(Exception, "upstream exploded"):
+            list(self.gemini.ask_stream("HTTP_ERROR"))
+
+    def test_error_event(self):
+        tokens = self.gemini.ask_stream("STREAM_ERROR")
+        self.assertEqual(next(tokens), "Partial")
+        with self.assertRaisesRegex(Exception, "overloaded"):
+            next(tokens)
+
+
+class SearchPointStreamTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FakeLLMServer().start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.service = QdrantService()
+        self.service.qdrant = QdrantTransport(base_url=self.server.url, max_retries=0)
+        self.service.gemini_service.stream_url = self.server.stream_url
+        self.service._embedder = lambda collection: _FixedEmbedder()
+
+    def events(self, collection, query, **params):
+        # A collection per test keeps the semantic answer cache out of the way
+        return list(self.service.search_point_stream({"collection": collection, "query": query, **params}))
+
+    def test_event_order(self):
+        events = self.events("stream_order", "SPLIT_FRAMES what is qdrant?")
+        self.assertEqual([event["event"] for event in events], ["points", "token", "token", "token", "done"])
+        self.assertEqual(events[0]["top_points"], POINTS)
+        self.assertEqual(events[-1]["human_like_answer"], "Hello world!")
+        self.assertEqual(events[-1]["answer_source"], "llm")
+        self.assertEqual(events[-1]["context"]["points_used"], len(POINTS))
+
+    def test_multibyte_answer(self):
+        events = self.events("stream_multibyte", "MULTIBYTE")
+        self.assertEqual([event["text"] for event in events if event["event"] == "token"], MULTIBYTE_TOKENS)
+        self.assertEqual(events[-1]["human_like_answer"], "".join(MULTIBYTE_TOKENS))
+
+    def test_repeat_is_served_from_cache(self):
+        self.events("stream_cache", "what is qdrant?")
+        events = self.events("stream_cache", "what is qdrant?")
+        self.assertEqual([event["event"] for event in events], ["points", "token", "done"])
+        self.assertEqual(events[-1]["answer_source"], "cache")
+
+    def test_cache_is_per_search_settings(self):
+        self.events("stream_cache_params", "what is qdrant?", top_k=2)
+        events = self.events("stream_cache_params", "what is qdrant?", top_k=1)
+        self.assertEqual(events[-1]["answer_source"], "llm")
+        events = self.events("stream_cache_params", "what is qdrant?", top_k=2)
+        self.assertEqual(events[-1]["answer_source"], "cache")
+
+    def test_llm_http_error(self):
+        events = self.events("stream_http_error", "HTTP_ERROR")
+        self.assertEqual([event["event"] for event in events], ["points", "error"])
+        self.assertIn("upstream exploded", events[-1]["error"])
+
+    def test_llm_error_event(self):
+        events = self.events("stream_error_event", "STREAM_ERROR")
+        self.assertEqual([event["event"] for event in events], ["points", "token", "error"])
+        self.assertIn("overloaded", events[-1]["error"])
+
+    def test_error_is_not_cached(self):
+        self.events("stream_no_cache", "STREAM_ERROR")
+        events = self.events("stream_no_cache", "STREAM_ERROR")
+        self.assertEqual([event["event"] for event in events], ["points", "token", "error"])
+
+    def test_search_failure(self):
+        events = self.events("missing_collection", "anything")
+        self.assertEqual([event["event"] for event in events], ["error"])
+        self.assertEqual(events[0]["error"], "Failed to search points")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,22 @@
+from app import create_app
+from app.services.qdrant_service import preload_collection_models
+from config import EMBEDDING_BACKEND, SERVER_PRELOAD_MODEL
+
+
+# ---------------------------
+# Production WSGI entry point
+# ---------------------------
+#   gunicorn -c gunicorn.conf.py wsgi:app
+#
+# gunicorn.conf.py sets preload_app, so this module is imported once in the
+# master. Loading the embedding models here, before the workers are forked,
+# lets every worker share the weights copy-on-write instead of loading its own
+# copy. Only weights are loaded: no encode runs in the master, because an
+# OpenMP thread pool started before fork is not usable in the children.
+# ONNX Runtime sessions own threads too and cannot be shared across fork, so
+# with EMBEDDING_BACKEND=onnx each worker loads its model on first use.
+
+app = create_app()
+
+if SERVER_PRELOAD_MODEL and EMBEDDING_BACKEND == "torch":
+    preload_collection_models()